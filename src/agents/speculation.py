@@ -0,0 +1,201 @@
+# src/agents/speculation.py
+
+import time
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.text_match import keyword_overlap
+
+
+@dataclass
+class SpeculativeCandidate:
+    question: str
+    keywords: List[str] = field(default_factory=list)   # thèmes de réponse qui déclenchent cette question
+
+
+@dataclass
+class _Speculation:
+    generation: int
+    question: str
+    future: Future
+    started_at: float
+    duration: float = 0.0
+
+
+class SpeculativePrefetcher:
+    """
+    Pré-génère en arrière-plan quelques questions de relance probables
+    pendant que le candidat répond.
+
+    - start(question, history) lance la génération (et annule la précédente)
+    - wait_candidates()/await_candidates() récupèrent le résultat s'il est prêt
+    - match(answer, candidates) choisit la meilleure question préparée
+    - les métriques (hit rate, temps gagné) sont dans metrics()
+
+    Annuler une spéculation (cancel, nouvelle question, délai dépassé) ne fait
+    qu'ignorer son résultat: une requête LLM déjà partie va à son terme et reste
+    facturée. Ces générations perdues sont comptées dans metrics()["discarded"].
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str, str], List[SpeculativeCandidate]],
+        match_threshold: float = 0.34,
+    ):
+        self.generate = generate
+        self.match_threshold = match_threshold
+
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculation")
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._current: Optional[_Speculation] = None
+        self._closed = False
+
+        self.started = 0
+        self.cancelled = 0
+        self.discarded = 0   # générations terminées après abandon (tokens dépensés pour rien)
+        self.hits = 0
+        self.refines = 0
+        self.misses = 0
+        self.saved_seconds: List[float] = []
+
+    # --------------------------------------------------------
+    # Lancement / annulation
+    # --------------------------------------------------------
+    def start(self, question: str, history: str) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._cancel_locked()
+            self._generation += 1
+            spec = _Speculation(
+                generation=self._generation,
+                question=question,
+                future=Future(),
+                started_at=time.perf_counter(),
+            )
+            self._current = spec
+            self.started += 1
+
+        def run():
+            try:
+                candidates = self.generate(question, history)
+            except Exception as e:
+                print("[Speculation] ⚠️ Pré-génération échouée:", e)
+                candidates = []
+            spec.duration = time.perf_counter() - spec.started_at
+            with self._lock:
+                stale = spec.generation != self._generation
+                if stale or spec.future.cancelled():
+                    self.discarded += 1
+            if stale:
+                return
+            try:
+                spec.future.set_result(candidates)
+            except Exception:
+                pass  # annulée entre-temps
+
+        self._executor.submit(run)
+
+    def _cancel_locked(self) -> None:
+        if self._current is not None and not self._current.future.done():
+            self._current.future.cancel()
+            self.cancelled += 1
+        self._current = None
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._cancel_locked()
+
+    def _take(self) -> Optional[_Speculation]:
+        with self._lock:
+            spec = self._current
+            self._current = None
+        return spec
+
+    # --------------------------------------------------------
+    # Récupération des candidats
+    # --------------------------------------------------------
+    def wait_candidates(self, timeout: float = 0.0) -> Tuple[Optional[List[SpeculativeCandidate]], float]:
+        """
+        Retourne (candidats, durée de génération).
+        None si aucune spéculation n'était lancée, liste vide si rien n'est prêt
+        à temps (la spéculation en cours est alors abandonnée).
+        """
+        spec = self._take()
+        if spec is None:
+            return None, 0.0
+        try:
+            candidates = spec.future.result(timeout=timeout)
+        except FutureTimeout:
+            spec.future.cancel()
+            self.cancelled += 1
+            return [], 0.0
+        return candidates or [], spec.duration
+
+    async def await_candidates(self, timeout: float = 0.0) -> Tuple[Optional[List[SpeculativeCandidate]], float]:
+        spec = self._take()
+        if spec is None:
+            return None, 0.0
+        try:
+            candidates = await asyncio.wait_for(asyncio.wrap_future(spec.future), timeout=timeout or 0.001)
+        except asyncio.TimeoutError:
+            spec.future.cancel()
+            self.cancelled += 1
+            return [], 0.0
+        except asyncio.CancelledError:
+            # la tâche appelante est annulée (fin de session): on abandonne et on propage
+            spec.future.cancel()
+            self.cancelled += 1
+            raise
+        return candidates or [], spec.duration
+
+    # --------------------------------------------------------
+    # Choix + métriques
+    # --------------------------------------------------------
+    def match(self, answer: str, candidates: List[SpeculativeCandidate]) -> Tuple[Optional[SpeculativeCandidate], float]:
+        best, best_score = None, 0.0
+        for cand in candidates:
+            score = keyword_overlap(answer, cand.keywords)
+            if score > best_score:
+                best, best_score = cand, score
+        if best_score >= self.match_threshold:
+            return best, best_score
+        return None, best_score
+
+    def record(self, outcome: str, saved: float = 0.0) -> None:
+        """outcome: "hit" (question préparée utilisée), "refine" ou "miss"."""
+        if outcome == "hit":
+            self.hits += 1
+        elif outcome == "refine":
+            self.refines += 1
+        else:
+            self.misses += 1
+        if outcome != "miss":
+            self.saved_seconds.append(max(0.0, saved))
+
+    def metrics(self) -> Dict[str, float]:
+        resolved = self.hits + self.refines + self.misses
+        saved = self.saved_seconds
+        return {
+            "started": self.started,
+            "cancelled": self.cancelled,
+            "discarded": self.discarded,
+            "hits": self.hits,
+            "refines": self.refines,
+            "misses": self.misses,
+            "hit_rate": (self.hits / resolved) if resolved else 0.0,
+            "avg_saved_s": (sum(saved) / len(saved)) if saved else 0.0,
+            "total_saved_s": sum(saved),
+        }
+
+    def shutdown(self) -> None:
+        """Fin d'entretien: abandonne la spéculation en cours et libère les threads (start() devient sans effet)."""
+        with self._lock:
+            self._closed = True
+            self._cancel_locked()
+        # les générations pas encore démarrées sont annulées, celle en vol se termine seule
+        self._executor.shutdown(wait=False, cancel_futures=True)
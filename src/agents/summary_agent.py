@@ -1,6 +1,7 @@
-from typing import List
+from typing import List, Tuple
 from llm_client import LLMClient
 from models.data_models import CVData, JobData, QAExchange
+from utils.context_builder import build_context
 
 
 class SummaryAgent:
@@ -12,9 +13,10 @@ class SummaryAgent:
         self.llm = llm
         self.cv = cv
         self.job = job
+        self.context = build_context(cv, job)
         self.history = history
 
-    def generate_notion_markdown(self) -> str:
+    def _build_prompts(self) -> Tuple[str, str]:
         system_prompt = """
 Tu es un coach en entretien.
 [... SAME PROMPT ...]
@@ -27,13 +29,18 @@ Tu es un coach en entretien.
 
         user_prompt = f"""
 CV:
-{self.cv.structured}
+{self.context.cv_text}
 
 Fiche de poste:
-{self.job.structured}
+{self.context.job_text}
 
 Historique:
 {history_serialized}
 """
+        return system_prompt, user_prompt
+
+    def generate_notion_markdown(self) -> str:
+        return self.llm.chat(*self._build_prompts())
 
-        return self.llm.chat(system_prompt, user_prompt)
+    async def agenerate_notion_markdown(self) -> str:
+        return await self.llm.achat(*self._build_prompts())
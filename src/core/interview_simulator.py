@@ -1,19 +1,25 @@
 # src/core/interview_simulator.py
 
+import os
 import time
 from typing import List
 
 from agents.manager_agent import ManagerAgent
 from services.stt_service import stt_record_and_transcribe
-from services.tts_service import generate_tts_audio
+from services.tts_service import TTS_FORMAT, audio_mime_type, open_pcm_output, play_pcm_local, play_tts_local
+from services.tts_pipeline import TIMED_PAGE_FORMATS, TTSPipelineMetrics, audio_duration, iter_tts_pipeline
+from services.tts_cache import CANNED_PHRASES, get_tts_cache, prewarm_tts_cache
 from models.data_models import QAExchange
 
+# page: audio compressé envoyé à la page Streamlit | local: lecture directe sur la sortie son
+TTS_PLAYBACK = os.getenv("TTS_PLAYBACK", "page")
+
 
 class InterviewSimulator:
     """
     Boucle d'entretien autonome:
-    - demande une question à ManagerAgent
-    - TTS pour la poser à voix haute
+    - demande une question à ManagerAgent (en streaming)
+    - TTS phrase par phrase pour la poser à voix haute
     - STT pour écouter la réponse
     - stocke dans la mémoire
     - répète jusqu'à max_questions ou fin
@@ -24,15 +30,64 @@ class InterviewSimulator:
         self.max_questions = max_questions
         self.stt_duration = stt_duration
         self.st = streamlit
+        self.tts_cache = get_tts_cache()
+        self.tts_metrics: List[TTSPipelineMetrics] = []
+        # phrases fixes synthétisées une fois (en arrière-plan si le cache est froid), jouées ensuite depuis le cache
+        prewarm_tts_cache("pcm" if TTS_PLAYBACK == "local" else None)
 
-    def play_audio(self, path: str):
+    def play_audio(self, audio: bytes, fmt: str = None, target=None):
         try:
-            with open(path, "rb") as f:
-                audio = f.read()
-            self.st.audio(audio, format="audio/wav")
+            (target or self.st).audio(audio, format=audio_mime_type(fmt), autoplay=True)
         except Exception as e:
             print("[Simulator] ❌ Error playing audio:", e)
 
+    def speak(self, sentence: str):
+        if TTS_PLAYBACK == "local":
+            pcm = self.tts_cache.get(sentence, "pcm")
+            if pcm is not None:
+                play_pcm_local(pcm)
+            else:
+                self.tts_cache.set(sentence, play_tts_local(sentence), "pcm")
+            return
+        audio = self.tts_cache.synthesize(sentence)
+        if audio:
+            self.play_audio(audio)
+
+    def speak_stream(self, sentences, text_ph) -> List[str]:
+        """
+        Question en streaming, synthèse pipelinée: chaque phrase part en synthèse
+        dès qu'elle sort du LLM, et chaque segment est joué dès qu'il est prêt, dans l'ordre.
+        - local: segments PCM écrits bout à bout dans un seul flux de sortie (sans trou)
+        - page: un lecteur par segment, remplacé quand le précédent a fini de jouer
+          (durée lue dans les en-têtes audio); la synthèse des suivants continue pendant la lecture
+        """
+        spoken: List[str] = []
+        metrics = TTSPipelineMetrics()
+
+        if TTS_PLAYBACK == "local":
+            with open_pcm_output() as stream:
+                for sentence, pcm in iter_tts_pipeline(sentences, "pcm", metrics=metrics):
+                    spoken.append(sentence)
+                    text_ph.write(f"**Interviewer:** {' '.join(spoken)}")
+                    stream.write(pcm)
+        else:
+            fmt = TTS_FORMAT if TTS_FORMAT in TIMED_PAGE_FORMATS else "mp3"
+            audio_ph = self.st.empty()
+            play_end = 0.0
+            for sentence, audio in iter_tts_pipeline(sentences, fmt, metrics=metrics):
+                spoken.append(sentence)
+                text_ph.write(f"**Interviewer:** {' '.join(spoken)}")
+                # un seul lecteur à la fois: le segment suivant part à la fin du précédent
+                time.sleep(max(0.0, play_end - time.perf_counter()))
+                self.play_audio(audio, fmt, audio_ph)
+                play_end = time.perf_counter() + (audio_duration(audio, fmt) or 0.0)
+            # la question est entièrement dite avant l'écoute de la réponse
+            time.sleep(max(0.0, play_end - time.perf_counter()))
+
+        print(f"[Simulator] TTS: {metrics.report()}")
+        self.tts_metrics.append(metrics)
+        return spoken
+
     def run(self) -> List[QAExchange]:
         history: List[QAExchange] = []
         count = 0
@@ -40,35 +95,39 @@ class InterviewSimulator:
         self.st.write("### 🎤 Interview simulation started")
         self.st.info("Après chaque question, répondez à voix haute près de votre micro.")
 
-        while count < self.max_questions:
-            step = self.manager.next_step()
-            question = step.get("next_question", "")
-            end_flag = step.get("end", False)
-
-            if end_flag or not question.strip():
-                self.st.success("Entretien terminé.")
-                break
-
-            count += 1
-            self.st.write(f"**Interviewer:** {question}")
-
-            # 1) TTS : poser la question à voix haute
-            audio_path = generate_tts_audio(question)
-            if audio_path:
-                self.play_audio(audio_path)
-
-            # 2) STT : écouter la réponse
-            self.st.info("🎙️ Écoute en cours… répondez maintenant.")
-            answer = stt_record_and_transcribe(duration=self.stt_duration)
-            if not answer:
-                answer = "(aucune réponse détectée)"
-
-            self.st.write(f"**Vous:** {answer}")
-
-            # 3) mémoire
-            self.manager.record_answer(question, answer)
-            history.append(QAExchange(question=question, answer=answer))
-
-            time.sleep(1.0)
+        try:
+            while count < self.max_questions:
+                # 1) Question en streaming : TTS pipelinée dès qu'une phrase est complète
+                text_ph = self.st.empty()
+                spoken = self.speak_stream(self.manager.stream_next_step(), text_ph)
+
+                step = self.manager.last_step
+                question = step.get("next_question", "") or " ".join(spoken)
+                end_flag = step.get("end", False)
+
+                if end_flag or not question.strip():
+                    self.st.success("Entretien terminé.")
+                    self.speak(CANNED_PHRASES["closing_short"])
+                    break
+
+                count += 1
+                text_ph.write(f"**Interviewer:** {question}")
+
+                # 2) STT : écouter la réponse
+                self.st.info("🎙️ Écoute en cours… répondez maintenant.")
+                answer = stt_record_and_transcribe(duration=self.stt_duration)
+                if not answer:
+                    answer = "(aucune réponse détectée)"
+
+                self.st.write(f"**Vous:** {answer}")
+
+                # 3) mémoire
+                self.manager.record_answer(question, answer)
+                history.append(QAExchange(question=question, answer=answer))
+
+                time.sleep(1.0)
+        finally:
+            # threads du ManagerAgent (spéculation, résumé) libérés même si l'entretien est interrompu
+            self.manager.close()
 
         return history
@@ -14,8 +14,10 @@ import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
 
+from livekit import rtc
 from livekit.agents import (
     JobContext,
+    JobProcess,
     AgentSession,
     Agent,
     RoomInputOptions,
@@ -26,12 +28,16 @@ from livekit.agents import cli
 from livekit.plugins import openai as lk_openai
 from livekit.plugins import hedra as lk_hedra
 
-from llm_client import LLMClient
+from llm_client import LLMClient, close_shared_async_clients
 from agents.manager_agent import ManagerAgent
-from models.data_models import CVData, JobData
+from agents.question_agent import QuestionAgent
+from models.data_models import CVData, InterviewPlan
 
 from services.cv_parser import parse_cv
 from services.job_scraper import scrape_job_url
+from services.job_store import load_job_pointer, write_job_pointer
+from services.tts_cache import CANNED_PHRASES, get_tts_cache, prewarm_tts_cache
+from services.tts_service import PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH
 
 
 # ---------------------------------------------------------
@@ -45,6 +51,7 @@ HEDRA_AVATAR_ID = os.getenv("HEDRA_AVATAR_ID")
 EXPORT_DIR = Path("exports")
 CV_JSON_PATH = EXPORT_DIR / "last_cv.json"
 JOB_JSON_PATH = EXPORT_DIR / "last_job.json"
+PLAN_JSON_PATH = EXPORT_DIR / "last_plan.json"
 
 
 # ---------------------------------------------------------
@@ -68,19 +75,52 @@ def prepare_profile_via_cli() -> None:
     job_obj = scrape_job_url(job_url)
 
     cv_struct = getattr(cv_obj, "structured", cv_obj)
-    job_struct = getattr(job_obj, "structured", job_obj)
 
     print(f"[Setup] Writing {CV_JSON_PATH}")
     with CV_JSON_PATH.open("w", encoding="utf-8") as f:
         json.dump(cv_struct, f, ensure_ascii=False, indent=2)
 
+    # last_job.json = pointeur vers l'annonce dans exports/jobs.sqlite3
     print(f"[Setup] Writing {JOB_JSON_PATH}")
-    with JOB_JSON_PATH.open("w", encoding="utf-8") as f:
-        json.dump(job_struct, f, ensure_ascii=False, indent=2)
+    write_job_pointer(str(JOB_JSON_PATH), job_url, job_obj)
+
+    # Plan d'entretien calculé une fois ici, parcouru localement par le worker
+    if os.getenv("INTERVIEW_PLAN", "1") == "1":
+        print("[Setup] Building interview plan...")
+        # 1 intro fixe + 3 questions ManagerAgent: le plan ne reprend pas la présentation
+        plan = QuestionAgent(llm, cv_obj, job_obj).build_interview_plan(3, skip_introduction=True)
+        print(f"[Setup] Writing {PLAN_JSON_PATH}")
+        with PLAN_JSON_PATH.open("w", encoding="utf-8") as f:
+            json.dump(plan.to_dict(), f, ensure_ascii=False, indent=2)
+    elif PLAN_JSON_PATH.exists():
+        PLAN_JSON_PATH.unlink()
 
     print("\n[Setup] Export complete! Starting LiveKit...\n")
 
 
+# ---------------------------------------------------------
+# Phrases fixes: audio pré-synthétisé au démarrage du process
+# ---------------------------------------------------------
+def prewarm(proc: JobProcess):
+    # intro + clôtures en PCM: lues depuis le disque, ou synthétisées en arrière-plan
+    # au premier démarrage (le worker accepte des sessions sans attendre)
+    prewarm_tts_cache("pcm")
+
+
+async def pcm_frames(pcm: bytes, frame_ms: int = 20):
+    """Découpe un PCM 24 kHz mono en trames LiveKit de frame_ms."""
+    step = PCM_SAMPLE_RATE * frame_ms // 1000 * PCM_SAMPLE_WIDTH
+    usable = len(pcm) - len(pcm) % PCM_SAMPLE_WIDTH
+    for start in range(0, usable, step):
+        chunk = pcm[start:min(start + step, usable)]
+        yield rtc.AudioFrame(
+            data=chunk,
+            sample_rate=PCM_SAMPLE_RATE,
+            num_channels=1,
+            samples_per_channel=len(chunk) // PCM_SAMPLE_WIDTH,
+        )
+
+
 # ---------------------------------------------------------
 # Worker entrypoint
 # ---------------------------------------------------------
@@ -88,6 +128,8 @@ async def entrypoint(ctx: JobContext):
     print("[LiveKit] Worker starting interview agent.")
 
     await ctx.connect()
+    # pool HTTP OpenAI partagé du process: fermé proprement à la fin du job
+    ctx.add_shutdown_callback(close_shared_async_clients)
 
     # Realtime model (we control behavior via instructions in Agent + generate_reply)
     rt_model = lk_openai.realtime.RealtimeModel(
@@ -101,17 +143,27 @@ async def entrypoint(ctx: JobContext):
         cv_struct = json.load(f)
 
     print(f"[System] Loading Job from {JOB_JSON_PATH}")
-    with JOB_JSON_PATH.open("r", encoding="utf-8") as f:
-        job_struct = json.load(f)
+    job_data = load_job_pointer(str(JOB_JSON_PATH))
 
     cv_data = CVData(raw_text="", structured=cv_struct)
-    job_data = JobData(raw_text="", structured=job_struct)
+
+    plan = None
+    if PLAN_JSON_PATH.exists():
+        print(f"[System] Loading interview plan from {PLAN_JSON_PATH}")
+        with PLAN_JSON_PATH.open("r", encoding="utf-8") as f:
+            plan = InterviewPlan.from_dict(json.load(f))
+
+    # EXACTLY 4 questions total (intro + 3 ManagerAgent)
+    MAX_QUESTIONS = 4
 
     manager = ManagerAgent(
         llm=llm,
         cv=cv_data,
         job=job_data,
         base_questions=[],
+        plan=plan,
+        max_questions=MAX_QUESTIONS - 1,
+        asked_intro=CANNED_PHRASES["intro"],
     )
 
     session = AgentSession(llm=rt_model)
@@ -131,23 +183,33 @@ async def entrypoint(ctx: JobContext):
     # EXACTLY 4 questions total (intro + 3 ManagerAgent)
     # -----------------------------------------------------
     total_questions = 0
-    MAX_QUESTIONS = 4
+
+    async def say_canned(text: str, instructions: str):
+        """
+        Phrase fixe: jouée depuis le cache audio (aucune latence de synthèse),
+        sinon lue par le modèle realtime comme avant.
+        """
+        pcm = get_tts_cache().get(text, "pcm")
+        if pcm:
+            await session.say(text, audio=pcm_frames(pcm))
+        else:
+            await session.generate_reply(instructions=instructions)
 
     async def end_interview(final_message: str = None):
         """
         Ends the interview politely and closes the session.
         """
-        message = final_message or (
-            "Merci, l'entretien est terminé. Nous avons couvert les points essentiels."
-        )
-        await session.generate_reply(
+        message = final_message or CANNED_PHRASES["closing"]
+        await say_canned(
+            message,
             instructions=(
                 "Tu es Clara, recruteuse. "
                 "Lis EXACTEMENT cette phrase, sans rien ajouter : "
                 f"\"{message}\""
-            )
+            ),
         )
         await asyncio.sleep(1)
+        await manager.aclose()
         await session.close()
 
     # -----------------------------------------------------
@@ -161,37 +223,38 @@ async def entrypoint(ctx: JobContext):
             await end_interview()
             return
 
-        decision = manager.next_step()
+        # Streaming: chaque phrase est envoyée à la voix dès qu'elle est complète
+        # (les SpeechHandle sont joués dans l'ordre par la session)
+        speech = None
+        async for sentence in manager.astream_next_step():
+            print("[Interviewer] ❓", sentence)
+            speech = session.generate_reply(
+                instructions=(
+                    "Tu joues STRICTEMENT le rôle de recruteuse en entretien. "
+                    "Ne donne jamais de conseils, ne fais pas de coaching, "
+                    "ne réponds jamais à la place du candidat. "
+                    "Lis EXACTEMENT la phrase suivante, mot pour mot, "
+                    "sans rien ajouter avant, après ou entre parenthèses : "
+                    f"\"{sentence}\""
+                )
+            )
+
+        decision = manager.last_step
         print("[ManagerAgent decision]", decision)
 
         # If ManagerAgent says "end", respect it, but still within our 4-question max
         if decision.get("end"):
-            await end_interview("Merci, l'entretien est terminé.")
+            await end_interview(CANNED_PHRASES["closing_short"])
             return
 
         question = (decision.get("next_question") or "").strip()
 
-        if not question:
-            await end_interview("Nous arrivons au terme de cette démonstration.")
-            return
-
-        print("[Interviewer] ❓", question)
-
-        # If asking this would exceed the limit, end instead
-        if total_questions >= MAX_QUESTIONS:
-            await end_interview()
+        if not question or speech is None:
+            await end_interview(CANNED_PHRASES["closing_demo"])
             return
 
-        await session.generate_reply(
-            instructions=(
-                "Tu joues STRICTEMENT le rôle de recruteuse en entretien. "
-                "Ne donne jamais de conseils, ne fais pas de coaching, "
-                "ne réponds jamais à la place du candidat. "
-                "Lis EXACTEMENT la question suivante, mot pour mot, "
-                "sans rien ajouter avant, après ou entre parenthèses : "
-                f"\"{question}\""
-            )
-        )
+        # Attendre la fin de la lecture de la dernière phrase
+        await speech
 
         total_questions += 1
 
@@ -208,7 +271,9 @@ async def entrypoint(ctx: JobContext):
             await end_interview()
             return
 
-        manager.record_answer("", text)
+        # première réponse: elle répond à l'intro fixe, pas à une question du ManagerAgent
+        last_question = manager.last_step.get("next_question") or CANNED_PHRASES["intro"]
+        await manager.arecord_answer(last_question, text)
         await run_manager_step()
 
     @session.on("user_input_transcribed")
@@ -221,14 +286,11 @@ async def entrypoint(ctx: JobContext):
     async def start_interview():
         nonlocal total_questions
 
-        intro_question = (
-            "Bonjour, merci d'être présente pour cet entretien. "
-            "Pour commencer, pouvez-vous vous présenter brièvement "
-            "et m'expliquer ce qui vous motive pour ce poste ?"
-        )
+        intro_question = CANNED_PHRASES["intro"]
 
         print("[Interviewer] Intro question")
-        await session.generate_reply(
+        await say_canned(
+            intro_question,
             instructions=(
                 "Tu es Clara, recruteuse IA. "
                 "Tu es déjà en plein entretien, pas un chatbot généraliste. "
@@ -236,7 +298,7 @@ async def entrypoint(ctx: JobContext):
                 "Lis EXACTEMENT la phrase suivante, mot pour mot, "
                 "sans rien ajouter avant, après ou entre parenthèses : "
                 f"\"{intro_question}\""
-            )
+            ),
         )
 
         # Intro counts as question #1
@@ -282,5 +344,6 @@ if __name__ == "__main__":
     cli.run_app(
         WorkerOptions(
             entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
         )
     )
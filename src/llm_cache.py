@@ -0,0 +1,213 @@
+# src/llm_cache.py
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "llm")
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_MAX_BYTES = 50 * 1024 * 1024   # 50 MB
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600         # 7 jours
+
+
+def make_cache_key(model: str, messages: List[Dict[str, str]], schema_hint: Optional[str] = None) -> str:
+    """
+    Hash SHA-256 stable de (model, messages, schema_hint).
+    json.dumps(sort_keys=True) garantit la même clé pour des entrées identiques.
+    """
+    payload = json.dumps(
+        {"model": model, "messages": messages, "schema_hint": schema_hint},
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Cache à deux niveaux pour les réponses du LLM:
+    - mémoire: LRU borné en nombre d'entrées
+    - disque: un fichier JSON par clé, avec TTL et éviction par taille totale
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_disk_bytes: int = DEFAULT_DISK_MAX_BYTES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    ):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # taille du dossier tenue à jour à chaque écriture: le dossier n'est
+        # parcouru qu'au premier set() et quand la limite est dépassée
+        self._disk_bytes: Optional[int] = None
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMResponseCache":
+        return cls(
+            cache_dir=os.getenv("LLM_CACHE_DIR", DEFAULT_CACHE_DIR),
+            max_memory_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MEMORY_ENTRIES)),
+            max_disk_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", DEFAULT_DISK_MAX_BYTES)),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+        )
+
+    # --------------------------------------------------------
+    # Helpers
+    # --------------------------------------------------------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and (time.time() - created_at) > self.ttl_seconds
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    # --------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------
+    def get(self, key: str) -> Optional[str]:
+        # 1) mémoire
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._expired(entry["created_at"]):
+                    del self._memory[key]
+                else:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry["response"]
+
+        # 2) disque
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if self._expired(entry.get("created_at", 0)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.misses += 1
+            return None
+
+        self._remember(key, entry)
+        self.hits += 1
+        return entry["response"]
+
+    def set(self, key: str, response: str) -> None:
+        entry = {"created_at": time.time(), "response": response}
+        self._remember(key, entry)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes += len(data) - previous
+                needs_sweep = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+            if needs_sweep:
+                self._evict_disk()
+        except OSError as e:
+            print("[LLMCache] ⚠️ Écriture disque impossible:", e)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._disk_bytes = None
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def _evict_disk(self) -> None:
+        """
+        Supprime les entrées expirées, puis les plus anciennes
+        jusqu'à repasser sous max_disk_bytes. Recalcule la taille totale du dossier.
+        """
+        files = []
+        total = 0
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if self.ttl_seconds > 0 and now - st.st_mtime > self.ttl_seconds:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        if total > self.max_disk_bytes:
+            files.sort()
+            for _, size, path in files:
+                if total <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+        }
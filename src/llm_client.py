@@ -2,12 +2,49 @@
 
 import os
 import json
-from openai import OpenAI
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+from llm_cache import LLMResponseCache, make_cache_key
 
 DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
 
+# Pool HTTP partagé par tous les LLMClient du process (worker LiveKit: une room = une tâche)
+ASYNC_MAX_CONNECTIONS = int(os.getenv("OPENAI_ASYNC_MAX_CONNECTIONS", "50"))
+ASYNC_MAX_KEEPALIVE = int(os.getenv("OPENAI_ASYNC_MAX_KEEPALIVE", "20"))
+
+_async_clients: Dict[str, AsyncOpenAI] = {}
+
+
+def get_shared_async_client(api_key: str) -> AsyncOpenAI:
+    """
+    Retourne un AsyncOpenAI unique par clé API, adossé à un httpx.AsyncClient
+    avec keep-alive, pour réutiliser les connexions entre appels et entre rooms.
+    """
+    client = _async_clients.get(api_key)
+    if client is None:
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=ASYNC_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(60.0, connect=10.0),
+        )
+        client = AsyncOpenAI(api_key=api_key, http_client=http_client)
+        _async_clients[api_key] = client
+    return client
+
+
+async def close_shared_async_clients() -> None:
+    for client in list(_async_clients.values()):
+        await client.close()
+    _async_clients.clear()
+
+
 class LLMClient:
-    def __init__(self):
+    def __init__(self, cache: Optional[LLMResponseCache] = None):
         # IMPORTANT: Read env variables here (AFTER load_dotenv ran)
         api_key = os.getenv("OPENAI_API_KEY")
         model = os.getenv("OPENAI_MODEL", DEFAULT_OPENAI_MODEL)
@@ -16,29 +53,199 @@ class LLMClient:
             raise ValueError("Missing OPENAI_API_KEY in .env")
 
         self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
         self.model = model
 
-    def chat(self, system_prompt: str, user_prompt: str) -> str:
-        resp = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ]
-        )
-        return resp.choices[0].message.content
+        # Cache des réponses (désactivable avec LLM_CACHE_ENABLED=0)
+        if cache is None and os.getenv("LLM_CACHE_ENABLED", "1") != "0":
+            cache = LLMResponseCache.from_env()
+        self.cache = cache
+
+    def _messages(self, system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
 
-    def chat_json(self, system_prompt: str, user_prompt: str, schema_hint: str):
-        full = (
+    def _json_prompt(self, user_prompt: str, schema_hint: str) -> str:
+        return (
             f"{user_prompt}\n\n"
             "Répond STRICTEMENT en JSON.\n"
             f"Format attendu: {schema_hint}"
         )
-        raw = self.chat(system_prompt, full)
 
+    def parse_json(self, raw: str):
         try:
             return json.loads(raw)
         except:
             start = raw.find("{")
             end = raw.rfind("}")
             return json.loads(raw[start:end+1])
+
+    def _is_valid(self, content: Optional[str], schema_hint: Optional[str]) -> bool:
+        """Réponse JSON attendue: seule une réponse parsable est mise en cache."""
+        if not content:
+            return False
+        if schema_hint is None:
+            return True
+        try:
+            self.parse_json(content)
+            return True
+        except (ValueError, TypeError):
+            return False
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        return get_shared_async_client(self.api_key)
+
+    def _cache_lookup(self, messages: List[Dict[str, str]], schema_hint: Optional[str], use_cache: bool):
+        """
+        Retourne (clé, réponse en cache ou None). Clé None si cache inactif.
+        Une entrée JSON illisible (écrite par une version antérieure) est supprimée.
+        """
+        if not use_cache or self.cache is None:
+            return None, None
+        key = make_cache_key(self.model, messages, schema_hint)
+        cached = self.cache.get(key)
+        if cached is not None and not self._is_valid(cached, schema_hint):
+            self.cache.delete(key)
+            cached = None
+        return key, cached
+
+    def _store(self, key: Optional[str], content: Optional[str], schema_hint: Optional[str]) -> None:
+        if key is not None and self._is_valid(content, schema_hint):
+            self.cache.set(key, content)
+
+    def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        schema_hint: Optional[str],
+        use_cache: bool,
+        parse: Optional[Callable[[str], Any]] = None,
+    ):
+        """
+        Appel (ou cache) puis `parse` éventuel. La réponse n'est mise en cache
+        qu'une fois le parsing réussi: une réponse malformée n'est jamais rejouée.
+        """
+        key, cached = self._cache_lookup(messages, schema_hint, use_cache)
+        if cached is not None:
+            return parse(cached) if parse else cached
+
+        resp = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+        )
+        content = resp.choices[0].message.content
+        result = parse(content) if parse else content
+
+        self._store(key, content, schema_hint)
+        return result
+
+    async def _acomplete(
+        self,
+        messages: List[Dict[str, str]],
+        schema_hint: Optional[str],
+        use_cache: bool,
+        parse: Optional[Callable[[str], Any]] = None,
+    ):
+        key, cached = self._cache_lookup(messages, schema_hint, use_cache)
+        if cached is not None:
+            return parse(cached) if parse else cached
+
+        resp = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+        )
+        content = resp.choices[0].message.content
+        result = parse(content) if parse else content
+
+        self._store(key, content, schema_hint)
+        return result
+
+    def chat(self, system_prompt: str, user_prompt: str, use_cache: bool = True) -> str:
+        return self._complete(self._messages(system_prompt, user_prompt), None, use_cache)
+
+    def chat_json(self, system_prompt: str, user_prompt: str, schema_hint: str, use_cache: bool = True):
+        full = self._json_prompt(user_prompt, schema_hint)
+        return self._complete(self._messages(system_prompt, full), schema_hint, use_cache, parse=self.parse_json)
+
+    # --------------------------------------------------------
+    # Async variants (worker LiveKit / event loop)
+    # --------------------------------------------------------
+    async def achat(self, system_prompt: str, user_prompt: str, use_cache: bool = True) -> str:
+        return await self._acomplete(self._messages(system_prompt, user_prompt), None, use_cache)
+
+    async def achat_json(self, system_prompt: str, user_prompt: str, schema_hint: str, use_cache: bool = True):
+        full = self._json_prompt(user_prompt, schema_hint)
+        return await self._acomplete(self._messages(system_prompt, full), schema_hint, use_cache, parse=self.parse_json)
+
+    # --------------------------------------------------------
+    # Streaming (deltas de texte au fil de la génération)
+    # --------------------------------------------------------
+    def _stream_messages(self, system_prompt: str, user_prompt: str, schema_hint: Optional[str]) -> List[Dict[str, str]]:
+        if schema_hint is not None:
+            user_prompt = self._json_prompt(user_prompt, schema_hint)
+        return self._messages(system_prompt, user_prompt)
+
+    def chat_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        schema_hint: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> Iterator[str]:
+        """
+        Renvoie les deltas de texte au fur et à mesure.
+        Avec schema_hint, le prompt est celui de chat_json (même clé de cache),
+        et la réponse complète n'est mise en cache que si elle est du JSON valide.
+        """
+        messages = self._stream_messages(system_prompt, user_prompt, schema_hint)
+        key, cached = self._cache_lookup(messages, schema_hint, use_cache)
+        if cached is not None:
+            yield cached
+            return
+
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True,
+        )
+        parts = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+
+        self._store(key, "".join(parts), schema_hint)
+
+    async def achat_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        schema_hint: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        messages = self._stream_messages(system_prompt, user_prompt, schema_hint)
+        key, cached = self._cache_lookup(messages, schema_hint, use_cache)
+        if cached is not None:
+            yield cached
+            return
+
+        stream = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True,
+        )
+        parts = []
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+
+        self._store(key, "".join(parts), schema_hint)
@@ -18,10 +18,12 @@ if ROOT not in sys.path:
 # ---------------------------------------------------------
 from llm_client import LLMClient
 from agents.manager_agent import ManagerAgent
+from agents.question_agent import QuestionAgent
 from agents.summary_agent import SummaryAgent
 from models.data_models import CVData, JobData
 from services.cv_parser import parse_cv
 from services.job_scraper import scrape_job_url
+from services.export_queue import get_export_queue
 from core.interview_simulator import InterviewSimulator
 
 # ---------------------------------------------------------
@@ -105,9 +107,15 @@ if submit:
             cv_data = parse_cv(pdf_path, llm)
             job_data = scrape_job_url(job_url)
 
+            # Plan d'entretien calculé une fois: la plupart des tours n'appellent plus le LLM
+            plan = None
+            if os.getenv("INTERVIEW_PLAN", "1") == "1":
+                plan = QuestionAgent(llm, cv_data, job_data).build_interview_plan(num_questions)
+
             st.session_state["cv_data"] = cv_data
             st.session_state["job_data"] = job_data
             st.session_state["num_q"] = num_questions
+            st.session_state["plan"] = plan
 
         st.success("Analyse terminée. Faites défiler pour lancer la simulation.")
 
@@ -160,7 +168,14 @@ if "cv_data" in st.session_state and "job_data" in st.session_state:
 
     if st.button("Lancer la simulation d'entretien"):
         llm = LLMClient()
-        manager = ManagerAgent(llm=llm, cv=cv, job=job, base_questions=[])
+        manager = ManagerAgent(
+            llm=llm,
+            cv=cv,
+            job=job,
+            base_questions=[],
+            plan=st.session_state.get("plan"),
+            max_questions=num_q,
+        )
 
         simulator = InterviewSimulator(
             manager=manager,
@@ -188,5 +203,11 @@ if "cv_data" in st.session_state and "job_data" in st.session_state:
             st.markdown('<div class="card">', unsafe_allow_html=True)
             st.markdown(summary_md)
             st.markdown("</div>", unsafe_allow_html=True)
+
+            # export Notion + fichier en arrière-plan: le rendu n'attend pas Notion
+            export_queue = get_export_queue()
+            export_queue.enqueue(f"Entretien · {job.structured.get('title') or 'Poste'}", summary_md)
+            # livraison asynchrone: seule la profondeur de la file a un sens à cet instant
+            st.caption(f"Export en arrière-plan · {export_queue.depth()} rapport(s) en file (Notion + fichier).")
 else:
     st.info("Commence par uploader un CV et une offre, puis clique sur **Analyser le CV et l'offre**.")
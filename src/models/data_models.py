@@ -1,7 +1,7 @@
 # models/data_models.py
 
-from dataclasses import dataclass
-from typing import Dict, Any
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List
 
 @dataclass
 class CVData:
@@ -17,3 +17,48 @@ class JobData:
 class QAExchange:
     question: str
     answer: str
+
+@dataclass
+class PlanFollowUp:
+    question: str
+    if_answer_mentions: List[str] = field(default_factory=list)
+
+@dataclass
+class PlanStep:
+    question: str
+    topic: str = ""
+    expected_keywords: List[str] = field(default_factory=list)
+    follow_ups: List[PlanFollowUp] = field(default_factory=list)
+
+@dataclass
+class InterviewPlan:
+    steps: List[PlanStep]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "InterviewPlan":
+        steps = []
+        for item in (data or {}).get("steps", []) or []:
+            if not isinstance(item, dict) or not (item.get("question") or "").strip():
+                continue
+            follow_ups = [
+                PlanFollowUp(
+                    question=fu["question"].strip(),
+                    if_answer_mentions=list(fu.get("if_answer_mentions") or []),
+                )
+                for fu in item.get("follow_ups", []) or []
+                if isinstance(fu, dict) and (fu.get("question") or "").strip()
+            ]
+            steps.append(PlanStep(
+                question=item["question"].strip(),
+                topic=item.get("topic", "") or "",
+                expected_keywords=list(item.get("expected_keywords") or []),
+                follow_ups=follow_ups,
+            ))
+        return cls(steps=steps)
+
+    @classmethod
+    def from_questions(cls, questions: List[str]) -> "InterviewPlan":
+        return cls(steps=[PlanStep(question=q.strip()) for q in questions if q and q.strip()])
@@ -1,14 +1,68 @@
 # models/memory.py
 
-from typing import List
+import threading
+from typing import List, Optional
 from models.data_models import QAExchange
+from utils.context_builder import estimate_tokens, truncate_to_tokens
 
 class ConversationMemory:
-    def __init__(self):
+    """
+    Historique des échanges.
+    - window=None : tout l'historique est envoyé au LLM (comportement historique)
+    - window=N    : seuls les N derniers échanges sont envoyés tels quels,
+                    les plus anciens sont résumés incrémentalement dans `summary`
+    `history` garde toujours tous les échanges (pour le résumé final).
+    Le résumé peut être calculé en arrière-plan: tant qu'un échange sorti de la
+    fenêtre n'est pas intégré au résumé, il reste envoyé tel quel.
+    """
+
+    def __init__(self, window: Optional[int] = None, max_summary_tokens: int = 300):
         self.history: List[QAExchange] = []
+        self.window = window
+        self.max_summary_tokens = max_summary_tokens
+        self.summary = ""
+        self.summarized_count = 0   # nb d'échanges déjà intégrés au résumé
+        self._lock = threading.Lock()
 
     def add_exchange(self, q: str, a: str):
-        self.history.append(QAExchange(question=q, answer=a))
+        with self._lock:
+            self.history.append(QAExchange(question=q, answer=a))
 
     def get_history(self):
         return self.history
+
+    # --------------------------------------------------------
+    # Fenêtre glissante
+    # --------------------------------------------------------
+    def get_recent(self) -> List[QAExchange]:
+        if self.window is None:
+            return self.history
+        # fenêtre + échanges pas encore résumés (résumé en cours en arrière-plan)
+        with self._lock:
+            return self.history[self.summarized_count:]
+
+    def pending_for_summary(self) -> List[QAExchange]:
+        """Échanges sortis de la fenêtre mais pas encore résumés."""
+        if self.window is None:
+            return []
+        with self._lock:
+            end = len(self.history) - self.window
+            if end <= self.summarized_count:
+                return []
+            return self.history[self.summarized_count:end]
+
+    def fold(self, new_summary: str, count: int) -> None:
+        """Remplace le résumé et marque `count` échanges supplémentaires comme résumés."""
+        new_summary = " ".join((new_summary or "").split())
+        if estimate_tokens(new_summary) > self.max_summary_tokens:
+            new_summary = truncate_to_tokens(new_summary, self.max_summary_tokens)
+        with self._lock:
+            self.summary = new_summary
+            self.summarized_count += count
+
+    def prompt_tokens(self) -> int:
+        """Tokens estimés de ce qui est envoyé au LLM (résumé + fenêtre)."""
+        total = estimate_tokens(self.summary)
+        for ex in self.get_recent():
+            total += estimate_tokens(ex.question) + estimate_tokens(ex.answer)
+        return total
@@ -0,0 +1,213 @@
+# src/services/cv_batch.py
+#
+# Ingestion de CV en masse (cohortes):
+#   cd src && python -m services.cv_batch <dossier | manifest.txt | manifest.jsonl> -o exports/cvs.jsonl
+#
+# - extraction texte/OCR sur un pool de process
+# - structuration LLM sur un pool async à concurrence limitée
+# - nombre de CV en cours borné (file de travail + workers), quelle que soit la taille de la cohorte
+# - résultats écrits en JSONL au fil de l'eau, reprise possible après interruption
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from llm_client import LLMClient, close_shared_async_clients
+from services.cv_cache import file_sha256
+from services.cv_parser import get_cv_text, aget_cv_structured
+from services.cv_rules import rule_stats
+
+
+def discover_inputs(source: str) -> List[str]:
+    """
+    - dossier: tous les .pdf (récursif, ordre alphabétique)
+    - manifest .jsonl: une ligne {"path": "..."} par CV
+    - autre fichier: un chemin par ligne (# = commentaire)
+    Les chemins relatifs d'un manifest sont relatifs à son dossier.
+    """
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith(".pdf"):
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if source.endswith(".jsonl"):
+                line = json.loads(line).get("path", "")
+            if line:
+                paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return paths
+
+
+def load_done(output_path: str) -> Set[str]:
+    """SHA-256 des CV déjà traités avec succès (pour la reprise)."""
+    done: Set[str] = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue  # dernière ligne tronquée par une interruption
+            if row.get("status") == "ok" and row.get("sha256"):
+                done.add(row["sha256"])
+    return done
+
+
+def _extract_worker(path: str, use_cache: bool) -> Dict[str, Any]:
+    """Exécuté dans un process du pool: texte du CV (OCR séquentiel dans le worker)."""
+    t0 = time.perf_counter()
+    try:
+        raw_text = get_cv_text(path, use_cache=use_cache, max_workers=1)
+        return {"raw_text": raw_text, "extract_s": time.perf_counter() - t0}
+    except Exception as e:
+        return {"error": f"extraction: {e}", "extract_s": time.perf_counter() - t0}
+
+
+async def run_batch(
+    source: str,
+    output_path: str,
+    ocr_workers: Optional[int] = None,
+    llm_concurrency: int = 4,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    paths = discover_inputs(source)
+    done = load_done(output_path)
+
+    todo = []
+    seen: Set[str] = set()
+    for path in paths:
+        try:
+            sha = file_sha256(path)
+        except OSError as e:
+            print(f"[Batch] ⚠️ Fichier illisible, ignoré: {path} ({e})")
+            continue
+        if sha in done or sha in seen:
+            continue
+        seen.add(sha)
+        todo.append((path, sha))
+
+    print(f"[Batch] {len(paths)} CV trouvés, {len(paths) - len(todo)} déjà traités/doublons, {len(todo)} à traiter.")
+    stats: Dict[str, Any] = {"ok": 0, "errors": 0, "extract_s": 0.0, "llm_s": 0.0}
+    if not todo:
+        return stats
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    llm = LLMClient()
+    loop = asyncio.get_running_loop()
+    # borne les appels LLM eux-mêmes: un CV long en mode sections en fait un par section
+    llm_limiter = asyncio.Semaphore(max(1, llm_concurrency))
+    workers = ocr_workers or os.cpu_count() or 1
+    t_start = time.perf_counter()
+
+    try:
+        with open(output_path, "a", encoding="utf-8") as out, ProcessPoolExecutor(max_workers=workers) as pool:
+
+            def write(row: Dict[str, Any]) -> None:
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                out.flush()
+
+            async def handle(path: str, sha: str) -> None:
+                row: Dict[str, Any] = {"path": path, "sha256": sha}
+                extracted = await loop.run_in_executor(pool, _extract_worker, path, use_cache)
+                row["timings"] = {"extract_s": round(extracted["extract_s"], 3)}
+                stats["extract_s"] += extracted["extract_s"]
+
+                if "error" in extracted:
+                    row.update(status="error", error=extracted["error"])
+                else:
+                    # inclut l'attente des créneaux LLM (partagés entre les CV en cours)
+                    t0 = time.perf_counter()
+                    try:
+                        structured = await aget_cv_structured(
+                            extracted["raw_text"], llm, use_cache=use_cache, limiter=llm_limiter
+                        )
+                        row.update(status="ok", raw_text=extracted["raw_text"], structured=structured)
+                    except Exception as e:
+                        row.update(status="error", error=f"llm: {e}")
+                    llm_s = time.perf_counter() - t0
+                    row["timings"]["llm_s"] = round(llm_s, 3)
+                    stats["llm_s"] += llm_s
+
+                stats["ok" if row["status"] == "ok" else "errors"] += 1
+                write(row)
+                print(f"[Batch] {row['status']:>5} {path} {row['timings']}")
+
+            # file bornée: assez de workers pour occuper le pool d'extraction et les créneaux LLM,
+            # sans créer une tâche (ni garder un texte en mémoire) par CV de la cohorte
+            jobs: "asyncio.Queue[Tuple[str, str]]" = asyncio.Queue()
+            for item in todo:
+                jobs.put_nowait(item)
+
+            async def worker() -> None:
+                while True:
+                    try:
+                        path, sha = jobs.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    await handle(path, sha)
+
+            await asyncio.gather(*(worker() for _ in range(min(len(todo), workers + max(1, llm_concurrency)))))
+    finally:
+        # connexions keep-alive liées à la boucle de asyncio.run(): fermées avant qu'elle ne s'arrête
+        await close_shared_async_clients()
+
+    elapsed = time.perf_counter() - t_start
+    processed = stats["ok"] + stats["errors"]
+    stats["elapsed_s"] = elapsed
+    stats["cv_per_minute"] = processed * 60 / elapsed if elapsed else 0.0
+
+    print(
+        f"[Batch] ✅ {stats['ok']} ok, {stats['errors']} erreurs en {elapsed:.1f}s "
+        f"→ {stats['cv_per_minute']:.1f} CV/min"
+    )
+    if processed:
+        print(
+            f"[Batch] Temps moyen par CV: extraction {stats['extract_s'] / processed:.2f}s, "
+            f"LLM {stats['llm_s'] / processed:.2f}s"
+        )
+    if rule_stats.documents:
+        print(rule_stats.report())
+        stats["llm_calls_saved"] = rule_stats.calls_saved
+        stats["prompt_tokens_saved"] = rule_stats.tokens_saved
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Ingestion de CV en masse -> JSONL")
+    parser.add_argument("source", help="dossier de PDF ou manifest (.txt / .jsonl)")
+    parser.add_argument("-o", "--output", default=os.path.join("exports", "cv_batch.jsonl"))
+    parser.add_argument("--ocr-workers", type=int, default=None, help="process d'extraction (défaut: nb de cœurs)")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="appels LLM simultanés")
+    parser.add_argument("--no-cache", action="store_true", help="ignorer le cache des CV")
+    args = parser.parse_args(argv)
+
+    asyncio.run(run_batch(
+        args.source,
+        args.output,
+        ocr_workers=args.ocr_workers,
+        llm_concurrency=args.llm_concurrency,
+        use_cache=not args.no_cache,
+    ))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
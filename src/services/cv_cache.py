@@ -0,0 +1,85 @@
+# src/services/cv_cache.py
+#
+# Cache persistant des CV parsés, par contenu:
+# - étape texte (couche PDF + OCR): clé = SHA-256 du PDF + version de l'extracteur
+# - étape LLM (JSON structuré):     clé = SHA-256 du texte brut + version du prompt + modèle
+# Changer le prompt n'oblige donc pas à refaire l'OCR.
+
+import os
+import json
+import time
+import hashlib
+from typing import Any, Dict, Optional
+
+DEFAULT_CV_CACHE_DIR = os.path.join(".cache", "cv")
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _sha256_text(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class CVCache:
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.getenv("CV_CACHE_DIR", DEFAULT_CV_CACHE_DIR)
+
+    # --------------------------------------------------------
+    # Clés
+    # --------------------------------------------------------
+    @staticmethod
+    def text_key(pdf_sha256: str, extractor_version: str) -> str:
+        return _sha256_text("text", pdf_sha256, extractor_version)
+
+    @staticmethod
+    def structured_key(raw_text: str, prompt_version: str, model: str) -> str:
+        return _sha256_text("structured", raw_text, prompt_version, model)
+
+    # --------------------------------------------------------
+    # Stockage
+    # --------------------------------------------------------
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, f"{key}.json")
+
+    def _read(self, stage: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(stage, key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, stage: str, key: str, entry: Dict[str, Any]) -> None:
+        path = self._path(stage, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            entry["created_at"] = time.time()
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print("[CVCache] ⚠️ Écriture impossible:", e)
+
+    def get_text(self, key: str) -> Optional[str]:
+        entry = self._read("text", key)
+        return entry.get("raw_text") if entry else None
+
+    def set_text(self, key: str, raw_text: str) -> None:
+        self._write("text", key, {"raw_text": raw_text})
+
+    def get_structured(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._read("structured", key)
+        return entry.get("structured") if entry else None
+
+    def set_structured(self, key: str, structured: Dict[str, Any]) -> None:
+        self._write("structured", key, {"structured": structured})
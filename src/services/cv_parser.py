@@ -1,85 +1,309 @@
 # src/services/cv_parser.py
 
 import os
-from typing import List
+import asyncio
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import pypdf
-import pytesseract
-from pytesseract import TesseractNotFoundError
-from pdf2image import convert_from_path
-from PIL import Image
+from pdf2image import convert_from_path, pdfinfo_from_path
+from PIL import ImageOps
+
+if TYPE_CHECKING:
+    from PIL import Image
 
 # Absolute imports (no more "..")
 from models.data_models import CVData
 from llm_client import LLMClient
+from utils.context_builder import estimate_tokens
+from utils.resources import peak_rss_mb, reset_peak_rss
+from services.cv_cache import CVCache, file_sha256
+from services.cv_rules import (
+    CV_RULES_ENABLED,
+    CV_RULES_SKIP_CONFIDENCE,
+    CV_RULES_VERSION,
+    PreExtraction,
+    merge_with_llm,
+    pre_extract,
+    rule_stats,
+)
+from services.ocr_backend import get_ocr_backend, ocr_backend_name
+from services.cv_sections import (
+    aextract_by_sections,
+    alimited_chat_json,
+    extract_by_sections,
+    is_complete,
+    is_sectionable,
+    sections_prompt_version,
+)
+
+OCR_DPI = 200
+
+# OCR adaptatif: passe rapide à basse résolution, puis nouvelle passe à haute
+# résolution uniquement pour les pages dont la confiance Tesseract est trop basse
+OCR_FAST_DPI = int(os.getenv("CV_OCR_FAST_DPI", "150"))
+OCR_HIGH_DPI = int(os.getenv("CV_OCR_HIGH_DPI", "300"))
+OCR_MIN_CONFIDENCE = float(os.getenv("CV_OCR_MIN_CONFIDENCE", "70"))
+OCR_BINARIZE = os.getenv("CV_OCR_BINARIZE", "1") != "0"
+# psm 3: segmentation automatique (gère les CV en colonnes); oem 1: moteur LSTM
+TESSERACT_CONFIG = os.getenv("CV_OCR_TESSERACT_CONFIG", "--oem 1 --psm 3 -c preserve_interword_spaces=1")
+
+# Nb de pages rasterisées à la fois (mémoire bornée quel que soit le nb de pages)
+RASTER_WINDOW = int(os.getenv("CV_RASTER_WINDOW", "1"))
 
-# chemins possibles pour tesseract selon l'OS / installation
-TESSERACT_CANDIDATE_PATHS: List[str] = [
-    "/opt/homebrew/bin/tesseract",   # macOS (Homebrew Apple Silicon)
-    "/usr/local/bin/tesseract",      # macOS (Homebrew Intel) / Linux
-    "/usr/bin/tesseract",            # Linux
-]
+# Couche texte pypdf jugée exploitable au-dessus de ce score (0 -> 1)
+TEXT_LAYER_MIN_QUALITY = float(os.getenv("CV_TEXT_MIN_QUALITY", "0.6"))
+TEXT_LAYER_MIN_CHARS = 80
 
 
-def ensure_tesseract_available() -> None:
+def _page_count(path: str) -> int:
+    try:
+        return int(pdfinfo_from_path(path)["Pages"])
+    except Exception:
+        return len(pypdf.PdfReader(path).pages)
+
+
+def iter_pdf_pages(
+    path: str,
+    dpi: int = OCR_DPI,
+    pages: Optional[Iterable[int]] = None,
+    window: int = RASTER_WINDOW,
+) -> Iterator[Tuple[int, "Image.Image"]]:
     """
-    Essaie de configurer pytesseract.pytesseract.tesseract_cmd
-    en cherchant tesseract dans quelques chemins classiques.
-    Si rien n'est trouvé, lève une RuntimeError avec un message clair.
+    Rasterise le PDF par fenêtres de `window` pages consécutives et
+    renvoie (numéro de page, image) au fil de l'eau.
+    L'appelant doit fermer chaque image (img.close()) une fois traitée:
+    au plus `window` pages sont en mémoire à un instant donné.
     """
-    # si déjà configuré et accessible, on ne touche à rien
-    current_cmd = pytesseract.pytesseract.tesseract_cmd
-    if current_cmd and os.path.exists(current_cmd):
-        return
+    if pages is None:
+        pages = range(1, _page_count(path) + 1)
+    pages = list(pages)
+    window = max(1, window)
+
+    i = 0
+    while i < len(pages):
+        j = i
+        while j + 1 < len(pages) and pages[j + 1] == pages[j] + 1 and j + 1 - i < window:
+            j += 1
+        first, last = pages[i], pages[j]
+        images = convert_from_path(path, dpi=dpi, first_page=first, last_page=last)
+        page_number = first
+        while images:
+            yield page_number, images.pop(0)
+            page_number += 1
+        i = j + 1
+
+
+@dataclass
+class OCRPageResult:
+    page: int
+    text: str
+    dpi: int
+    confidence: float     # moyenne des mots (0 -> 100), -1 si aucun mot reconnu
+    raster_s: float
+    ocr_s: float
+
+
+def _otsu_threshold(gray: "Image.Image") -> int:
+    """Seuil de binarisation d'Otsu calculé sur l'histogramme (sans numpy)."""
+    hist = gray.histogram()[:256]
+    total = sum(hist)
+    sum_all = sum(i * h for i, h in enumerate(hist))
+    sum_bg, weight_bg = 0.0, 0
+    best, threshold = 0.0, 127
+    for i, h in enumerate(hist):
+        weight_bg += h
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += i * h
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if between > best:
+            best, threshold = between, i
+    return threshold
+
+
+def preprocess_image(img: "Image.Image") -> "Image.Image":
+    """Niveaux de gris + contraste automatique + binarisation (moins de travail pour Tesseract)."""
+    gray = ImageOps.autocontrast(img.convert("L"))
+    if not OCR_BINARIZE:
+        return gray
+    threshold = _otsu_threshold(gray)
+    binary = gray.point(lambda v: 255 if v > threshold else 0, mode="1")
+    gray.close()
+    return binary
 
-    # sinon on essaie de deviner
-    for path in TESSERACT_CANDIDATE_PATHS:
-        if os.path.exists(path):
-            pytesseract.pytesseract.tesseract_cmd = path
-            print(f"[OCR] ✅ Tesseract trouvé: {path}")
-            return
-
-    # si rien trouvé -> erreur explicite
-    raise RuntimeError(
-        "[OCR] ❌ Tesseract introuvable.\n"
-        "Installe-le d'abord, par exemple sur macOS:\n"
-        "  brew install tesseract\n"
-        "Puis relance le programme."
-    )
 
+def _data_to_text(data: Dict[str, List[Any]]) -> Tuple[str, float]:
+    """Reconstruit le texte (lignes / blocs) et la confiance moyenne depuis image_to_data."""
+    lines: Dict[Tuple[int, int, int], List[str]] = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        word = (word or "").strip()
+        conf = float(data["conf"][i])
+        if not word or conf < 0:
+            continue
+        confidences.append(conf)
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
 
-def pdf_to_images(path: str):
+    out, previous_block = [], None
+    for (block, _, _), words in lines.items():
+        if previous_block is not None and block != previous_block:
+            out.append("")
+        out.append(" ".join(words))
+        previous_block = block
+    confidence = sum(confidences) / len(confidences) if confidences else -1.0
+    return "\n".join(out), confidence
+
+
+def _ocr_image(img) -> Tuple[str, float]:
+    """OCR d'une image prétraitée -> (texte, confiance moyenne)."""
+    prepared = preprocess_image(img)
+    try:
+        data = get_ocr_backend(TESSERACT_CONFIG).image_to_data(prepared, TESSERACT_CONFIG)
+    finally:
+        prepared.close()
+    return _data_to_text(data)
+
+
+def _ocr_page_range(path: str, pages: List[int], dpi: int) -> List[OCRPageResult]:
     """
-    Convertit chaque page du PDF en image (format PIL).
-    pdf2image nécessite poppler installé sur la machine.
+    Rasterise + OCR des pages données en streaming (une fenêtre à la fois),
+    chaque image étant libérée dès que son texte est extrait.
     """
-    print(f"[OCR] 📄 Conversion PDF -> images: {path}")
-    return convert_from_path(path, dpi=200)
+    get_ocr_backend(TESSERACT_CONFIG)
+
+    results = []
+    pages_iter = iter_pdf_pages(path, dpi=dpi, pages=pages)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            page_number, img = next(pages_iter)
+        except StopIteration:
+            break
+        t1 = time.perf_counter()
+        try:
+            text, confidence = _ocr_image(img)
+        finally:
+            img.close()
+        t2 = time.perf_counter()
+        results.append(OCRPageResult(page_number, text, dpi, confidence, t1 - t0, t2 - t1))
+    return results
+
+
+def _ocr_page_worker(args: Tuple[str, int, int]) -> OCRPageResult:
+    """Rasterise UNE page puis l'OCR (exécuté dans un process du pool)."""
+    path, page_number, dpi = args
+    results = _ocr_page_range(path, [page_number], dpi)
+    if not results:
+        return OCRPageResult(page_number, "", dpi, -1.0, 0.0, 0.0)
+    return results[0]
+
+
+def _ocr_workers(page_total: int, max_workers: Optional[int]) -> int:
+    if max_workers is None:
+        max_workers = int(os.getenv("CV_OCR_MAX_WORKERS", "0")) or (os.cpu_count() or 1)
+    return max(1, min(max_workers, page_total))
+
+
+def _ocr_pass(path: str, pages: List[int], dpi: int, pool: Optional[ProcessPoolExecutor]) -> List[OCRPageResult]:
+    if pool is None:
+        return _ocr_page_range(path, pages, dpi)
+    return list(pool.map(_ocr_page_worker, [(path, n, dpi) for n in pages]))
+
+
+def _ocr_passes(path: str, pages: List[int], pool: Optional[ProcessPoolExecutor]) -> Tuple[Dict[int, OCRPageResult], List[int]]:
+    """Passe rapide puis reprise haute résolution, sur le même pool (moteur OCR déjà chargé par worker)."""
+    results = {r.page: r for r in _ocr_pass(path, pages, OCR_FAST_DPI, pool)}
 
+    retry = [n for n, r in results.items() if r.confidence < OCR_MIN_CONFIDENCE]
+    if retry and OCR_HIGH_DPI > OCR_FAST_DPI:
+        print(f"[OCR] 🔁 {len(retry)} page(s) sous {OCR_MIN_CONFIDENCE:.0f}% de confiance -> {OCR_HIGH_DPI} DPI")
+        for second in _ocr_pass(path, retry, OCR_HIGH_DPI, pool):
+            first = results[second.page]
+            best = second if second.confidence >= first.confidence else first
+            # le temps de la première passe reste compté
+            best.raster_s, best.ocr_s = first.raster_s + second.raster_s, first.ocr_s + second.ocr_s
+            results[second.page] = best
+    return results, retry
 
-def ocr_images(images) -> str:
+
+def ocr_pdf_page_results(
+    path: str,
+    pages: Optional[List[int]] = None,
+    max_workers: Optional[int] = None,
+) -> Dict[int, OCRPageResult]:
     """
-    OCR simple sur chaque image -> concaténation du texte brut.
-    Utilise Tesseract, avec gestion d'erreur claire si non installé.
+    OCR adaptatif, réparti sur un pool de process:
+    1) toutes les pages à OCR_FAST_DPI (image prétraitée)
+    2) seules les pages sous OCR_MIN_CONFIDENCE sont refaites à OCR_HIGH_DPI,
+       et on garde le résultat le plus confiant
+    Retourne {numéro de page (1-based): résultat (texte, DPI, confiance, durées)}.
     """
-    ensure_tesseract_available()
+    if pages is None:
+        pages = list(range(1, _page_count(path) + 1))
+    if not pages:
+        return {}
+
+    get_ocr_backend(TESSERACT_CONFIG)
+    workers = _ocr_workers(len(pages), max_workers)
+    print(f"[OCR] 📄 {len(pages)} page(s) à OCR, {workers} worker(s): {path}")
 
-    all_text = []
-    for idx, img in enumerate(images):
+    t0 = time.perf_counter()
+    if workers == 1:
+        results, retry = _ocr_passes(path, pages, None)
+    else:
         try:
-            print(f"[OCR] 🔍 OCR page {idx + 1}/{len(images)}...")
-            text = pytesseract.image_to_string(img)
-            if text:
-                all_text.append(text)
-        except TesseractNotFoundError:
-            raise RuntimeError(
-                "[OCR] ❌ Tesseract non trouvé pendant l'OCR.\n"
-                "Vérifie l'installation (brew install tesseract) "
-                "et que le binaire est dans le PATH."
-            )
-    full_text = "\n".join(all_text)
-    print(f"[OCR] ✅ OCR terminé, {len(full_text)} caractères extraits.")
-    return full_text
+            # un seul pool pour les deux passes
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results, retry = _ocr_passes(path, pages, pool)
+        except BrokenProcessPool as e:
+            # ex: environnement qui interdit le fork/spawn -> séquentiel
+            print("[OCR] ⚠️ Pool de process indisponible, OCR séquentiel:", e)
+            results, retry = _ocr_passes(path, pages, None)
+
+    cpu_s = 0.0
+    for n in sorted(results):
+        r = results[n]
+        cpu_s += r.raster_s + r.ocr_s
+        print(
+            f"[OCR] 🔍 page {n}: {r.dpi} DPI, confiance {r.confidence:.0f}%, "
+            f"rasterisation {r.raster_s:.2f}s, OCR {r.ocr_s:.2f}s, {len(r.text)} caractères"
+        )
+    print(
+        f"[OCR] ✅ OCR terminé en {time.perf_counter() - t0:.2f}s "
+        f"({cpu_s:.2f}s cumulées, {len(retry)}/{len(pages)} page(s) refaites en haute résolution)"
+    )
+    return results
+
+
+def ocr_pdf_pages(
+    path: str,
+    pages: Optional[List[int]] = None,
+    max_workers: Optional[int] = None,
+) -> Dict[int, str]:
+    """
+    Rasterisation + OCR page par page, réparties sur un pool de process
+    (taille = nb de cœurs, plafonnée par max_workers / CV_OCR_MAX_WORKERS).
+    Retourne {numéro de page (1-based): texte}.
+    """
+    return {n: r.text for n, r in ocr_pdf_page_results(path, pages, max_workers).items()}
+
+
+def ocr_pdf(path: str, max_workers: Optional[int] = None) -> str:
+    """OCR de tout le PDF, texte réassemblé dans l'ordre des pages."""
+    texts = ocr_pdf_pages(path, max_workers=max_workers)
+    return "\n".join(texts[n] for n in sorted(texts) if texts[n])
 
 
 def extract_text_from_pdf_fallback(path: str) -> str:
@@ -95,24 +319,88 @@ def extract_text_from_pdf_fallback(path: str) -> str:
     return text
 
 
-def parse_cv(path: str, llm: LLMClient) -> CVData:
+def extract_text_layer(path: str) -> List[str]:
+    """Texte natif (pypdf) de chaque page, sans OCR."""
+    reader = pypdf.PdfReader(path)
+    return [page.extract_text() or "" for page in reader.pages]
+
+
+def text_layer_quality(text: str) -> float:
     """
-    Parse un CV à partir d'un PDF:
-    - tente d'abord OCR (PDF -> images -> Tesseract)
-    - si ça échoue, fallback sur pypdf
-    - envoie le texte brut au LLM pour structuration JSON
+    Score 0 -> 1 de la couche texte d'une page:
+    - trop peu de caractères (page scannée) -> 0
+    - proportion de caractères alphanumériques et de "vrais" mots
+    - pénalité pour les glyphes non décodés ((cid:12), U+FFFD)
     """
+    stripped = text.strip()
+    if len(stripped) < TEXT_LAYER_MIN_CHARS:
+        return 0.0
+
+    chars = [c for c in stripped if not c.isspace()]
+    words = stripped.split()
+    alnum_ratio = sum(c.isalnum() for c in chars) / len(chars)
+    word_ratio = sum(
+        1 for w in words if 2 <= len(w) <= 25 and any(c.isalpha() for c in w)
+    ) / len(words)
+    garbage = stripped.count("(cid:") + stripped.count("\ufffd")
+    penalty = min(0.5, 5 * garbage / len(words))
 
-    # 1) PDF -> images -> OCR
+    return max(0.0, 0.6 * alnum_ratio + 0.4 * word_ratio - penalty)
+
+
+def extract_cv_text(path: str, max_workers: Optional[int] = None) -> str:
+    """
+    Extraction du texte brut d'un CV:
+    - lit la couche texte pypdf de chaque page et évalue sa qualité
+    - n'OCR que les pages sans texte exploitable (scans, images)
+    - si l'OCR échoue, garde le texte pypdf disponible
+    """
+    t0 = time.perf_counter()
     try:
-        pages = pdf_to_images(path)
-        raw_text = ocr_images(pages)
+        layer = extract_text_layer(path)
     except Exception as e:
-        print("[OCR] ❌ Erreur OCR:", e)
-        raw_text = extract_text_from_pdf_fallback(path)
+        print("[OCR] ⚠️ Lecture de la couche texte impossible:", e)
+        layer = []
 
-    # 2) Prompt LLM avec pare-feu anti prompt injection
-    system_prompt = """
+    if not layer:
+        try:
+            return ocr_pdf(path, max_workers=max_workers)
+        except Exception as e:
+            print("[OCR] ❌ Erreur OCR:", e)
+            return ""
+
+    texts: Dict[int, str] = {}
+    to_ocr: List[int] = []
+    for page_number, text in enumerate(layer, start=1):
+        quality = text_layer_quality(text)
+        if quality >= TEXT_LAYER_MIN_QUALITY:
+            texts[page_number] = text
+        else:
+            to_ocr.append(page_number)
+        print(f"[OCR] page {page_number}: couche texte qualité {quality:.2f}"
+              f"{' -> OCR' if quality < TEXT_LAYER_MIN_QUALITY else ''}")
+
+    if to_ocr:
+        try:
+            texts.update(ocr_pdf_pages(path, pages=to_ocr, max_workers=max_workers))
+        except Exception as e:
+            print("[OCR] ❌ Erreur OCR:", e)
+            for page_number in to_ocr:
+                texts[page_number] = layer[page_number - 1]
+
+    raw_text = "\n".join(texts[n] for n in sorted(texts) if texts[n])
+    print(f"[OCR] ✅ Texte extrait en {time.perf_counter() - t0:.2f}s "
+          f"({len(layer) - len(to_ocr)} page(s) natives, {len(to_ocr)} OCR), {len(raw_text)} caractères.")
+    return raw_text
+
+
+# --------------------------------------------------------
+# Structuration LLM
+# --------------------------------------------------------
+# À incrémenter quand la sortie de extract_cv_text change (invalide le cache texte)
+CV_TEXT_EXTRACTOR_VERSION = "2"
+
+CV_SYSTEM_PROMPT = """
 Tu es un assistant qui extrait des informations structurées d'un CV.
 Ton rôle est UNIQUEMENT d'analyser le texte fourni et de produire un JSON.
 
@@ -128,17 +416,7 @@ RÈGLES IMPORTANTES (PARE-FEU):
   - écrire en dehors du JSON.
 """
 
-    user_prompt = f"""
-Voici le texte du CV:
-
-\"\"\"{raw_text}\"\"\"
-
-Tâche:
-- Extraire les champs selon le format attendu.
-- Ne retourner que le JSON valide.
-"""
-
-    schema_hint = """{
+CV_SCHEMA_HINT = """{
   "name": "",
   "contact": "",
   "skills": [],
@@ -159,6 +437,203 @@ Tâche:
   ]
 }"""
 
-    structured = llm.chat_json(system_prompt, user_prompt, schema_hint)
+
+def _cv_user_prompt(raw_text: str) -> str:
+    return f"""
+Voici le texte du CV:
+
+\"\"\"{raw_text}\"\"\"
+
+Tâche:
+- Extraire les champs selon le format attendu.
+- Ne retourner que le JSON valide.
+"""
+
+
+# "single": un seul appel LLM; "sections": un appel par section en parallèle;
+# "auto": sections pour les CV longs dont les titres sont reconnus
+CV_EXTRACTION_MODE = os.getenv("CV_EXTRACTION_MODE", "auto").lower()
+CV_SECTIONS_MIN_CHARS = int(os.getenv("CV_SECTIONS_MIN_CHARS", "3000"))
+
+
+def extraction_mode(raw_text: str) -> str:
+    if CV_EXTRACTION_MODE == "sections":
+        return "sections" if is_sectionable(raw_text) else "single"
+    if CV_EXTRACTION_MODE == "auto" and len(raw_text) >= CV_SECTIONS_MIN_CHARS and is_sectionable(raw_text):
+        return "sections"
+    return "single"
+
+
+def cv_prompt_version(mode: str = "single") -> str:
+    """Empreinte du prompt de structuration (invalide le cache LLM si le prompt change)."""
+    rules = f"rules{CV_RULES_VERSION}:{CV_RULES_SKIP_CONFIDENCE}:" if CV_RULES_ENABLED else ""
+    if mode == "sections":
+        return rules + "sections:" + sections_prompt_version()
+    return rules + hashlib.sha256((CV_SYSTEM_PROMPT + _cv_user_prompt("") + CV_SCHEMA_HINT).encode("utf-8")).hexdigest()[:16]
+
+
+def text_extractor_version() -> str:
+    return (
+        f"{CV_TEXT_EXTRACTOR_VERSION}:{TEXT_LAYER_MIN_QUALITY}:{OCR_FAST_DPI}:{OCR_HIGH_DPI}:"
+        f"{OCR_MIN_CONFIDENCE}:{int(OCR_BINARIZE)}:{TESSERACT_CONFIG}:{ocr_backend_name(TESSERACT_CONFIG)}"
+    )
+
+
+def _residual_schema(fields: List[str]) -> str:
+    schema = json.loads(CV_SCHEMA_HINT)
+    return json.dumps({k: v for k, v in schema.items() if k in fields}, ensure_ascii=False, indent=2)
+
+
+def _full_prompt_tokens(raw_text: str) -> int:
+    return estimate_tokens(CV_SYSTEM_PROMPT + _cv_user_prompt(raw_text) + CV_SCHEMA_HINT)
+
+
+def _pre_extract(raw_text: str) -> Optional[PreExtraction]:
+    """Pré-extraction déterministe avant le LLM (None si désactivée)."""
+    if not CV_RULES_ENABLED:
+        return None
+    pre = pre_extract(raw_text)
+    if _skips_llm(pre):
+        tokens = _full_prompt_tokens(raw_text)
+        rule_stats.record(tokens, skipped=True)
+        print(f"[CV rules] ✅ Confiance {pre.confidence:.2f}: appel LLM évité (~{tokens} tokens).")
+    return pre
+
+
+def _skips_llm(pre: Optional[PreExtraction]) -> bool:
+    # jamais sans les expériences (même si CV_RULES_SKIP_CONFIDENCE est abaissé): un [] serait mis en cache à tort
+    if pre is None or "experiences" in pre.unresolved:
+        return False
+    return pre.confidence >= CV_RULES_SKIP_CONFIDENCE or not pre.unresolved
+
+
+def _llm_prompts(raw_text: str, pre: Optional[PreExtraction]) -> Tuple[str, str]:
+    """(prompt utilisateur, schéma): texte complet, ou seulement le résiduel non résolu."""
+    if pre is None:
+        return _cv_user_prompt(raw_text), CV_SCHEMA_HINT
+    user_prompt = _cv_user_prompt(pre.residual_text)
+    schema = _residual_schema(pre.unresolved)
+    saved = _full_prompt_tokens(raw_text) - estimate_tokens(CV_SYSTEM_PROMPT + user_prompt + schema)
+    rule_stats.record(saved, skipped=False)
+    print(
+        f"[CV rules] Confiance {pre.confidence:.2f}, résolus: {', '.join(pre.resolved) or 'aucun'} "
+        f"→ LLM sur le résiduel (~{saved} tokens économisés)"
+    )
+    return user_prompt, schema
+
+
+def structure_cv_text(raw_text: str, llm: LLMClient, mode: Optional[str] = None) -> Dict[str, Any]:
+    pre = _pre_extract(raw_text)
+    if _skips_llm(pre):
+        return pre.structured
+
+    if (mode or extraction_mode(raw_text)) == "sections":
+        structured = extract_by_sections(raw_text, llm)
+    else:
+        user_prompt, schema = _llm_prompts(raw_text, pre)
+        structured = llm.chat_json(CV_SYSTEM_PROMPT, user_prompt, schema)
+    return merge_with_llm(pre, structured) if pre is not None else structured
+
+
+async def astructure_cv_text(
+    raw_text: str,
+    llm: LLMClient,
+    mode: Optional[str] = None,
+    limiter: Optional[asyncio.Semaphore] = None,
+) -> Dict[str, Any]:
+    """`limiter` borne chaque appel LLM (un CV long en fait un par section)."""
+    pre = _pre_extract(raw_text)
+    if _skips_llm(pre):
+        return pre.structured
+
+    if (mode or extraction_mode(raw_text)) == "sections":
+        structured = await aextract_by_sections(raw_text, llm, limiter)
+    else:
+        user_prompt, schema = _llm_prompts(raw_text, pre)
+        structured = await alimited_chat_json(llm, limiter, CV_SYSTEM_PROMPT, user_prompt, schema)
+    return merge_with_llm(pre, structured) if pre is not None else structured
+
+
+def get_cv_text(path: str, use_cache: bool = True, max_workers: Optional[int] = None) -> str:
+    """Étape 1 (texte natif + OCR), avec cache par SHA-256 du PDF."""
+    cache = CVCache() if use_cache else None
+
+    if cache is not None:
+        text_key = cache.text_key(file_sha256(path), text_extractor_version())
+        raw_text = cache.get_text(text_key)
+        if raw_text is not None:
+            print(f"[CVCache] ✅ Texte du CV trouvé en cache ({len(raw_text)} caractères).")
+            return raw_text
+
+    reset_peak_rss()
+    raw_text = extract_cv_text(path, max_workers=max_workers)
+    peak = peak_rss_mb()
+    print(f"[OCR] 📈 Pic mémoire: {peak['self']} Mo (process), {peak['children']} Mo (plus gros sous-process terminé depuis le démarrage, pas seulement ce CV)")
+
+    if cache is not None and raw_text:
+        cache.set_text(text_key, raw_text)
+    return raw_text
+
+
+def _cached_structured(
+    raw_text: str, llm: LLMClient, cache: Optional[CVCache], mode: str
+) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    if cache is None:
+        return None, None
+    key = cache.structured_key(raw_text, cv_prompt_version(mode), llm.model)
+    structured = cache.get_structured(key)
+    if structured is not None:
+        print("[CVCache] ✅ CV structuré trouvé en cache.")
+    return key, structured
+
+
+def _store_structured(cache: Optional[CVCache], key: Optional[str], structured: Dict[str, Any]) -> None:
+    if key is None:
+        return
+    if not is_complete(structured):
+        # une section a échoué: on réessaiera au prochain passage
+        print("[CVCache] ⚠️ Extraction incomplète, CV structuré non mis en cache.")
+        return
+    cache.set_structured(key, structured)
+
+
+def get_cv_structured(raw_text: str, llm: LLMClient, use_cache: bool = True) -> Dict[str, Any]:
+    """Étape 2 (LLM), avec cache par SHA-256 du texte + version du prompt."""
+    cache = CVCache() if use_cache else None
+    mode = extraction_mode(raw_text)
+    key, structured = _cached_structured(raw_text, llm, cache, mode)
+    if structured is None:
+        structured = structure_cv_text(raw_text, llm, mode)
+        _store_structured(cache, key, structured)
+    return structured
+
+
+async def aget_cv_structured(
+    raw_text: str, llm: LLMClient, use_cache: bool = True, limiter: Optional[asyncio.Semaphore] = None
+) -> Dict[str, Any]:
+    cache = CVCache() if use_cache else None
+    mode = extraction_mode(raw_text)
+    key, structured = _cached_structured(raw_text, llm, cache, mode)
+    if structured is None:
+        structured = await astructure_cv_text(raw_text, llm, mode, limiter)
+        _store_structured(cache, key, structured)
+    return structured
+
+
+def parse_cv(path: str, llm: LLMClient, use_cache: bool = True) -> CVData:
+    """
+    Parse un CV à partir d'un PDF:
+    - couche texte pypdf d'abord, OCR uniquement des pages sans texte exploitable
+    - envoie le texte brut au LLM pour structuration JSON
+      (CV longs: un appel par section, en parallèle, puis fusion)
+    - les champs déterministes (contact, compétences, diplômes) sont extraits
+      localement d'abord; le LLM ne voit que le reste, ou n'est pas appelé
+    - chaque étape est mise en cache par contenu (SHA-256 du PDF / du texte)
+    """
+    # 1) Texte natif + OCR des pages scannées (en parallèle, une page à la fois par worker)
+    raw_text = get_cv_text(path, use_cache=use_cache)
+
+    # 2) Structuration LLM avec pare-feu anti prompt injection
+    structured = get_cv_structured(raw_text, llm, use_cache=use_cache)
 
     return CVData(raw_text=raw_text, structured=structured)
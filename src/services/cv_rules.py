@@ -0,0 +1,289 @@
+# src/services/cv_rules.py
+#
+# Pré-extraction déterministe (sans LLM) des champs faciles d'un CV:
+# - contact: emails, téléphones, liens
+# - name: première ligne qui ressemble à un nom
+# - skills: vocabulaire connu
+# - education: lignes avec un diplôme (+ années, établissement)
+# - experiences: lignes datées (période "2020 - 2023") sous un titre d'expériences reconnu
+# Seul le texte non résolu est ensuite envoyé au LLM, et l'appel est évité
+# quand la confiance dépasse un seuil.
+
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from services.cv_sections import INCOMPLETE_KEY, heading_section
+from utils.text_match import normalize
+
+# À incrémenter quand les règles ou le vocabulaire changent (invalide le cache LLM)
+CV_RULES_VERSION = "2"
+CV_RULES_ENABLED = os.getenv("CV_RULES_ENABLED", "1") != "0"
+# confiance (0 -> 1) au-delà de laquelle l'appel LLM est évité
+CV_RULES_SKIP_CONFIDENCE = float(os.getenv("CV_RULES_SKIP_CONFIDENCE", "0.9"))
+MIN_SKILLS = 3
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"(?:\+\d{2,3}[\s.]?|\b0)\d(?:[\s.-]?\d{2}){4}\b")
+URL_RE = re.compile(r"(?:https?://|www\.)\S+|\b(?:linkedin|github)\.com/\S+", re.IGNORECASE)
+YEAR_RANGE_RE = re.compile(
+    r"\b((?:19|20)\d{2})\s*(?:[-–—/]|a|to)\s*((?:19|20)\d{2}|aujourd'hui|present|actuel|now)\b"
+    r"|\b((?:19|20)\d{2})\b"
+)
+# période d'un poste, sur le texte d'origine: "2020 - 2023", "03/2021 – aujourd'hui", "2019 to present"
+EXPERIENCE_DATES_RE = re.compile(
+    r"\(?\b(?:\d{1,2}[/.])?((?:19|20)\d{2})\s*(?:[-–—]|à|a|to)\s*"
+    r"(?:\d{1,2}[/.])?((?:19|20)\d{2}|aujourd['’]hui|présent|present|actuel|now|today)\b\)?",
+    re.IGNORECASE,
+)
+EXPERIENCE_SEPARATORS = re.compile(r"\s[-–—|@]\s|,\s|\s(?:chez|at)\s")
+
+DEGREE_KEYWORDS = re.compile(
+    r"\b(master|mastere|licence|bachelor|bts|dut|doctorat|phd|mba|msc|bsc|"
+    r"diplome d.ingenieur|cycle ingenieur|baccalaureat|bac)\b"
+)
+SCHOOL_KEYWORDS = re.compile(
+    r"\b(universite|university|ecole|school|institut|institute|iut|lycee|college|faculte|polytechnique)\b"
+)
+
+# vocabulaire de compétences reconnues (forme normalisée -> forme affichée)
+SKILL_VOCABULARY: Dict[str, str] = {
+    s.lower(): s for s in [
+        "Python", "Java", "JavaScript", "TypeScript", "C", "C++", "C#", "Go", "Rust", "PHP", "Ruby",
+        "Kotlin", "Swift", "Scala", "R", "MATLAB", "SQL", "NoSQL", "PostgreSQL", "MySQL", "MongoDB",
+        "Redis", "HTML", "CSS", "React", "Angular", "Vue.js", "Node.js", "Django", "Flask", "FastAPI",
+        "Spring", "Docker", "Kubernetes", "Terraform", "Ansible", "AWS", "Azure", "GCP", "Linux",
+        "Git", "CI/CD", "Jenkins", "Spark", "Hadoop", "Kafka", "Airflow", "Pandas", "NumPy",
+        "scikit-learn", "TensorFlow", "PyTorch", "Machine Learning", "Deep Learning", "NLP",
+        "Power BI", "Tableau", "Excel", "SAP", "Salesforce", "Jira", "Agile", "Scrum", "Figma",
+        "Photoshop", "Anglais", "Espagnol", "Allemand",
+    ]
+}
+_SKILL_RE = re.compile(
+    r"(?<![\w+#.])(" + "|".join(re.escape(normalize(s)) for s in sorted(SKILL_VOCABULARY, key=len, reverse=True)) + r")(?![\w+#])"
+)
+# une lettre seule ("C", "R") n'est retenue que dans une section compétences
+_SHORT_SKILLS = {"c", "r", "go"}
+
+# poids de chaque champ dans la confiance
+FIELD_WEIGHTS = {"name": 0.15, "contact": 0.15, "skills": 0.2, "education": 0.2, "experiences": 0.3}
+
+
+@dataclass
+class PreExtraction:
+    structured: Dict[str, Any]
+    resolved: List[str]
+    residual_text: str
+    confidence: float
+
+    @property
+    def unresolved(self) -> List[str]:
+        return [f for f in FIELD_WEIGHTS if f not in self.resolved]
+
+
+@dataclass
+class RuleStats:
+    """Économies cumulées (process courant) de la pré-extraction."""
+    documents: int = 0
+    calls_saved: int = 0
+    tokens_saved: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, tokens_saved: int, skipped: bool) -> None:
+        with self._lock:
+            self.documents += 1
+            self.tokens_saved += max(0, tokens_saved)
+            self.calls_saved += int(skipped)
+
+    def report(self) -> str:
+        return (
+            f"[CV rules] {self.documents} CV pré-extraits: {self.calls_saved} appels LLM évités, "
+            f"~{self.tokens_saved} tokens de prompt économisés"
+        )
+
+
+rule_stats = RuleStats()
+
+
+def _looks_like_name(line: str) -> bool:
+    words = line.split()
+    if not 2 <= len(words) <= 4 or any(ch.isdigit() for ch in line) or "@" in line:
+        return False
+    return all(re.fullmatch(r"[^\W\d_]+(?:[-'][^\W\d_]+)*\.?", w) for w in words)
+
+
+def _years(text: str) -> str:
+    m = YEAR_RANGE_RE.search(normalize(text))
+    if not m:
+        return ""
+    if m.group(1):
+        return f"{m.group(1)} - {m.group(2)}"
+    return m.group(3)
+
+
+def find_skills(text: str, in_skills_section: bool = False) -> List[str]:
+    found = []
+    for m in _SKILL_RE.finditer(normalize(text)):
+        key = m.group(1)
+        if key in _SHORT_SKILLS and not in_skills_section:
+            continue
+        skill = SKILL_VOCABULARY[key]
+        if skill not in found:
+            found.append(skill)
+    return found
+
+
+def _education_entries(lines: List[str]) -> List[Dict[str, str]]:
+    entries = []
+    for i, line in enumerate(lines):
+        if not DEGREE_KEYWORDS.search(normalize(line)):
+            continue
+        nearby = [line] + lines[i + 1:i + 2]
+        degree = re.sub(r"\b(?:19|20)\d{2}\b", "", line).strip(" ,-–—/|")
+        school = next((l for l in nearby[1:] if SCHOOL_KEYWORDS.search(normalize(l))), "")
+        if SCHOOL_KEYWORDS.search(normalize(degree)):
+            # "Master Informatique - Université de Lyon": diplôme et établissement sur la même ligne
+            parts = [p.strip() for p in re.split(r"\s[-–—|,@]\s|,\s|\s(?:à|at)\s", degree) if p.strip()]
+            school = next((p for p in parts if SCHOOL_KEYWORDS.search(normalize(p))), school)
+            degree = " - ".join(p for p in parts if p != school) or degree
+        years = next((y for y in (_years(l) for l in nearby) if y), "")
+        entries.append({"degree": degree, "school": school.strip(), "years": years})
+    return entries
+
+
+def _experience_entries(lines: List[str]) -> Optional[List[Dict[str, str]]]:
+    """
+    Postes d'une section expériences: une ligne datée ouvre un poste
+    ("Data Scientist, Acme, 2020 - 2023", ou la période seule sous la ligne "Data Scientist - Acme"),
+    les lignes suivantes forment sa description.
+    None si une ligne ne peut être rattachée à aucun poste (mise en page non reconnue -> LLM).
+    """
+    lines = [l for l in lines if l]
+    dated = [i for i, l in enumerate(lines) if EXPERIENCE_DATES_RE.search(l)]
+    if not dated:
+        return None
+
+    starts = []
+    for i in dated:
+        rest = EXPERIENCE_DATES_RE.sub("", lines[i]).strip(" ,-–—|()")
+        # période seule sur sa ligne: l'intitulé est la ligne précédente
+        starts.append(i if rest or i == 0 or (i - 1) in dated else i - 1)
+    if starts[0] != 0:
+        return None   # texte avant le premier poste: non rattachable
+
+    entries = []
+    for n, start in enumerate(starts):
+        end = starts[n + 1] if n + 1 < len(starts) else len(lines)
+        header = " ".join(lines[start:dated[n] + 1])
+        m = EXPERIENCE_DATES_RE.search(header)
+        header = EXPERIENCE_DATES_RE.sub("", header).strip(" ,-–—|()")
+        parts = [p.strip() for p in EXPERIENCE_SEPARATORS.split(header) if p.strip()]
+        if not parts:
+            return None
+        entries.append({
+            "title": parts[0],
+            "company": parts[1] if len(parts) > 1 else "",
+            "years": f"{m.group(1)} - {m.group(2)}",
+            "description": " ".join(l.lstrip("-•* ") for l in lines[dated[n] + 1:end]),
+        })
+    return entries
+
+
+def pre_extract(raw_text: str) -> PreExtraction:
+    lines = [l.strip() for l in raw_text.splitlines()]
+
+    # découpage ligne à ligne par section (None = en-tête)
+    tagged = []
+    current: Optional[str] = None
+    for line in lines:
+        section = heading_section(line) if line else None
+        if section is not None:
+            current = section
+            tagged.append((section, line, True))
+        else:
+            tagged.append((current, line, False))
+
+    structured: Dict[str, Any] = {"name": "", "contact": "", "skills": [], "experiences": [], "education": []}
+    resolved: List[str] = []
+
+    contacts = []
+    for pattern in (EMAIL_RE, PHONE_RE, URL_RE):
+        for m in pattern.findall(raw_text):
+            if m not in contacts:
+                contacts.append(m)
+    if contacts:
+        structured["contact"] = " | ".join(contacts)
+        resolved.append("contact")
+
+    name_line = next((l for s, l, h in tagged if s is None and l and not h), "")
+    if _looks_like_name(name_line):
+        structured["name"] = name_line
+        resolved.append("name")
+
+    skills_text = "\n".join(l for s, l, h in tagged if s == "skills" and not h)
+    skills = find_skills(skills_text, in_skills_section=True)
+    for skill in find_skills(raw_text):
+        if skill not in skills:
+            skills.append(skill)
+    structured["skills"] = skills
+    if len(skills) >= MIN_SKILLS:
+        resolved.append("skills")
+
+    education_lines = [l for s, l, h in tagged if s == "education" and not h and l]
+    if not education_lines:
+        education_lines = [l for s, l, h in tagged if s is None and l]
+    education = _education_entries(education_lines)
+    if education:
+        structured["education"] = education
+        resolved.append("education")
+
+    # expériences résolues seulement si elles sont extraites d'une section reconnue:
+    # un titre non reconnu ("Employment History"...) ne veut pas dire que le CV n'en a pas
+    experiences = _experience_entries([l for s, l, h in tagged if s == "experiences" and not h])
+    if experiences:
+        structured["experiences"] = experiences
+        resolved.append("experiences")
+
+    # texte résiduel: on retire ce qui est déjà résolu
+    residual = []
+    for section, line, is_heading in tagged:
+        if section in resolved or (section == "other" and "skills" in resolved):
+            continue
+        if line == name_line and "name" in resolved:
+            continue
+        stripped = line
+        if "contact" in resolved:
+            for pattern in (EMAIL_RE, PHONE_RE, URL_RE):
+                stripped = pattern.sub("", stripped)
+            if len(stripped.strip(" |,-–•:")) < 3 and line:
+                continue
+        residual.append(line)
+
+    confidence = sum(FIELD_WEIGHTS[f] for f in resolved)
+    return PreExtraction(
+        structured=structured,
+        resolved=resolved,
+        residual_text="\n".join(residual).strip(),
+        confidence=round(confidence, 2),
+    )
+
+
+def merge_with_llm(pre: PreExtraction, llm_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Champs résolus par les règles prioritaires; compétences = union des deux."""
+    merged = dict(pre.structured)
+    if not isinstance(llm_result, dict):
+        # réponse mal formée: champs des règles seulement, résultat marqué incomplet
+        merged[INCOMPLETE_KEY] = ["llm"]
+        return merged
+    for key in pre.unresolved:
+        value = llm_result.get(key)
+        if value and key != "skills":
+            merged[key] = value
+    extra = llm_result.get("skills") or []
+    if isinstance(extra, list):
+        merged["skills"] = merged["skills"] + [s for s in extra if s not in merged["skills"]]
+    if llm_result.get(INCOMPLETE_KEY):
+        merged[INCOMPLETE_KEY] = llm_result[INCOMPLETE_KEY]
+    return merged
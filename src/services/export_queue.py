@@ -0,0 +1,256 @@
+# src/services/export_queue.py
+#
+# File d'export en arrière-plan (Notion + fichier markdown):
+# - enqueue() écrit le rapport dans un spool sur disque et rend la main tout de suite
+# - un thread worker livre les rapports par lots, avec retries et backoff
+# - le spool survit à un redémarrage: les rapports en attente sont repris au lancement
+# - index en mémoire (id -> prochain essai): le worker ne relit un rapport que pour le livrer
+# - stats(): profondeur de file, livrés, échecs, latence de livraison
+
+import os
+import json
+import time
+import uuid
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+from services.notion_export import notion_configured, publish_notion_page, save_markdown_locally
+
+DEFAULT_SPOOL_DIR = os.path.join(".cache", "export_spool")
+
+
+class ExportQueue:
+    def __init__(
+        self,
+        spool_dir: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        batch_size: int = 8,
+        retry_base_seconds: float = 2.0,
+    ):
+        self.spool_dir = spool_dir or os.getenv("EXPORT_SPOOL_DIR", DEFAULT_SPOOL_DIR)
+        self.failed_dir = os.path.join(self.spool_dir, "failed")
+        self.max_attempts = max_attempts or int(os.getenv("EXPORT_MAX_ATTEMPTS", "5"))
+        self.batch_size = batch_size
+        self.retry_base_seconds = retry_base_seconds
+        os.makedirs(self.failed_dir, exist_ok=True)
+
+        # id -> date du prochain essai; l'ordre des ids est l'ordre d'arrivée
+        self._index: Dict[str, float] = {}
+        self._load_index()
+
+        self._wake = threading.Condition()
+        self._idle = threading.Event()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.delivered = 0
+        self.failed = 0
+        self.retries = 0
+        self.latencies: List[float] = []
+
+    # --------------------------------------------------------
+    # Spool
+    # --------------------------------------------------------
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.spool_dir, f"{job_id}.json")
+
+    def _write_job(self, job: Dict[str, Any]) -> None:
+        path = self._job_path(job["id"])
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _read_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._job_path(job_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[Export] ⚠️ Rapport illisible ({job_id}), déplacé dans failed/: {e}")
+            return None
+
+    def _load_index(self) -> None:
+        """Rapports laissés par un process précédent: noms de fichiers seulement, repris dès le lancement."""
+        for name in os.listdir(self.spool_dir):
+            if name.endswith(".json"):
+                self._index[name[: -len(".json")]] = 0.0
+
+    def depth(self) -> int:
+        return len(self._index)
+
+    # --------------------------------------------------------
+    # API
+    # --------------------------------------------------------
+    def enqueue(
+        self,
+        title: str,
+        markdown: str,
+        targets: Sequence[str] = ("notion", "file"),
+        file_path: Optional[str] = None,
+    ) -> str:
+        """Met un rapport en file (écrit dans le spool) et retourne son id immédiatement."""
+        now = time.time()
+        job_id = f"{int(now * 1000):013d}-{uuid.uuid4().hex[:8]}"   # ordre d'arrivée = ordre des fichiers
+        self._write_job({
+            "id": job_id,
+            "title": title,
+            "markdown": markdown,
+            "targets": list(targets),
+            "file_path": file_path,
+            "enqueued_at": now,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "progress": {},
+        })
+        with self._wake:
+            self._index[job_id] = now
+            self._idle.clear()
+            self._wake.notify()
+        self.start()
+        print(f"[Export] Rapport mis en file ({job_id}), {self.depth()} en attente.")
+        return job_id
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="export-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._wake:
+            self._stop = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Attend que la file soit vide (ou que seuls des retries futurs restent). True si vide."""
+        self.start()
+        with self._wake:
+            self._wake.notify()
+        return self._idle.wait(timeout) and self.depth() == 0
+
+    def stats(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies)
+        return {
+            "depth": self.depth(),
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "retries": self.retries,
+            "avg_latency_s": sum(lat) / len(lat) if lat else 0.0,
+            "p95_latency_s": lat[int(0.95 * (len(lat) - 1))] if lat else 0.0,
+            "max_latency_s": lat[-1] if lat else 0.0,
+        }
+
+    # --------------------------------------------------------
+    # Worker
+    # --------------------------------------------------------
+    def _deliver(self, job: Dict[str, Any]) -> None:
+        """Lève une exception si une cible échoue (le job reste dans le spool)."""
+        if "file" in job["targets"] and not job["progress"].get("file_done"):
+            save_markdown_locally(job["markdown"], job.get("file_path"))
+            job["progress"]["file_done"] = True
+        if "notion" in job["targets"] and not job["progress"].get("notion_done"):
+            if not notion_configured():
+                print("[Export] Notion non configuré, cible ignorée.")
+            else:
+                notion = job["progress"].setdefault("notion", {})
+                publish_notion_page(job["title"], job["markdown"], notion)
+            job["progress"]["notion_done"] = True
+
+    def _forget(self, job_id: str) -> None:
+        with self._wake:
+            self._index.pop(job_id, None)
+
+    def _set_aside(self, job_id: str) -> None:
+        try:
+            os.replace(self._job_path(job_id), os.path.join(self.failed_dir, f"{job_id}.json"))
+        except OSError as e:
+            print(f"[Export] ⚠️ Rapport non déplacé dans failed/ ({job_id}): {e}")
+        self._forget(job_id)
+
+    def _process(self, job: Dict[str, Any]) -> None:
+        job["attempts"] += 1
+        try:
+            self._deliver(job)
+        except Exception as e:
+            if job["attempts"] >= self.max_attempts:
+                self.failed += 1
+                self._set_aside(job["id"])
+                print(f"[Export] ❌ Abandon après {job['attempts']} essais ({job['id']}): {e}")
+                if not job["progress"].get("file_done"):
+                    try:
+                        save_markdown_locally(job["markdown"], job.get("file_path"))
+                    except OSError as save_error:
+                        print(f"[Export] ⚠️ Copie locale impossible ({job['id']}): {save_error}")
+                return
+            self.retries += 1
+            delay = self.retry_base_seconds * 2 ** (job["attempts"] - 1)
+            job["next_attempt_at"] = time.time() + delay
+            job["last_error"] = str(e)
+            try:
+                self._write_job(job)   # progression conservée: pas de page Notion en double
+            except OSError as write_error:
+                # le nouvel essai repartira de la dernière version écrite du spool
+                print(f"[Export] ⚠️ Spool non mis à jour ({job['id']}): {write_error}")
+            with self._wake:
+                self._index[job["id"]] = job["next_attempt_at"]
+            print(f"[Export] ⚠️ Échec ({job['id']}), nouvel essai dans {delay:.0f}s: {e}")
+            return
+
+        try:
+            os.remove(self._job_path(job["id"]))
+        except OSError as e:
+            print(f"[Export] ⚠️ Rapport livré mais resté dans le spool ({job['id']}): {e}")
+        self._forget(job["id"])
+        latency = time.time() - job["enqueued_at"]
+        self.delivered += 1
+        self.latencies.append(latency)
+        print(f"[Export] ✅ Rapport livré ({job['id']}) en {latency:.2f}s.")
+
+    def _run(self) -> None:
+        while True:
+            with self._wake:
+                # choix + attente sous le verrou (index en mémoire, aucun accès disque):
+                # un enqueue() ne peut pas être manqué
+                if self._stop:
+                    return
+                now = time.time()
+                ready = sorted(i for i, at in self._index.items() if at <= now)[: self.batch_size]
+                if not ready:
+                    self._idle.set()
+                    waits = [at - now for at in self._index.values()]
+                    self._wake.wait(timeout=min(waits) if waits else None)
+                    continue
+
+            # lot de rapports prêts, lus un par un hors verrou et livrés à la suite sur la même session HTTP
+            for job_id in ready:
+                if self._stop:
+                    return
+                job = self._read_job(job_id)
+                if job is None:
+                    self._set_aside(job_id)
+                    continue
+                try:
+                    self._process(job)
+                except Exception as e:
+                    # le worker ne meurt jamais: le rapport est repris plus tard
+                    print(f"[Export] ⚠️ Erreur inattendue ({job_id}), nouvel essai plus tard: {e}")
+                    with self._wake:
+                        if job_id in self._index:
+                            self._index[job_id] = time.time() + self.retry_base_seconds
+
+
+_queue: Optional[ExportQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_export_queue() -> ExportQueue:
+    """File d'export du process (créée au premier appel; reprend le spool existant)."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = ExportQueue()
+            _queue.start()
+        return _queue
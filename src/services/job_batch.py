@@ -0,0 +1,119 @@
+# src/services/job_batch.py
+#
+# Scraping d'annonces en masse (liste d'un recruteur):
+#   cd src && python -m services.job_batch urls.txt -o exports/jobs.jsonl --concurrency 8 --rate 5
+#
+# - requêtes HasData en parallèle sur une session keep-alive partagée
+# - concurrence et débit plafonnés selon le plan HasData
+# - résultats écrits en JSONL au fil de l'eau, reprise possible après interruption
+
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Any, Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from services.job_cache import canonical_job_url, job_id
+from services.job_scraper import HASDATA_MAX_CONCURRENCY, HASDATA_RATE_LIMIT, scrape_jobs
+
+
+def read_urls(source: str) -> List[str]:
+    """Un lien par ligne (# = commentaire), ou {"url": "..."} par ligne pour un .jsonl."""
+    urls = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if source.endswith(".jsonl"):
+                line = json.loads(line).get("url", "")
+            if line:
+                urls.append(line)
+    return urls
+
+
+def load_done(output_path: str) -> Set[str]:
+    """Identifiants des annonces déjà récupérées avec succès (pour la reprise)."""
+    done: Set[str] = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue  # dernière ligne tronquée par une interruption
+            if row.get("status") == "ok" and row.get("job_id"):
+                done.add(row["job_id"])
+    return done
+
+
+def run_batch(
+    source: str,
+    output_path: str,
+    max_concurrency: int = HASDATA_MAX_CONCURRENCY,
+    rate_per_second: float = HASDATA_RATE_LIMIT,
+    use_cache: bool = True,
+) -> Dict[str, Any]:
+    urls = read_urls(source)
+    done = load_done(output_path)
+    todo = [u for u in urls if job_id(u) not in done]
+    print(f"[Jobs] {len(urls)} liens, {len(urls) - len(todo)} déjà récupérés, {len(todo)} à traiter.")
+
+    stats: Dict[str, Any] = {"ok": 0, "errors": 0}
+    if not todo:
+        return stats
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    t_start = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as out:
+        for url, job in scrape_jobs(todo, max_concurrency, rate_per_second, use_cache=use_cache):
+            ok = bool(job.raw_text)
+            row = {
+                "url": url,
+                "canonical_url": canonical_job_url(url),
+                "job_id": job_id(url),
+                "status": "ok" if ok else "error",
+                "raw_text": job.raw_text,
+                "structured": job.structured,
+            }
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
+            stats["ok" if ok else "errors"] += 1
+            print(f"[Jobs] {row['status']:>5} {url} ({time.perf_counter() - t_start:.1f}s)")
+
+    elapsed = time.perf_counter() - t_start
+    stats["elapsed_s"] = elapsed
+    stats["jobs_per_minute"] = (stats["ok"] + stats["errors"]) * 60 / elapsed if elapsed else 0.0
+    print(
+        f"[Jobs] ✅ {stats['ok']} ok, {stats['errors']} erreurs en {elapsed:.1f}s "
+        f"→ {stats['jobs_per_minute']:.1f} annonces/min"
+    )
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Scraping d'annonces en masse -> JSONL")
+    parser.add_argument("source", help="fichier de liens (.txt, un par ligne) ou .jsonl")
+    parser.add_argument("-o", "--output", default=os.path.join("exports", "jobs.jsonl"))
+    parser.add_argument("--concurrency", type=int, default=HASDATA_MAX_CONCURRENCY, help="appels simultanés")
+    parser.add_argument("--rate", type=float, default=HASDATA_RATE_LIMIT, help="appels HasData par seconde (0 = illimité)")
+    parser.add_argument("--no-cache", action="store_true", help="ignorer le cache des annonces")
+    args = parser.parse_args(argv)
+
+    run_batch(
+        args.source,
+        args.output,
+        max_concurrency=args.concurrency,
+        rate_per_second=args.rate,
+        use_cache=not args.no_cache,
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
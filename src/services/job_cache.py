@@ -0,0 +1,111 @@
+# src/services/job_cache.py
+#
+# Cache des fiches de poste, par URL canonique:
+# - Indeed: clé = identifiant "jk" de l'annonce (paramètres de tracking ignorés)
+# - autres sites: URL normalisée (schéma/hôte en minuscules, sans tracking ni fragment)
+# Les entrées expirées sont rafraîchies; si le rafraîchissement échoue,
+# la dernière version connue est servie.
+
+import os
+import json
+import time
+import hashlib
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_JOB_CACHE_DIR = os.path.join(".cache", "jobs")
+DEFAULT_JOB_CACHE_TTL = 24 * 3600
+
+# paramètres de suivi / session sans effet sur le contenu de l'annonce
+TRACKING_PARAMS = {
+    "from", "tk", "advn", "adid", "vjs", "xkcb", "xpse", "xfps", "sjdu", "acatk", "pub",
+    "camk", "jsa", "hl", "co", "gclid", "fbclid", "mc_cid", "mc_eid", "ref", "referer",
+}
+
+
+def indeed_job_key(job_url: str) -> Optional[str]:
+    """Identifiant Indeed de l'annonce (?jk=... ou ?vjk=...), None si absent."""
+    parts = urlsplit(job_url.strip())
+    if "indeed." not in parts.netloc.lower():
+        return None
+    query = dict(parse_qsl(parts.query))
+    return query.get("jk") or query.get("vjk") or None
+
+
+def canonical_job_url(job_url: str) -> str:
+    parts = urlsplit(job_url.strip())
+    host = parts.netloc.lower()
+    jk = indeed_job_key(job_url)
+    if jk:
+        return f"https://{host}/viewjob?jk={jk}"
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith("utm_")
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", host, path, urlencode(query), ""))
+
+
+def job_id(job_url: str) -> str:
+    """Identifiant stable d'une annonce: "indeed:<jk>" ou empreinte de l'URL canonique."""
+    jk = indeed_job_key(job_url)
+    if jk:
+        return f"indeed:{jk}"
+    return "url:" + hashlib.sha256(canonical_job_url(job_url).encode("utf-8")).hexdigest()[:24]
+
+
+def content_hash(structured: Dict[str, Any]) -> str:
+    payload = {k: v for k, v in structured.items() if k != "raw_payload"}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class JobCache:
+    def __init__(self, cache_dir: Optional[str] = None, ttl_seconds: Optional[float] = None):
+        self.cache_dir = cache_dir or os.getenv("JOB_CACHE_DIR", DEFAULT_JOB_CACHE_DIR)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.getenv("JOB_CACHE_TTL", str(DEFAULT_JOB_CACHE_TTL))
+        )
+
+    def _path(self, job_url: str) -> str:
+        key = hashlib.sha256(job_id(job_url).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, job_url: str) -> Optional[Dict[str, Any]]:
+        """Entrée brute (fraîche ou non) ou None."""
+        try:
+            with open(self._path(job_url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return self.ttl_seconds <= 0 or time.time() - entry.get("fetched_at", 0) < self.ttl_seconds
+
+    def set(self, job_url: str, raw_text: str, structured: Dict[str, Any]) -> bool:
+        """
+        Enregistre la fiche. Retourne True si le contenu a changé depuis la
+        version en cache (False = simple rafraîchissement de la date).
+        """
+        previous = self.get(job_url)
+        digest = content_hash(structured)
+        changed = previous is None or previous.get("content_hash") != digest
+
+        entry = {
+            "job_id": job_id(job_url),
+            "url": canonical_job_url(job_url),
+            "fetched_at": time.time(),
+            "content_hash": digest,
+            "raw_text": raw_text,
+            "structured": structured,
+        }
+        path = self._path(job_url)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print("[JobCache] ⚠️ Écriture impossible:", e)
+        return changed
@@ -1,40 +1,103 @@
 # src/services/job_scraper.py
 
 import os
+import sys
 import json
-import datetime
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
 import requests
+from bs4 import BeautifulSoup
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # 🔧 FIXED: absolute imports (Streamlit compatible)
 from models.data_models import JobData
 from config import HASDATA_API_KEY, HASDATA_INDEED_JOB_URL
+from services.job_cache import JobCache, canonical_job_url, job_id
+from services.job_store import JobStore
+from utils.rate_limit import RateLimiter
+
+# Limites du plan HasData (appels simultanés / appels par seconde)
+HASDATA_MAX_CONCURRENCY = int(os.getenv("HASDATA_MAX_CONCURRENCY", "8"))
+HASDATA_RATE_LIMIT = float(os.getenv("HASDATA_RATE_LIMIT", "5"))
+
+# Chemin rapide: page de l'annonce récupérée directement et parsée localement,
+# HasData seulement si le parsing échoue (page bloquée, mise en page inconnue)
+JOB_DIRECT_FETCH = os.getenv("JOB_DIRECT_FETCH", "1") != "0"
+# sites qui bloquent les requêtes directes (captcha): HasData tout de suite, sans tentative
+JOB_DIRECT_SKIP_HOSTS = [h.strip() for h in os.getenv("JOB_DIRECT_SKIP_HOSTS", "indeed.").split(",") if h.strip()]
+DIRECT_FETCH_TIMEOUT = float(os.getenv("JOB_DIRECT_TIMEOUT", "4"))
+# requêtes directes par seconde vers les sites d'annonces (partagé par tous les threads)
+JOB_DIRECT_RATE_LIMIT = float(os.getenv("JOB_DIRECT_RATE_LIMIT", "2"))
+MIN_DESCRIPTION_CHARS = 200
+BROWSER_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8",
+}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_direct_limiter = RateLimiter(JOB_DIRECT_RATE_LIMIT, burst=max(1, int(JOB_DIRECT_RATE_LIMIT)))
 
 
-def scrape_job_url(job_url: str) -> JobData:
+def get_http_session() -> requests.Session:
     """
-    Récupère une fiche de poste via HasData et sauvegarde automatiquement un JSON.
-    Lit correctement les infos dans raw_payload['job'].
+    Session HTTP partagée du process (keep-alive), avec un pool de connexions
+    dimensionné pour le scraping concurrent et quelques retries sur 429/5xx.
     """
+    global _session
+    with _session_lock:
+        if _session is None:
+            pool_size = max(HASDATA_MAX_CONCURRENCY, 10)
+            retries = Retry(
+                total=2,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+            )
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
 
+def _fetch_hasdata(job_url: str, rate_limiter: Optional[RateLimiter] = None) -> Optional[Dict[str, Any]]:
+    """Appel API HasData -> payload JSON, ou None en cas d'erreur."""
     if not HASDATA_API_KEY:
         print("[HasData] ERROR: HASDATA_API_KEY manquant.")
-        return JobData(raw_text="", structured={})
+        return None
 
-    # --- Appel API HasData ---
+    if rate_limiter is not None:
+        rate_limiter.acquire()
     try:
-        resp = requests.get(
+        resp = get_http_session().get(
             HASDATA_INDEED_JOB_URL,
             params={"url": job_url},
             headers={"x-api-key": HASDATA_API_KEY},
             timeout=30
         )
         resp.raise_for_status()
-        data = resp.json()   # data = { "requestMetadata": ..., "job": {...} }
+        return resp.json()   # data = { "requestMetadata": ..., "job": {...} }
     except Exception as e:
         print(f"[HasData] ERREUR API: {e}")
-        return JobData(raw_text="", structured={})
+        return None
 
-    # --- Accès au bloc "job" ---
+
+def job_from_payload(data: Dict[str, Any]) -> JobData:
+    """
+    Construit JobData à partir de la réponse HasData.
+    Lit correctement les infos dans raw_payload['job'].
+    """
     job_obj = data.get("job", {}) or {}
 
     title = job_obj.get("title", "")
@@ -57,15 +120,254 @@ def scrape_job_url(job_url: str) -> JobData:
         "benefits": job_obj.get("benefits", []),
         "raw_payload": data
     }
+    return JobData(raw_text=raw_text, structured=structured)
+
+
+# ------------------------------------------------------------
+# Parsing local du HTML (sans HasData)
+# ------------------------------------------------------------
+def _html_to_text(html: str) -> str:
+    text = BeautifulSoup(html or "", "html.parser").get_text("\n")
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+
+def _first_text(soup: BeautifulSoup, selectors: List[str]) -> str:
+    for selector in selectors:
+        node = soup.select_one(selector)
+        if node is not None:
+            text = " ".join(node.get_text(" ").split())
+            if text:
+                return text
+    return ""
+
 
-    # --- Sauvegarde JSON dans /exports ---
-    os.makedirs("exports", exist_ok=True)
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    path = os.path.join("exports", f"job_{timestamp}.json")
+def _json_ld_job(soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
+    """Bloc schema.org JobPosting (présent sur la plupart des sites d'annonces)."""
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        candidates = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+        for item in candidates:
+            kind = item.get("@type") if isinstance(item, dict) else None
+            if kind == "JobPosting" or (isinstance(kind, list) and "JobPosting" in kind):
+                return item
+    return None
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(structured, f, ensure_ascii=False, indent=2)
 
-    print(f"[HasData] JSON créé automatiquement → {path}")
+def _json_ld_location(posting: Dict[str, Any]) -> str:
+    locations = posting.get("jobLocation") or []
+    if isinstance(locations, dict):
+        locations = [locations]
+    for loc in locations:
+        address = (loc or {}).get("address") or {}
+        if isinstance(address, dict):
+            parts = [address.get("postalCode"), address.get("addressLocality")]
+            text = " ".join(p for p in parts if p)
+            if text:
+                return text
+    return ""
 
+
+def parse_job_html(html: str, job_url: str = "") -> Optional[JobData]:
+    """
+    Extrait titre, entreprise, lieu et description d'une page d'annonce:
+    1) JSON-LD schema.org JobPosting
+    2) sélecteurs Indeed
+    3) balises génériques (og:title, h1)
+    Retourne None si la page n'est pas exploitable (captcha, description absente).
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    title = company = location = description = ""
+
+    posting = _json_ld_job(soup)
+    if posting:
+        title = posting.get("title") or ""
+        org = posting.get("hiringOrganization") or {}
+        company = org.get("name", "") if isinstance(org, dict) else str(org)
+        location = _json_ld_location(posting)
+        description = _html_to_text(posting.get("description") or "")
+
+    title = title or _first_text(soup, [
+        "[data-testid='jobsearch-JobInfoHeader-title']", "h1.jobsearch-JobInfoHeader-title", "h1",
+    ])
+    company = company or _first_text(soup, [
+        "[data-testid='inlineHeader-companyName']", "[data-company-name]", ".jobsearch-CompanyInfoContainer a",
+    ])
+    location = location or _first_text(soup, [
+        "[data-testid='inlineHeader-companyLocation']", "[data-testid='job-location']",
+        "#jobLocationText", ".jobsearch-JobInfoHeader-subtitle div:last-child",
+    ])
+    if not description:
+        node = soup.select_one("#jobDescriptionText") or soup.select_one("[data-testid='jobDescriptionText']")
+        description = _html_to_text(str(node)) if node is not None else ""
+    if not title:
+        meta = soup.find("meta", property="og:title")
+        title = (meta.get("content") or "").strip() if meta else ""
+
+    if not title or len(description) < MIN_DESCRIPTION_CHARS:
+        return None
+
+    raw_text = "\n\n".join(x for x in [title, company, location, description] if x)
+    structured = {
+        "title": title,
+        "company": company,
+        "location": location,
+        "description": description,
+        "clean_description": " ".join(description.split()),
+        "details": {},
+        "benefits": [],
+        "raw_payload": {"source": "html", "url": canonical_job_url(job_url) if job_url else ""},
+    }
     return JobData(raw_text=raw_text, structured=structured)
+
+
+def parse_job_file(path: str, job_url: str = "") -> Optional[JobData]:
+    """Parsing d'une page d'annonce sauvegardée localement (hors ligne)."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return parse_job_html(f.read(), job_url)
+
+
+def uses_direct_fetch(job_url: str) -> bool:
+    """Page récupérée directement, sauf désactivation ou site connu pour la bloquer."""
+    if not JOB_DIRECT_FETCH:
+        return False
+    host = (urlsplit(job_url).hostname or "").lower()
+    return not any(blocked in host for blocked in JOB_DIRECT_SKIP_HOSTS)
+
+
+def _fetch_direct(job_url: str) -> Optional[JobData]:
+    """Récupère la page de l'annonce directement et la parse; None si bloqué ou non reconnu."""
+    _direct_limiter.acquire()
+    try:
+        resp = get_http_session().get(job_url, headers=BROWSER_HEADERS, timeout=DIRECT_FETCH_TIMEOUT)
+        if resp.status_code != 200:
+            print(f"[JobScraper] Page directe indisponible (HTTP {resp.status_code}), fallback HasData.")
+            return None
+        job = parse_job_html(resp.text, job_url)
+    except Exception as e:
+        print(f"[JobScraper] Parsing direct impossible ({e}), fallback HasData.")
+        return None
+    if job is None:
+        print("[JobScraper] Page non reconnue, fallback HasData.")
+    return job
+
+
+def _save_to_store(job_url: str, job: JobData) -> None:
+    try:
+        row_id = JobStore().save(job_url, job)
+        print(f"[JobStore] Annonce enregistrée (id {row_id}) → {job_id(job_url)}")
+    except Exception as e:
+        print("[JobStore] ⚠️ Enregistrement impossible:", e)
+
+
+def scrape_job_url(
+    job_url: str,
+    use_cache: bool = True,
+    force_refresh: bool = False,
+    export: bool = True,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> JobData:
+    """
+    Récupère une fiche de poste et l'enregistre dans le store (exports/jobs.sqlite3).
+    - page récupérée et parsée localement d'abord, HasData en fallback
+      (HasData directement pour les sites de JOB_DIRECT_SKIP_HOSTS, ex: Indeed)
+    - cache par URL canonique (identifiant Indeed "jk"), TTL = JOB_CACHE_TTL
+    - entrée expirée: nouvel appel HasData; une version identique n'est pas dupliquée
+    - si l'appel échoue, la dernière version en cache est renvoyée
+    """
+    cache = JobCache() if use_cache and os.getenv("JOB_CACHE_ENABLED", "1") != "0" else None
+    entry = cache.get(job_url) if cache is not None else None
+
+    if entry is not None and not force_refresh and cache.is_fresh(entry):
+        print(f"[JobCache] ✅ Annonce trouvée en cache: {canonical_job_url(job_url)}")
+        return JobData(raw_text=entry["raw_text"], structured=entry["structured"])
+
+    job = _fetch_direct(canonical_job_url(job_url)) if uses_direct_fetch(job_url) else None
+    if job is not None:
+        print(f"[JobScraper] ✅ Annonce parsée localement: {job.structured['title']}")
+    else:
+        data = _fetch_hasdata(canonical_job_url(job_url), rate_limiter)
+        if data is None:
+            if entry is not None:
+                print("[JobCache] ⚠️ Rafraîchissement impossible, version en cache utilisée.")
+                return JobData(raw_text=entry["raw_text"], structured=entry["structured"])
+            return JobData(raw_text="", structured={})
+        job = job_from_payload(data)
+
+    if cache is not None and not cache.set(job_url, job.raw_text, job.structured):
+        print("[JobCache] Annonce inchangée depuis le dernier scraping.")
+    if export:
+        _save_to_store(job_url, job)
+
+    return job
+
+
+def scrape_jobs(
+    job_urls: Iterable[str],
+    max_concurrency: int = HASDATA_MAX_CONCURRENCY,
+    rate_per_second: float = HASDATA_RATE_LIMIT,
+    use_cache: bool = True,
+) -> Iterator[Tuple[str, JobData]]:
+    """
+    Scraping en masse: les URL (dédoublonnées par annonce) sont récupérées en
+    parallèle sur la session partagée, dans la limite de `max_concurrency`
+    appels simultanés et `rate_per_second` appels HasData par seconde
+    (les hits de cache ne consomment pas de quota).
+    Renvoie (url, JobData) au fur et à mesure, dans l'ordre d'arrivée.
+    """
+    urls, seen = [], set()
+    for url in job_urls:
+        url = url.strip()
+        if url and job_id(url) not in seen:
+            seen.add(job_id(url))
+            urls.append(url)
+    if not urls:
+        return
+
+    limiter = RateLimiter(rate_per_second, burst=max(1, min(max_concurrency, int(rate_per_second) or 1)))
+    workers = max(1, min(max_concurrency, len(urls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job-scraper") as pool:
+        futures = {
+            pool.submit(scrape_job_url, url, use_cache=use_cache, rate_limiter=limiter): url
+            for url in urls
+        }
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                yield url, future.result()
+            except Exception as e:
+                print(f"[HasData] ERREUR pour {url}: {e}")
+                yield url, JobData(raw_text="", structured={})
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Récupération d'une annonce -> JSON structuré")
+    parser.add_argument("url", nargs="?", default="", help="lien de l'annonce")
+    parser.add_argument("--html", help="page d'annonce sauvegardée (parsing hors ligne, sans requête)")
+    parser.add_argument("--save", action="store_true", help="enregistrer l'annonce parsée dans le store")
+    parser.add_argument("--no-cache", action="store_true", help="ignorer le cache des annonces")
+    args = parser.parse_args(argv)
+
+    if args.html:
+        job = parse_job_file(args.html, args.url)
+        if job is None:
+            sys.exit(f"[JobScraper] Page non reconnue: {args.html}")
+        if args.save:
+            if not args.url:
+                sys.exit("[JobScraper] --save nécessite le lien de l'annonce.")
+            _save_to_store(args.url, job)
+    elif args.url:
+        job = scrape_job_url(args.url, use_cache=not args.no_cache, export=args.save)
+    else:
+        parser.error("lien de l'annonce ou --html requis")
+
+    print(json.dumps(job.structured, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,271 @@
+# src/services/job_store.py
+#
+# Stockage des annonces scrapées (SQLite):
+# - une ligne par version d'annonce: (job_id, empreinte du contenu) unique,
+#   un nouveau scraping identique ne crée pas de doublon
+# - payload HasData brut stocké une seule fois, compressé (zlib), par empreinte
+# - index sur l'annonce, l'entreprise et la date pour des recherches rapides
+# - last_job.json devient un pointeur vers une ligne du store
+#
+#   cd src && python -m services.job_store import ../exports      (anciens job_*.json)
+#   cd src && python -m services.job_store find --company Acme
+
+import os
+import sys
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import argparse
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+from models.data_models import JobData
+from services.job_cache import canonical_job_url, content_hash, job_id
+
+DEFAULT_JOB_STORE_PATH = os.path.join("exports", "jobs.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS payloads (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT,
+    company TEXT,
+    location TEXT,
+    content_hash TEXT NOT NULL,
+    payload_hash TEXT REFERENCES payloads(hash),
+    raw_text BLOB,
+    structured BLOB NOT NULL,
+    scraped_at REAL NOT NULL,
+    last_seen_at REAL NOT NULL,
+    UNIQUE (job_id, content_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_job_id ON jobs (job_id, last_seen_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs (company COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_jobs_scraped_at ON jobs (scraped_at);
+"""
+
+
+def _pack(obj: Any) -> bytes:
+    return zlib.compress(json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def _unpack(blob: Optional[bytes]) -> Any:
+    return json.loads(zlib.decompress(blob).decode("utf-8")) if blob else None
+
+
+class JobStore:
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.getenv("JOB_STORE_PATH", DEFAULT_JOB_STORE_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # une connexion par opération: utilisable depuis plusieurs threads (scraping en masse)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # --------------------------------------------------------
+    # Écriture
+    # --------------------------------------------------------
+    def save(self, job_url: str, job: JobData, scraped_at: Optional[float] = None) -> int:
+        """
+        Enregistre une annonce et retourne l'id de sa ligne.
+        Contenu identique à une version déjà stockée -> même ligne (date de dernière vue mise à jour).
+        """
+        now = scraped_at or time.time()
+        structured = {k: v for k, v in job.structured.items() if k != "raw_payload"}
+        payload = job.structured.get("raw_payload")
+        digest = content_hash(job.structured)
+        payload_blob = _pack(payload) if payload is not None else None
+        payload_hash = hashlib.sha256(payload_blob).hexdigest() if payload_blob else None
+
+        # INSERT OR IGNORE puis UPDATE dans la même transaction: deux scrapings
+        # concurrents de la même version ne peuvent pas se heurter à la contrainte UNIQUE
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                """
+                INSERT OR IGNORE INTO jobs (job_id, url, title, company, location, content_hash, payload_hash,
+                                            raw_text, structured, scraped_at, last_seen_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    job_id(job_url), canonical_job_url(job_url),
+                    structured.get("title", ""), structured.get("company", ""), structured.get("location", ""),
+                    digest, payload_hash, _pack(job.raw_text), _pack(structured), now, now,
+                ),
+            )
+            if cursor.rowcount:
+                if payload_hash:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO payloads (hash, data) VALUES (?, ?)", (payload_hash, payload_blob)
+                    )
+                return int(cursor.lastrowid)
+
+            # même annonce, même contenu: le payload (métadonnées de requête) n'est pas re-stocké
+            conn.execute(
+                "UPDATE jobs SET last_seen_at = MAX(last_seen_at, ?) WHERE job_id = ? AND content_hash = ?",
+                (now, job_id(job_url), digest),
+            )
+            return self._row_id(conn, job_url, digest)
+
+    def _row_id(self, conn: sqlite3.Connection, job_url: str, digest: str) -> Optional[int]:
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE job_id = ? AND content_hash = ?", (job_id(job_url), digest)
+        ).fetchone()
+        return int(row["id"]) if row else None
+
+    def find_row(self, job_url: str, job: JobData) -> Optional[int]:
+        """Id de la ligne qui stocke déjà cette version de l'annonce, None sinon."""
+        with closing(self._connect()) as conn:
+            return self._row_id(conn, job_url, content_hash(job.structured))
+
+    # --------------------------------------------------------
+    # Lecture
+    # --------------------------------------------------------
+    def _to_job(self, conn: sqlite3.Connection, row: sqlite3.Row, with_payload: bool = True) -> JobData:
+        structured = _unpack(row["structured"]) or {}
+        if with_payload and row["payload_hash"]:
+            blob = conn.execute("SELECT data FROM payloads WHERE hash = ?", (row["payload_hash"],)).fetchone()
+            structured["raw_payload"] = _unpack(blob["data"]) if blob else None
+        return JobData(raw_text=_unpack(row["raw_text"]) or "", structured=structured)
+
+    def get(self, row_id: int) -> Optional[JobData]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row_id,)).fetchone()
+            return self._to_job(conn, row) if row else None
+
+    def latest(self, job_url: str) -> Optional[JobData]:
+        """Dernier scraping connu de cette annonce (toutes variantes d'URL confondues)."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE job_id = ? ORDER BY last_seen_at DESC LIMIT 1", (job_id(job_url),)
+            ).fetchone()
+            return self._to_job(conn, row) if row else None
+
+    def find(
+        self,
+        company: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Recherche par entreprise et/ou période (métadonnées seulement, sans payload)."""
+        clauses, params = [], []
+        if company:
+            clauses.append("company = ? COLLATE NOCASE")
+            params.append(company)
+        if since is not None:
+            clauses.append("scraped_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("scraped_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT id, job_id, url, title, company, location, scraped_at, last_seen_at "
+                f"FROM jobs {where} ORDER BY scraped_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    # --------------------------------------------------------
+    # Migration des anciens exports
+    # --------------------------------------------------------
+    def import_exports(self, directory: str) -> int:
+        """Importe les anciens exports/job_*.json (l'URL est lue dans raw_payload.requestMetadata)."""
+        imported = 0
+        for name in sorted(os.listdir(directory)):
+            if not (name.startswith("job_") and name.endswith(".json")):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    structured = json.load(f)
+            except (OSError, ValueError):
+                continue
+            url = ((structured.get("raw_payload") or {}).get("requestMetadata") or {}).get("url")
+            raw_text = "\n\n".join(
+                x for x in [structured.get(k) for k in ("title", "company", "location", "description")] if x
+            )
+            if not url or not raw_text:
+                continue  # scraping échoué (annonce vide)
+            self.save(url, JobData(raw_text=raw_text, structured=structured), scraped_at=os.path.getmtime(path))
+            imported += 1
+        return imported
+
+
+# ------------------------------------------------------------
+# last_job.json = pointeur vers le store
+# ------------------------------------------------------------
+def write_job_pointer(pointer_path: str, job_url: str, job: JobData, store: Optional[JobStore] = None) -> int:
+    """
+    Écrit last_job.json. L'annonce est normalement déjà dans le store (scrape_job_url l'y enregistre):
+    elle n'est sauvegardée ici que si cette version est absente (ex: scraping avec export=False).
+    """
+    store = store or JobStore()
+    row_id = store.find_row(job_url, job)
+    if row_id is None:
+        row_id = store.save(job_url, job)
+    pointer = {"store": store.db_path, "id": row_id, "job_id": job_id(job_url), "url": canonical_job_url(job_url)}
+    with open(pointer_path, "w", encoding="utf-8") as f:
+        json.dump(pointer, f, ensure_ascii=False)
+    return row_id
+
+
+def load_job_pointer(pointer_path: str) -> JobData:
+    """
+    Lit last_job.json: pointeur {"store", "id"} vers le store,
+    ou ancien format (copie complète du JSON structuré).
+    """
+    with open(pointer_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if "store" not in data or "id" not in data:
+        return JobData(raw_text="", structured=data)
+
+    job = JobStore(data["store"]).get(int(data["id"]))
+    if job is None:
+        raise FileNotFoundError(f"Annonce {data['id']} absente du store {data['store']}")
+    return job
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Store des annonces scrapées")
+    parser.add_argument("--db", default=None, help=f"base SQLite (défaut: {DEFAULT_JOB_STORE_PATH})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="importer d'anciens exports/job_*.json")
+    imp.add_argument("directory")
+    find = sub.add_parser("find", help="rechercher des annonces")
+    find.add_argument("--url")
+    find.add_argument("--company")
+    find.add_argument("--days", type=float, help="scrapées dans les N derniers jours")
+    find.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    store = JobStore(args.db)
+    if args.command == "import":
+        print(f"[JobStore] {store.import_exports(args.directory)} export(s) importé(s) dans {store.db_path}")
+        return
+
+    if args.url:
+        job = store.latest(args.url)
+        print(json.dumps(job.structured if job else None, ensure_ascii=False, indent=2))
+        return
+    since = time.time() - args.days * 86400 if args.days else None
+    for row in store.find(company=args.company, since=since, limit=args.limit):
+        scraped = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["scraped_at"]))
+        print(f"{row['id']:>5}  {scraped}  {row['company'] or '-'}  {row['title'] or '-'}  {row['url']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,66 +1,204 @@
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
 import requests
-from config import NOTION_API_KEY, NOTION_DATABASE_ID, NOTION_OUTPUT_PATH
+from config import NOTION_API_KEY, NOTION_API_URL, NOTION_DATABASE_ID, NOTION_OUTPUT_PATH
 
+NOTION_VERSION = "2022-06-28"
+# Limite Notion: 100 blocs enfants par requête (création de page ou ajout)
+NOTION_MAX_BLOCKS_PER_REQUEST = 100
+NOTION_MAX_RETRIES = 3
 
-def save_markdown_locally(markdown: str) -> None:
-    with open(NOTION_OUTPUT_PATH, "w", encoding="utf-8") as f:
-        f.write(markdown)
-    print(f"[Notion] Markdown sauvegardé dans {NOTION_OUTPUT_PATH}")
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
 
 
-def _chunk_text(text: str, max_len: int = 1800):
-    chunks = []
-    current = ""
+def save_markdown_locally(markdown: str, path: Optional[str] = None) -> None:
+    path = path or NOTION_OUTPUT_PATH
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(markdown)
+    print(f"[Notion] Markdown sauvegardé dans {path}")
 
-    for line in text.split("\n"):
-        if len(current) + len(line) + 1 <= max_len:
-            current += line + "\n"
-        else:
-            if current:
-                chunks.append(current.rstrip("\n"))
-            while len(line) > max_len:
-                chunks.append(line[:max_len])
-                line = line[max_len:]
-            current = line + "\n"
 
-    if current.strip():
-        chunks.append(current.rstrip("\n"))
+def iter_chunks(text: Union[str, Iterable[str]], max_len: int = 1800) -> Iterator[str]:
+    """
+    Découpe le texte en morceaux d'au plus max_len caractères, coupés aux fins de ligne.
+    Linéaire en la taille du texte: les lignes sont accumulées dans une liste
+    et jointes une seule fois par morceau. Accepte une chaîne ou un itérable de lignes.
+    """
+    lines = text.split("\n") if isinstance(text, str) else (l.rstrip("\n") for l in text)
+    parts: List[str] = []
+    size = 0
 
-    return chunks
+    for line in lines:
+        if size + len(line) + 1 <= max_len:
+            parts.append(line)
+            size += len(line) + 1
+            continue
+        if parts:
+            yield "\n".join(parts).rstrip("\n")
+            parts, size = [], 0
+        # ligne plus longue que max_len: découpée sans recopier le reste à chaque tour
+        start = 0
+        while len(line) - start > max_len:
+            yield line[start:start + max_len]
+            start += max_len
+        rest = line[start:]
+        parts, size = [rest], len(rest) + 1
 
+    if parts and "".join(parts).strip():
+        yield "\n".join(parts).rstrip("\n")
 
-def create_notion_page(title: str, markdown: str) -> None:
-    if not NOTION_API_KEY or not NOTION_DATABASE_ID:
-        print("[Notion] API key ou database ID manquant, export local uniquement.")
-        save_markdown_locally(markdown)
-        return
 
-    url = "https://api.notion.com/v1/pages"
-    headers = {
-        "Authorization": f"Bearer {NOTION_API_KEY}",
-        "Content-Type": "application/json",
-        "Notion-Version": "2022-06-28",
-    }
+def _chunk_text(text: str, max_len: int = 1800):
+    return list(iter_chunks(text, max_len))
 
-    chunks = _chunk_text(markdown, max_len=1800)
 
-    children = [{
+def _paragraph_block(chunk: str) -> Dict[str, Any]:
+    return {
         "object": "block",
         "type": "paragraph",
         "paragraph": {
             "rich_text": [{"type": "text", "text": {"content": chunk}}]
         },
-    } for chunk in chunks]
-
-    payload = {
-        "parent": {"database_id": NOTION_DATABASE_ID},
-        "properties": {"Name": {"title": [{"text": {"content": title}}]}},
-        "children": children,
     }
 
-    resp = requests.post(url, json=payload, headers=headers, timeout=30)
-    if resp.status_code >= 400:
-        print(f"[Notion] Erreur {resp.status_code}: {resp.text}")
-        save_markdown_locally(markdown)
+
+def iter_block_batches(markdown: str, batch_size: int = NOTION_MAX_BLOCKS_PER_REQUEST) -> Iterator[List[Dict[str, Any]]]:
+    """Blocs paragraphe par lots de batch_size (générés à la demande)."""
+    batch: List[Dict[str, Any]] = []
+    for chunk in iter_chunks(markdown, max_len=1800):
+        batch.append(_paragraph_block(chunk))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _notion_session() -> requests.Session:
+    """Session keep-alive partagée (une seule connexion TLS pour toutes les requêtes d'un export)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update({
+                "Authorization": f"Bearer {NOTION_API_KEY}",
+                "Content-Type": "application/json",
+                "Notion-Version": NOTION_VERSION,
+            })
+            _session = session
+        return _session
+
+
+def _notion_request(method: str, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Requête Notion avec retries sur 429/5xx (Retry-After respecté). Lève RuntimeError sinon."""
+    url = f"{NOTION_API_URL}{path}"
+    for attempt in range(NOTION_MAX_RETRIES + 1):
+        resp = _notion_session().request(method, url, json=payload, timeout=30)
+        if resp.status_code < 400:
+            return resp.json()
+        if resp.status_code in (429, 500, 502, 503, 504) and attempt < NOTION_MAX_RETRIES:
+            delay = float(resp.headers.get("Retry-After") or 0.5 * 2 ** attempt)
+            print(f"[Notion] {resp.status_code}, nouvel essai dans {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        raise RuntimeError(f"Erreur {resp.status_code}: {resp.text}")
+    raise RuntimeError("Notion injoignable")
+
+
+def notion_configured() -> bool:
+    return bool(NOTION_API_KEY and NOTION_DATABASE_ID)
+
+
+def publish_notion_page(title: str, markdown: str, progress: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Crée la page avec le premier lot de blocs, puis ajoute les suivants par lots de 100
+    (PATCH /blocks/{page}/children). Les ajouts restent dans l'ordre; l'envoi d'un lot
+    est recouvert par la préparation du suivant.
+
+    `progress` ({"page_id", "batches_sent"}) est mis à jour au fil de l'envoi: repassé
+    lors d'un nouvel essai, il permet de reprendre sans recréer la page.
+    Retourne l'id de la page; lève RuntimeError en cas d'échec.
+    """
+    progress = progress if progress is not None else {}
+    t0 = time.perf_counter()
+    batches = iter_block_batches(markdown)
+
+    page_id = progress.get("page_id")
+    if page_id is None:
+        first = next(batches, [])
+        payload = {
+            "parent": {"database_id": NOTION_DATABASE_ID},
+            "properties": {"Name": {"title": [{"text": {"content": title}}]}},
+            "children": first,
+        }
+        page_id = _notion_request("POST", "/pages", payload)["id"]
+        progress.update(page_id=page_id, batches_sent=1)
     else:
-        print("[Notion] Page créée avec succès.")
+        for _ in range(progress.get("batches_sent", 1)):
+            next(batches, None)
+
+    def append(batch: List[Dict[str, Any]]) -> None:
+        _notion_request("PATCH", f"/blocks/{page_id}/children", {"children": batch})
+        progress["batches_sent"] = progress.get("batches_sent", 1) + 1
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="notion-append") as sender:
+        pending = None
+        for batch in batches:
+            if pending is not None:
+                pending.result()
+            pending = sender.submit(append, batch)
+        if pending is not None:
+            pending.result()
+
+    print(f"[Notion] Page créée avec succès ({progress['batches_sent']} lot(s), {time.perf_counter() - t0:.2f}s).")
+    return page_id
+
+
+def create_notion_page(title: str, markdown: str) -> Optional[str]:
+    """Export synchrone: Notion si configuré, sinon (ou en cas d'erreur) fichier local."""
+    if not notion_configured():
+        print("[Notion] API key ou database ID manquant, export local uniquement.")
+        save_markdown_locally(markdown)
+        return None
+
+    try:
+        return publish_notion_page(title, markdown)
+    except Exception as e:
+        print(f"[Notion] {e}")
+        save_markdown_locally(markdown)
+        return None
+
+
+def benchmark_chunker(sizes_mb: Iterable[float] = (0.5, 1, 2, 4, 8)) -> List[Dict[str, float]]:
+    """
+    Temps de préparation de l'export (découpage + blocs) selon la taille du markdown.
+    Le temps par Mo doit rester à peu près constant (croissance linéaire).
+    """
+    paragraph = (
+        "## Question\n"
+        "Pouvez-vous décrire un projet dont vous êtes fier ?\n"
+        "- Réponse: " + "le candidat détaille son rôle, ses choix techniques et les résultats. " * 6 + "\n"
+    )
+    long_line = "x" * 50_000 + "\n"
+    results = []
+    for size_mb in sizes_mb:
+        target = int(size_mb * 1024 * 1024)
+        unit = paragraph * 20 + long_line
+        markdown = unit * max(1, target // len(unit))
+        t0 = time.perf_counter()
+        blocks = sum(len(batch) for batch in iter_block_batches(markdown))
+        elapsed = time.perf_counter() - t0
+        mb = len(markdown) / (1024 * 1024)
+        results.append({"mb": mb, "blocks": blocks, "seconds": elapsed, "s_per_mb": elapsed / mb})
+        print(f"[Bench] {mb:6.2f} Mo -> {blocks:6d} blocs en {elapsed:.3f}s ({elapsed / mb:.3f}s/Mo)")
+    return results
+
+
+if __name__ == "__main__":
+    # cd src && python -m services.notion_export [tailles en Mo...]
+    benchmark_chunker([float(x) for x in sys.argv[1:]] or (0.5, 1, 2, 4, 8))
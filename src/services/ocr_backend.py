@@ -0,0 +1,202 @@
+# src/services/ocr_backend.py
+#
+# Moteur OCR interchangeable:
+# - "tesserocr": Tesseract chargé dans le process (API C), une instance longue
+#   durée par process/worker, images passées en mémoire (pas de fichier temporaire)
+# - "pytesseract": fallback, un sous-process tesseract par page
+# Le choix (CV_OCR_BACKEND=auto|tesserocr|pytesseract) et la recherche du binaire
+# ne sont faits qu'une fois par process.
+
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+import pytesseract
+from pytesseract import Output, TesseractNotFoundError
+
+try:
+    import tesserocr
+except ImportError:  # dépendance optionnelle (pip install tesserocr)
+    tesserocr = None
+
+# chemins possibles pour tesseract selon l'OS / installation
+TESSERACT_CANDIDATE_PATHS: List[str] = [
+    "/opt/homebrew/bin/tesseract",   # macOS (Homebrew Apple Silicon)
+    "/usr/local/bin/tesseract",      # macOS (Homebrew Intel) / Linux
+    "/usr/bin/tesseract",            # Linux
+]
+
+OCR_BACKEND = os.getenv("CV_OCR_BACKEND", "auto").lower()
+OCR_LANG = os.getenv("CV_OCR_LANG", "eng")
+
+_tesseract_checked = False
+
+
+def ensure_tesseract_available() -> None:
+    """
+    Essaie de configurer pytesseract.pytesseract.tesseract_cmd
+    en cherchant tesseract dans quelques chemins classiques.
+    Si rien n'est trouvé, lève une RuntimeError avec un message clair.
+    Le résultat est mémorisé pour le process.
+    """
+    global _tesseract_checked
+    if _tesseract_checked:
+        return
+
+    # si déjà configuré et accessible, on ne touche à rien
+    current_cmd = pytesseract.pytesseract.tesseract_cmd
+    if current_cmd and os.path.exists(current_cmd):
+        _tesseract_checked = True
+        return
+
+    # sinon on essaie de deviner
+    for path in TESSERACT_CANDIDATE_PATHS:
+        if os.path.exists(path):
+            pytesseract.pytesseract.tesseract_cmd = path
+            print(f"[OCR] ✅ Tesseract trouvé: {path}")
+            _tesseract_checked = True
+            return
+
+    # si rien trouvé -> erreur explicite
+    raise RuntimeError(
+        "[OCR] ❌ Tesseract introuvable.\n"
+        "Installe-le d'abord, par exemple sur macOS:\n"
+        "  brew install tesseract\n"
+        "Puis relance le programme."
+    )
+
+
+def _config_value(config: str, flag: str, default: int) -> int:
+    m = re.search(rf"--{flag}\s+(\d+)", config)
+    return int(m.group(1)) if m else default
+
+
+def _config_variables(config: str) -> Dict[str, str]:
+    return dict(re.findall(r"-c\s+(\w+)=(\S+)", config))
+
+
+class PytesseractBackend:
+    """Fallback: binaire tesseract appelé en sous-process pour chaque image."""
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str = OCR_LANG):
+        ensure_tesseract_available()
+        self.lang = lang
+
+    def image_to_data(self, img, config: str) -> Dict[str, List[Any]]:
+        try:
+            return pytesseract.image_to_data(img, lang=self.lang, config=config, output_type=Output.DICT)
+        except TesseractNotFoundError:
+            raise RuntimeError(
+                "[OCR] ❌ Tesseract non trouvé pendant l'OCR.\n"
+                "Vérifie l'installation (brew install tesseract) "
+                "et que le binaire est dans le PATH."
+            )
+
+
+class TesserocrBackend:
+    """
+    Tesseract dans le process via tesserocr: le moteur (modèles de langue chargés)
+    est réutilisé d'une page à l'autre et l'image PIL est passée en mémoire.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str = OCR_LANG, config: str = ""):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr n'est pas installé")
+        self.lang = lang
+        self._api = None
+        self._config: Optional[str] = None
+        self._lock = threading.Lock()   # une instance Tesseract n'est pas thread-safe
+        self._ensure_api(config)        # échoue tout de suite si tessdata/langue manquent
+
+    def _ensure_api(self, config: str):
+        if self._api is not None and self._config == config:
+            return self._api
+        if self._api is not None:
+            self._api.End()
+        api = tesserocr.PyTessBaseAPI(
+            lang=self.lang,
+            psm=_config_value(config, "psm", tesserocr.PSM.AUTO),
+            oem=_config_value(config, "oem", tesserocr.OEM.DEFAULT),
+        )
+        for key, value in _config_variables(config).items():
+            api.SetVariable(key, value)
+        self._api, self._config = api, config
+        return api
+
+    def image_to_data(self, img, config: str) -> Dict[str, List[Any]]:
+        """Même format que pytesseract.image_to_data(output_type=DICT) (champs utiles)."""
+        data: Dict[str, List[Any]] = {"text": [], "conf": [], "block_num": [], "par_num": [], "line_num": []}
+        RIL = tesserocr.RIL
+        with self._lock:
+            api = self._ensure_api(config)
+            api.SetImage(img)
+            api.Recognize()
+            block = par = line = 0
+            for word in tesserocr.iterate_level(api.GetIterator(), RIL.WORD):
+                if word.IsAtBeginningOf(RIL.BLOCK):
+                    block, par, line = block + 1, 0, 0
+                if word.IsAtBeginningOf(RIL.PARA):
+                    par, line = par + 1, 0
+                if word.IsAtBeginningOf(RIL.TEXTLINE):
+                    line += 1
+                data["text"].append(word.GetUTF8Text(RIL.WORD) or "")
+                data["conf"].append(word.Confidence(RIL.WORD))
+                data["block_num"].append(block)
+                data["par_num"].append(par)
+                data["line_num"].append(line)
+            api.Clear()
+        return data
+
+    def close(self) -> None:
+        if self._api is not None:
+            self._api.End()
+            self._api = None
+
+
+_backend = None
+_backend_pid: Optional[int] = None
+_backend_lock = threading.Lock()
+
+
+def get_ocr_backend(config: str = ""):
+    """
+    Moteur OCR du process courant (créé au premier appel puis réutilisé).
+    Après un fork (workers du pool OCR), chaque process crée le sien.
+    """
+    global _backend, _backend_pid
+    pid = os.getpid()
+    if _backend is not None and _backend_pid == pid:
+        return _backend
+
+    with _backend_lock:
+        if _backend is not None and _backend_pid == pid:
+            return _backend
+        backend = None
+        if OCR_BACKEND in ("auto", "tesserocr"):
+            try:
+                backend = TesserocrBackend(config=config)
+            except Exception as e:
+                if OCR_BACKEND == "tesserocr":
+                    print("[OCR] ⚠️ tesserocr indisponible, fallback pytesseract:", e)
+        if backend is None:
+            backend = PytesseractBackend()
+        _backend, _backend_pid = backend, pid
+        return backend
+
+
+def ocr_backend_name(config: str = "") -> str:
+    """
+    Nom du moteur réellement utilisé par ce process, pour les clés de cache.
+    Le moteur est créé si besoin (une fois): tesserocr installé mais inutilisable
+    (tessdata/langue manquants) donne bien "pytesseract".
+    """
+    try:
+        return get_ocr_backend(config).name
+    except Exception:
+        # aucun moteur disponible: pas d'OCR possible, seul le fallback sans moteur reste
+        return "pytesseract"
@@ -0,0 +1,287 @@
+# src/services/tts_cache.py
+#
+# Cache de synthèse vocale par phrase:
+# - clé = (texte normalisé, voix, modèle, format audio)
+# - mémoire: LRU borné en octets
+# - disque: un fichier audio par clé, éviction LRU (date de dernier accès) par taille totale
+# - pré-chauffage au démarrage avec les phrases fixes (intro, clôture)
+#   pour qu'elles soient jouées sans latence de synthèse; les phrases absentes
+#   du disque sont synthétisées en arrière-plan, sans bloquer le démarrage
+
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from services.tts_service import TTS_FORMAT, TTS_MODEL, TTS_VOICE, generate_tts_audio
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "tts")
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024     # 32 MB
+DEFAULT_DISK_MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+
+# Phrases dites à l'identique à chaque entretien
+CANNED_PHRASES: Dict[str, str] = {
+    "intro": (
+        "Bonjour, merci d'être présente pour cet entretien. "
+        "Pour commencer, pouvez-vous vous présenter brièvement "
+        "et m'expliquer ce qui vous motive pour ce poste ?"
+    ),
+    "closing": "Merci, l'entretien est terminé. Nous avons couvert les points essentiels.",
+    "closing_short": "Merci, l'entretien est terminé.",
+    "closing_demo": "Nous arrivons au terme de cette démonstration.",
+}
+
+
+def normalize_phrase(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_tts_key(text: str, voice: str, model: str, fmt: str) -> str:
+    payload = json.dumps([normalize_phrase(text), voice, model, fmt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_prewarm_phrases(path: Optional[str] = None) -> List[str]:
+    """
+    Phrases à pré-synthétiser: CANNED_PHRASES, plus une phrase par ligne
+    du fichier TTS_PREWARM_FILE s'il est défini.
+    """
+    phrases = list(CANNED_PHRASES.values())
+    path = path or os.getenv("TTS_PREWARM_FILE")
+    if path and os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            phrases.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    return list(dict.fromkeys(normalize_phrase(p) for p in phrases))
+
+
+class TTSAudioCache:
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        max_disk_bytes: int = DEFAULT_DISK_MAX_BYTES,
+        voice: str = TTS_VOICE,
+        model: str = TTS_MODEL,
+    ):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.voice = voice
+        self.model = model
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        # taille totale du dossier, tenue à jour à chaque écriture (None = à recalculer)
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "TTSAudioCache":
+        return cls(
+            cache_dir=os.getenv("TTS_CACHE_DIR", DEFAULT_CACHE_DIR),
+            max_memory_bytes=int(os.getenv("TTS_CACHE_MEMORY_BYTES", DEFAULT_MEMORY_BYTES)),
+            max_disk_bytes=int(os.getenv("TTS_CACHE_MAX_BYTES", DEFAULT_DISK_MAX_BYTES)),
+        )
+
+    # --------------------------------------------------------
+    # Helpers
+    # --------------------------------------------------------
+    def _key(self, text: str, fmt: str) -> str:
+        return make_tts_key(text, self.voice, self.model, fmt)
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{fmt}")
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = audio
+            self._memory_bytes += len(audio)
+            while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    # --------------------------------------------------------
+    # Public API
+    # --------------------------------------------------------
+    def get(self, text: str, fmt: Optional[str] = None) -> Optional[bytes]:
+        fmt = fmt or TTS_FORMAT
+        key = self._key(text, fmt)
+
+        # 1) mémoire
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return audio
+
+        # 2) disque
+        path = self._path(key, fmt)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)   # dernier accès = mtime: l'éviction disque reste LRU
+        except OSError:
+            pass
+
+        self._remember(key, audio)
+        self.disk_hits += 1
+        return audio
+
+    def contains(self, text: str, fmt: Optional[str] = None) -> bool:
+        """Phrase déjà en cache (mémoire ou disque), sans lecture ni statistique."""
+        fmt = fmt or TTS_FORMAT
+        key = self._key(text, fmt)
+        with self._lock:
+            if key in self._memory:
+                return True
+        return os.path.exists(self._path(key, fmt))
+
+    def set(self, text: str, audio: bytes, fmt: Optional[str] = None) -> None:
+        if not audio:
+            return
+        fmt = fmt or TTS_FORMAT
+        key = self._key(text, fmt)
+        self._remember(key, audio)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key, fmt)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+
+            with self._lock:
+                if self._disk_bytes is not None:
+                    self._disk_bytes += len(audio) - previous
+                needs_sweep = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+            if needs_sweep:
+                self._evict_disk()
+        except OSError as e:
+            print("[TTSCache] ⚠️ Écriture disque impossible:", e)
+
+    def synthesize(self, text: str, fmt: Optional[str] = None) -> bytes:
+        """Audio de la phrase: cache si possible, sinon synthèse puis mise en cache."""
+        audio = self.get(text, fmt)
+        if audio is not None:
+            return audio
+        # même voix/modèle que la clé: un cache "nova" ne stocke jamais de l'audio "alloy"
+        audio = generate_tts_audio(normalize_phrase(text), fmt, voice=self.voice, model=self.model)
+        self.set(text, audio, fmt)
+        return audio
+
+    def prewarm(self, phrases: Iterable[str], fmt: Optional[str] = None, max_workers: int = 4) -> int:
+        """Charge (ou synthétise) les phrases en parallèle. Retourne le nombre de phrases prêtes."""
+        phrases = list(phrases)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="tts-prewarm") as pool:
+            ready = sum(1 for audio in pool.map(lambda p: self.synthesize(p, fmt), phrases) if audio)
+        print(f"[TTSCache] Pré-chauffage: {ready}/{len(phrases)} phrase(s) prêtes ({fmt or TTS_FORMAT}).")
+        return ready
+
+    def _evict_disk(self) -> None:
+        """
+        Supprime les fichiers les moins récemment utilisés jusqu'à repasser sous max_disk_bytes.
+        Recalcule la taille totale du dossier: appelé au premier set() puis seulement en cas de dépassement.
+        """
+        files = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        if total > self.max_disk_bytes:
+            files.sort()
+            for _, size, path in files:
+                if total <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+        }
+
+
+_cache: Optional[TTSAudioCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSAudioCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TTSAudioCache.from_env()
+        return _cache
+
+
+def _prewarm_cold(cache: TTSAudioCache, phrases: List[str], fmt: Optional[str]) -> int:
+    try:
+        return cache.prewarm(phrases, fmt)
+    except Exception as e:
+        print("[TTSCache] ⚠️ Pré-chauffage impossible:", e)
+        return 0
+
+
+def prewarm_tts_cache(fmt: Optional[str] = None, background: bool = True) -> int:
+    """
+    À appeler au démarrage du process (worker LiveKit, simulateur).
+    Les phrases déjà sur disque sont chargées en mémoire tout de suite (lecture locale);
+    les autres sont synthétisées dans un thread d'arrière-plan si `background`, pour ne
+    pas bloquer le démarrage sur un cache froid. Retourne le nombre de phrases prêtes au retour.
+    """
+    if os.getenv("TTS_PREWARM", "1") != "1":
+        return 0
+    try:
+        cache = get_tts_cache()
+        phrases = load_prewarm_phrases()
+        warm = [p for p in phrases if cache.contains(p, fmt)]
+        cold = [p for p in phrases if p not in warm]
+        ready = cache.prewarm(warm, fmt) if warm else 0
+    except Exception as e:
+        print("[TTSCache] ⚠️ Pré-chauffage impossible:", e)
+        return 0
+    if not cold:
+        return ready
+    if not background:
+        return ready + _prewarm_cold(cache, cold, fmt)
+
+    print(f"[TTSCache] {len(cold)} phrase(s) à synthétiser en arrière-plan.")
+    threading.Thread(
+        target=_prewarm_cold, args=(cache, cold, fmt), name="tts-prewarm-cold", daemon=True
+    ).start()
+    return ready
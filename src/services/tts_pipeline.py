@@ -0,0 +1,243 @@
+# src/services/tts_pipeline.py
+#
+# Synthèse vocale pipelinée phrase par phrase:
+# - chaque phrase part en synthèse dès qu'elle est connue (parallélisme borné)
+# - les segments sont rendus strictement dans l'ordre, dès que le suivant est prêt
+# - le premier son est disponible après la synthèse d'une seule phrase,
+#   quelle que soit la longueur de la question
+# - métriques: time-to-first-audio (TTFA) et temps total
+
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from services.tts_service import PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH, TTS_FORMAT
+from utils.stream_parsing import split_sentences
+
+TTS_MAX_PARALLEL = int(os.getenv("TTS_MAX_PARALLEL", "3"))
+
+# formats dont les segments se recollent sans réencodage
+# (wav: un en-tête par segment, opus/flac: conteneur par segment -> non recollables).
+# Seul pcm est strictement sans trou: en mp3 les en-têtes par segment (ID3, trame Xing/Info)
+# sont retirés, mais le délai/remplissage de l'encodeur laisse quelques ms à chaque jointure.
+JOINABLE_FORMATS = ("pcm", "mp3", "aac")
+
+# tables MPEG audio (couche III) pour calculer la longueur d'une trame
+_MP3_BITRATES_KBPS = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],   # MPEG-1
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],       # MPEG-2 / 2.5
+}
+_MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+_AAC_SAMPLE_RATES = [96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350]
+
+# formats lisibles par le navigateur dont la durée se lit dans les en-têtes:
+# lecture dans la page segment par segment, chacun lancé à la fin du précédent
+TIMED_PAGE_FORMATS = ("mp3", "aac", "wav")
+
+Synthesizer = Callable[[str, Optional[str]], bytes]
+
+
+@dataclass
+class TTSPipelineMetrics:
+    segments: int = 0
+    failed: int = 0
+    audio_bytes: int = 0
+    ttfa_s: Optional[float] = None   # premier segment prêt à être joué
+    total_s: float = 0.0             # dernier segment rendu
+    synth_s: float = 0.0             # somme des temps de synthèse (séquentiel équivalent)
+    segment_s: List[float] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "segments": self.segments,
+            "failed": self.failed,
+            "audio_bytes": self.audio_bytes,
+            "ttfa_s": self.ttfa_s,
+            "total_s": self.total_s,
+            "synth_s": self.synth_s,
+        }
+
+    def report(self) -> str:
+        ttfa = f"{self.ttfa_s:.2f}s" if self.ttfa_s is not None else "-"
+        return (
+            f"{self.segments} segment(s), TTFA {ttfa}, total {self.total_s:.2f}s "
+            f"(synthèse cumulée {self.synth_s:.2f}s)"
+        )
+
+
+def _default_synthesizer() -> Synthesizer:
+    from services.tts_cache import get_tts_cache
+
+    return get_tts_cache().synthesize
+
+
+def iter_tts_pipeline(
+    sentences: Iterable[str],
+    fmt: Optional[str] = None,
+    max_parallel: int = TTS_MAX_PARALLEL,
+    synthesize: Optional[Synthesizer] = None,
+    metrics: Optional[TTSPipelineMetrics] = None,
+) -> Iterator[Tuple[str, bytes]]:
+    """
+    Génère (phrase, audio) dans l'ordre des phrases.
+    `sentences` peut être un flux (ex: phrases d'une complétion LLM en streaming):
+    il est consommé par un thread dédié, si bien que la lecture d'un segment par
+    l'appelant ne retarde ni la lecture du flux ni la synthèse des phrases suivantes.
+    Les phrases dont la synthèse échoue sont sautées (comptées dans metrics.failed).
+    """
+    synthesize = synthesize or _default_synthesizer()
+    metrics = metrics if metrics is not None else TTSPipelineMetrics()
+    t0 = time.perf_counter()
+    order: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+    feed_error: List[BaseException] = []
+
+    def timed(sentence: str) -> Tuple[bytes, float]:
+        t = time.perf_counter()
+        audio = synthesize(sentence, fmt)
+        return audio, time.perf_counter() - t
+
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel), thread_name_prefix="tts-pipeline") as pool:
+
+        def feed() -> None:
+            try:
+                for sentence in sentences:
+                    if sentence.strip():
+                        order.put((sentence, pool.submit(timed, sentence)))
+            except BaseException as e:   # relancée côté appelant
+                feed_error.append(e)
+            finally:
+                order.put(None)
+
+        feeder = threading.Thread(target=feed, name="tts-pipeline-feed", daemon=True)
+        feeder.start()
+
+        while True:
+            item = order.get()
+            if item is None:
+                break
+            sentence, future = item
+            audio, elapsed = future.result()
+            metrics.synth_s += elapsed
+            metrics.segment_s.append(elapsed)
+            if not audio:
+                metrics.failed += 1
+                continue
+            if metrics.ttfa_s is None:
+                metrics.ttfa_s = time.perf_counter() - t0
+            metrics.segments += 1
+            metrics.audio_bytes += len(audio)
+            yield sentence, audio
+
+        feeder.join()
+        metrics.total_s = time.perf_counter() - t0
+
+    if feed_error:
+        raise feed_error[0]
+
+
+def _mp3_frame_info(header: bytes) -> Optional[Tuple[int, int, int]]:
+    """(longueur en octets, échantillons, fréquence) de la trame MPEG couche III qui commence par `header`."""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03          # 3: MPEG-1, 2: MPEG-2, 0: MPEG-2.5
+    layer = (header[1] >> 1) & 0x03            # 1: couche III
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = _MP3_BITRATES_KBPS[1 if version == 3 else 2][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 0x01
+    length = (144 if version == 3 else 72) * bitrate // sample_rate + padding
+    return length, 1152 if version == 3 else 576, sample_rate
+
+
+def _mp3_frame_length(header: bytes) -> int:
+    """Longueur (octets) de la trame MPEG couche III qui commence par `header`, 0 si l'en-tête est invalide."""
+    info = _mp3_frame_info(header)
+    return info[0] if info else 0
+
+
+def strip_mp3_headers(segment: bytes) -> bytes:
+    """
+    Retire d'un segment mp3 ce qui ne doit figurer qu'une fois par fichier:
+    - tag ID3v2 en tête
+    - trame Xing/Info (durée et nombre de trames du segment seul, fausse une fois recollé)
+    """
+    start = 0
+    if segment[:3] == b"ID3" and len(segment) >= 10:
+        size = (segment[6] << 21) | (segment[7] << 14) | (segment[8] << 7) | segment[9]
+        start = 10 + size + (10 if segment[5] & 0x10 else 0)   # pied de tag éventuel
+    length = _mp3_frame_length(segment[start:start + 4])
+    if length and (b"Xing" in segment[start:start + 64] or b"Info" in segment[start:start + 64]):
+        start += length
+    return segment[start:]
+
+
+def audio_duration(audio: bytes, fmt: Optional[str] = None) -> Optional[float]:
+    """
+    Durée (secondes) d'un segment audio, lue dans ses en-têtes sans décodage.
+    None si le format n'est pas mesurable (opus, flac) ou le flux non reconnu.
+    """
+    fmt = fmt or TTS_FORMAT
+    if fmt == "pcm":
+        return len(audio) / (PCM_SAMPLE_RATE * PCM_SAMPLE_WIDTH)
+    if fmt == "wav":
+        if len(audio) < 44 or audio[:4] != b"RIFF":
+            return None
+        byte_rate = int.from_bytes(audio[28:32], "little")
+        return (len(audio) - 44) / byte_rate if byte_rate else None
+
+    samples, sample_rate, pos = 0, 0, 0
+    if fmt == "mp3":
+        audio = strip_mp3_headers(audio)
+        while pos + 4 <= len(audio):
+            info = _mp3_frame_info(audio[pos:pos + 4])
+            if info is None:
+                break
+            length, frame_samples, sample_rate = info
+            samples += frame_samples
+            pos += length
+    elif fmt == "aac":
+        # trames ADTS: 1024 échantillons chacune
+        while pos + 7 <= len(audio) and audio[pos] == 0xFF and audio[pos + 1] & 0xF0 == 0xF0:
+            rate_index = (audio[pos + 2] >> 2) & 0x0F
+            length = ((audio[pos + 3] & 0x03) << 11) | (audio[pos + 4] << 3) | (audio[pos + 5] >> 5)
+            if rate_index >= len(_AAC_SAMPLE_RATES) or length < 7:
+                break
+            sample_rate = _AAC_SAMPLE_RATES[rate_index]
+            samples += 1024
+            pos += length
+    return samples / sample_rate if sample_rate else None
+
+
+def join_audio_segments(segments: Iterable[bytes], fmt: Optional[str] = None) -> bytes:
+    """
+    Recolle des segments audio bout à bout:
+    - pcm: concaténation des échantillons (sans trou)
+    - mp3: concaténation des trames, en-têtes par segment retirés (ID3, Xing/Info)
+    - aac (ADTS): concaténation des trames, chacune porte son en-tête
+    """
+    fmt = fmt or TTS_FORMAT
+    if fmt not in JOINABLE_FORMATS:
+        raise ValueError(f"Format {fmt!r} non recollable (formats possibles: {', '.join(JOINABLE_FORMATS)})")
+    if fmt == "mp3":
+        segments = (strip_mp3_headers(segment) for segment in segments)
+    return b"".join(segments)
+
+
+def pipelined_tts_audio(
+    text: str,
+    fmt: Optional[str] = None,
+    max_parallel: int = TTS_MAX_PARALLEL,
+    synthesize: Optional[Synthesizer] = None,
+) -> Tuple[bytes, TTSPipelineMetrics]:
+    """Texte complet -> phrases synthétisées en parallèle -> un seul clip recollé."""
+    metrics = TTSPipelineMetrics()
+    segments = [audio for _, audio in iter_tts_pipeline(split_sentences(text), fmt, max_parallel, synthesize, metrics)]
+    return join_audio_segments(segments, fmt), metrics
+
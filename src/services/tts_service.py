@@ -1,30 +1,117 @@
 # src/services/tts_service.py
+#
+# Synthèse vocale OpenAI en streaming, sans fichier temporaire:
+# - iter_tts_chunks(): morceaux audio au fur et à mesure de la réponse HTTP
+# - generate_tts_audio(): audio complet en mémoire (mp3/opus compressé par défaut)
+# - play_tts_local(): lecture PCM sur la sortie son locale dès le premier morceau
+# - play_pcm_local(): lecture d'un PCM déjà en mémoire (phrases en cache)
 
 import os
-import tempfile
+import io
+from typing import Iterator, Optional
+
 from openai import OpenAI
 
+TTS_MODEL = os.getenv("TTS_MODEL", "gpt-4o-mini-tts")
+TTS_VOICE = os.getenv("TTS_VOICE", "alloy")
+# mp3 | opus | aac | flac | wav | pcm  (mp3/opus: ~10x moins d'octets que wav vers la page)
+TTS_FORMAT = os.getenv("TTS_FORMAT", "mp3")
+TTS_CHUNK_SIZE = int(os.getenv("TTS_CHUNK_SIZE", "4096"))
+
+# format "pcm" d'OpenAI: 24 kHz, 16 bits signés little-endian, mono
+PCM_SAMPLE_RATE = 24_000
+PCM_SAMPLE_WIDTH = 2
+
+AUDIO_MIME_TYPES = {
+    "mp3": "audio/mpeg",
+    "opus": "audio/ogg",   # opus dans un conteneur Ogg
+    "aac": "audio/aac",
+    "flac": "audio/flac",
+    "wav": "audio/wav",
+    "pcm": "audio/L16",
+}
+
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 
-def generate_tts_audio(text: str) -> str:
+def audio_mime_type(fmt: Optional[str] = None) -> str:
+    return AUDIO_MIME_TYPES.get(fmt or TTS_FORMAT, "application/octet-stream")
+
+
+def iter_tts_chunks(
+    text: str,
+    fmt: Optional[str] = None,
+    chunk_size: int = TTS_CHUNK_SIZE,
+    voice: Optional[str] = None,
+    model: Optional[str] = None,
+) -> Iterator[bytes]:
     """
-    Génère un fichier .wav de synthèse vocale à partir d'un texte
-    et retourne le chemin du fichier.
+    Génère les morceaux audio dès qu'ils arrivent (réponse HTTP en streaming).
+    Voix et modèle par défaut: TTS_VOICE / TTS_MODEL.
+    Lève l'exception OpenAI en cas d'erreur.
     """
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
+    with client.audio.speech.with_streaming_response.create(
+        model=model or TTS_MODEL,
+        voice=voice or TTS_VOICE,
+        input=text,
+        response_format=fmt or TTS_FORMAT,
+    ) as response:
+        for chunk in response.iter_bytes(chunk_size):
+            if chunk:
+                yield chunk
+
+
+def generate_tts_audio(
+    text: str, fmt: Optional[str] = None, voice: Optional[str] = None, model: Optional[str] = None
+) -> bytes:
+    """
+    Génère la synthèse vocale d'un texte et retourne l'audio en mémoire
+    (b"" en cas d'erreur). Aucun fichier n'est écrit sur disque.
+    """
+    buffer = io.BytesIO()
+    try:
+        for chunk in iter_tts_chunks(text, fmt, voice=voice, model=model):
+            buffer.write(chunk)
+        return buffer.getvalue()
 
+    except Exception as e:
+        print("[TTS] Error:", e)
+        return b""
+
+
+def open_pcm_output():
+    """Flux de sortie son local au format PCM d'OpenAI (segments écrits bout à bout, sans trou)."""
+    import sounddevice as sd
+
+    return sd.RawOutputStream(samplerate=PCM_SAMPLE_RATE, channels=1, dtype="int16")
+
+
+def play_pcm_local(pcm: bytes) -> None:
+    """Lit un audio PCM déjà en mémoire (ex: phrase en cache) sur la sortie son locale."""
+    with open_pcm_output() as stream:
+        stream.write(pcm[: len(pcm) - len(pcm) % PCM_SAMPLE_WIDTH])
+
+
+def play_tts_local(text: str) -> bytes:
+    """
+    Lit la synthèse sur la sortie son locale: la lecture démarre au premier
+    morceau reçu, sans attendre la fin de la synthèse.
+    Retourne le PCM joué (b"" en cas d'erreur), réutilisable par le cache.
+    """
+    played = io.BytesIO()
     try:
-        audio = client.audio.speech.create(
-            model="gpt-4o-mini-tts",
-            voice="alloy",
-            input=text,
-            format="wav",
-        )
-        with open(tmp.name, "wb") as f:
-            f.write(audio.read())
-        return tmp.name
+        with open_pcm_output() as stream:
+            carry = b""
+            for chunk in iter_tts_chunks(text, fmt="pcm"):
+                data = carry + chunk
+                # un échantillon peut être coupé entre deux morceaux
+                cut = len(data) - len(data) % PCM_SAMPLE_WIDTH
+                if cut:
+                    stream.write(data[:cut])
+                    played.write(data[:cut])
+                carry = data[cut:]
+        return played.getvalue()
 
     except Exception as e:
         print("[TTS] Error:", e)
-        return ""
+        return b""
@@ -213,6 +213,7 @@ if "cv" in st.session_state and "job" in st.session_state:
                 cv=cv,
                 job=job,
                 base_questions=[],
+                max_questions=num_q,
             )
             sim = InterviewSimulator(
                 manager=manager,
@@ -0,0 +1,255 @@
+# src/utils/context_builder.py
+#
+# Transforme CVData / JobData en contexte texte compact pour les prompts:
+# - supprime raw_payload et les doublons (description vs clean_description)
+# - sérialisation déterministe (ordre fixe, pas de repr Python)
+# - respecte un budget de tokens, en tronquant par priorité
+
+import os
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from models.data_models import CVData, JobData
+
+DEFAULT_TOKEN_BUDGET = 1200
+CHARS_PER_TOKEN = 4          # approximation OpenAI (texte FR/EN)
+TRUNCATION_MARK = "…"
+MIN_TRUNCATED_TOKENS = 16    # en dessous, une section tronquée n'apporte plus rien
+
+# priorité: 0 = indispensable, plus le chiffre est grand plus la section est sacrifiable
+PRIORITY_HEADER = 0
+PRIORITY_CORE = 1
+PRIORITY_DETAIL = 2
+PRIORITY_EXTRA = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimation rapide du nombre de tokens (≈ 4 caractères / token).
+    Suffisant pour piloter un budget, sans dépendance à un tokenizer.
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def _clean(value: Any) -> str:
+    if value is None:
+        return ""
+    return " ".join(str(value).split())
+
+
+def _dedupe(items: List[Any]) -> List[str]:
+    seen = set()
+    out = []
+    for item in items or []:
+        text = _clean(item)
+        key = text.lower()
+        if text and key not in seen:
+            seen.add(key)
+            out.append(text)
+    return out
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+@dataclass
+class ContextSection:
+    group: str          # "cv" ou "job"
+    name: str
+    priority: int
+    text: str
+    truncatable: bool = True
+    tokens: int = 0
+    truncated: bool = False
+
+
+@dataclass
+class PromptContext:
+    sections: List[ContextSection]
+    token_budget: int
+    dropped: List[str] = field(default_factory=list)
+
+    def render(self, group: str) -> str:
+        return "\n".join(s.text for s in self.sections if s.group == group and s.text)
+
+    @property
+    def cv_text(self) -> str:
+        return self.render("cv")
+
+    @property
+    def job_text(self) -> str:
+        return self.render("job")
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(s.tokens for s in self.sections)
+
+    def section_tokens(self) -> Dict[str, int]:
+        return {f"{s.group}.{s.name}": s.tokens for s in self.sections}
+
+    def report(self) -> str:
+        parts = [f"{name}={tok}" for name, tok in self.section_tokens().items()]
+        line = f"[Context] {self.total_tokens}/{self.token_budget} tokens — " + ", ".join(parts)
+        if self.dropped:
+            line += f" (supprimé: {', '.join(self.dropped)})"
+        return line
+
+
+# --------------------------------------------------------
+# Sérialisation CV
+# --------------------------------------------------------
+def build_cv_sections(structured: Dict[str, Any]) -> List[ContextSection]:
+    structured = structured or {}
+    sections: List[ContextSection] = []
+
+    identity = [
+        f"{label}: {_clean(structured.get(key))}"
+        for key, label in (("name", "Nom"), ("contact", "Contact"))
+        if _clean(structured.get(key))
+    ]
+    if identity:
+        sections.append(ContextSection("cv", "identity", PRIORITY_HEADER, "\n".join(identity), truncatable=False))
+
+    skills = _dedupe(structured.get("skills") or [])
+    if skills:
+        sections.append(ContextSection("cv", "skills", PRIORITY_CORE, "Compétences: " + ", ".join(skills)))
+
+    lines = []
+    for exp in structured.get("experiences") or []:
+        if not isinstance(exp, dict):
+            continue
+        head = " @ ".join(x for x in (_clean(exp.get("title")), _clean(exp.get("company"))) if x)
+        years = _clean(exp.get("years"))
+        if years:
+            head += f" ({years})"
+        desc = _clean(exp.get("description"))
+        line = f"- {head}: {desc}" if desc else f"- {head}"
+        if line not in lines:
+            lines.append(line)
+    if lines:
+        sections.append(ContextSection("cv", "experiences", PRIORITY_CORE, "Expériences:\n" + "\n".join(lines)))
+
+    lines = []
+    for edu in structured.get("education") or []:
+        if not isinstance(edu, dict):
+            continue
+        line = "- " + " @ ".join(x for x in (_clean(edu.get("degree")), _clean(edu.get("school"))) if x)
+        years = _clean(edu.get("years"))
+        if years:
+            line += f" ({years})"
+        if line not in lines:
+            lines.append(line)
+    if lines:
+        sections.append(ContextSection("cv", "education", PRIORITY_DETAIL, "Formation:\n" + "\n".join(lines)))
+
+    known = {"name", "contact", "skills", "experiences", "education"}
+    extra = {k: v for k, v in structured.items() if k not in known and v}
+    if extra:
+        sections.append(ContextSection("cv", "extra", PRIORITY_EXTRA, "Autres: " + _compact_json(extra)))
+
+    return sections
+
+
+# --------------------------------------------------------
+# Sérialisation offre
+# --------------------------------------------------------
+def build_job_sections(structured: Dict[str, Any]) -> List[ContextSection]:
+    structured = structured or {}
+    sections: List[ContextSection] = []
+
+    header = [
+        f"{label}: {_clean(structured.get(key))}"
+        for key, label in (("title", "Poste"), ("company", "Entreprise"), ("location", "Lieu"))
+        if _clean(structured.get(key))
+    ]
+    if header:
+        sections.append(ContextSection("job", "header", PRIORITY_HEADER, "\n".join(header), truncatable=False))
+
+    # une seule des deux descriptions (clean_description = description normalisée)
+    description = _clean(structured.get("clean_description") or structured.get("description"))
+    if description:
+        sections.append(ContextSection("job", "description", PRIORITY_CORE, "Description: " + description))
+
+    details = structured.get("details")
+    if details:
+        sections.append(ContextSection("job", "details", PRIORITY_DETAIL, "Détails: " + _compact_json(details)))
+
+    benefits = _dedupe(structured.get("benefits") or [])
+    if benefits:
+        sections.append(ContextSection("job", "benefits", PRIORITY_EXTRA, "Avantages: " + ", ".join(benefits)))
+
+    return sections
+
+
+# --------------------------------------------------------
+# Budget
+# --------------------------------------------------------
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARK)
+    if max_chars <= 0:
+        return ""
+    cut = text[:max_chars]
+    # coupe sur un espace pour ne pas casser un mot
+    space = cut.rfind(" ")
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip() + TRUNCATION_MARK
+
+
+def fit_to_budget(sections: List[ContextSection], token_budget: int) -> PromptContext:
+    """
+    Attribue le budget strictement par ordre de priorité:
+    - un niveau de priorité qui rentre entier est gardé tel quel
+    - sinon le budget restant est partagé entre les sections de ce niveau
+      (les plus courtes gardées entières, les autres tronquées à leur part)
+      et tous les niveaux moins prioritaires sont supprimés
+    Une section moins prioritaire n'est donc jamais gardée au détriment d'une
+    section plus prioritaire. L'ordre d'affichage final reste l'ordre d'origine.
+    """
+    for s in sections:
+        s.tokens = estimate_tokens(s.text)
+
+    levels: Dict[int, List[ContextSection]] = {}
+    for s in sections:
+        levels.setdefault(s.priority, []).append(s)
+
+    remaining = token_budget
+    exhausted = False
+    dropped = []
+    for priority in sorted(levels):
+        level = levels[priority]
+        if not exhausted and sum(s.tokens for s in level) <= remaining:
+            remaining -= sum(s.tokens for s in level)
+            continue
+
+        # premier niveau trop gros: partage équitable du reste; niveaux suivants: plus rien
+        pending = sorted(level, key=lambda x: x.tokens)
+        for i, s in enumerate(pending):
+            share = 0 if exhausted else remaining // (len(pending) - i)
+            if s.tokens <= share:
+                remaining -= s.tokens
+                continue
+            if s.truncatable and share >= MIN_TRUNCATED_TOKENS:
+                s.text = truncate_to_tokens(s.text, share)
+                s.tokens = estimate_tokens(s.text)
+                s.truncated = True
+                remaining -= s.tokens
+            if not s.text or not s.truncated:
+                dropped.append(f"{s.group}.{s.name}")
+                s.text = ""
+                s.tokens = 0
+        exhausted = True
+
+    kept = [s for s in sections if s.text]
+    return PromptContext(sections=kept, token_budget=token_budget, dropped=dropped)
+
+
+def build_context(cv: CVData, job: JobData, token_budget: Optional[int] = None) -> PromptContext:
+    if token_budget is None:
+        token_budget = int(os.getenv("PROMPT_CONTEXT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+    sections = build_cv_sections(cv.structured) + build_job_sections(job.structured)
+    return fit_to_budget(sections, token_budget)
@@ -0,0 +1,34 @@
+# src/utils/rate_limit.py
+#
+# Limiteur de débit (seau à jetons) partagé entre threads.
+
+import time
+import threading
+
+
+class RateLimiter:
+    """
+    Autorise au plus `rate` appels par seconde en régime établi,
+    avec des rafales jusqu'à `burst` appels. rate <= 0 -> pas de limite.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
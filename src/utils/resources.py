@@ -0,0 +1,48 @@
+# src/utils/resources.py
+#
+# Mesure de la mémoire (pic RSS) d'une étape de traitement.
+
+import sys
+import resource
+from typing import Dict
+
+
+def _maxrss_mb(who: int) -> float:
+    value = resource.getrusage(who).ru_maxrss
+    # Linux: kilo-octets, macOS: octets
+    return value / (1024 * 1024) if sys.platform == "darwin" else value / 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Remet à zéro le pic RSS du process courant (Linux uniquement, /proc/self/clear_refs).
+    Retourne False si impossible: le pic mesuré sera alors celui depuis le démarrage.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    """
+    Pic RSS en Mo:
+    - self: process courant (VmHWM sous Linux, sinon ru_maxrss)
+    - children: plus gros process enfant terminé (pool OCR, pdftoppm, tesseract),
+      cumulé sur toute la vie du process: non remis à zéro entre deux CV
+    """
+    current = None
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    current = int(line.split()[1]) / 1024
+                    break
+    except OSError:
+        pass
+    if current is None:
+        current = _maxrss_mb(resource.RUSAGE_SELF)
+
+    return {"self": round(current, 1), "children": round(_maxrss_mb(resource.RUSAGE_CHILDREN), 1)}
@@ -0,0 +1,147 @@
+# src/utils/stream_parsing.py
+#
+# Lecture incrémentale d'une complétion LLM en streaming:
+# - JSONStringFieldReader: extrait la valeur d'un champ string JSON
+#   (ex: "next_question") au fur et à mesure que les tokens arrivent
+# - SentenceSplitter: découpe ce texte en phrases complètes dès qu'elles se terminent
+# - read_bool_field: valeur d'un champ booléen (ex: "end") dès qu'il est complet
+
+import re
+from typing import AsyncIterator, Iterable, Iterator, List, Optional
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+# fin de phrase: ponctuation forte suivie d'un espace
+_SENTENCE_END = re.compile(r'[.!?…]+["»)]*\s+')
+
+
+def read_bool_field(buffer: str, field: str) -> Optional[bool]:
+    """Valeur du champ booléen `field` dans un JSON partiel, ou None s'il n'est pas encore arrivé."""
+    match = re.search(r'"' + re.escape(field) + r'"\s*:\s*(true|false)\b', buffer)
+    return None if match is None else match.group(1) == "true"
+
+
+class JSONStringFieldReader:
+    """
+    Parseur incrémental minimal: on lui donne les deltas du flux,
+    il renvoie les nouveaux caractères décodés de la valeur du champ demandé.
+    Ne valide pas le reste du JSON (le JSON complet est parsé à la fin).
+    """
+
+    def __init__(self, field: str):
+        self._key = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._buffer = ""
+        self._pos: Optional[int] = None   # position du prochain caractère à décoder
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        if self.done or not chunk:
+            return ""
+        self._buffer += chunk
+
+        if self._pos is None:
+            match = self._key.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        out: List[str] = []
+        buf = self._buffer
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if ch == '"':
+                self.done = True
+                i += 1
+                break
+            if ch != "\\":
+                out.append(ch)
+                i += 1
+                continue
+
+            # séquence d'échappement: on attend d'avoir tous les caractères
+            if i + 1 >= len(buf):
+                break
+            esc = buf[i + 1]
+            if esc == "u":
+                if i + 6 > len(buf):
+                    break
+                try:
+                    out.append(chr(int(buf[i + 2:i + 6], 16)))
+                except ValueError:
+                    pass
+                i += 6
+            else:
+                out.append(_ESCAPES.get(esc, esc))
+                i += 2
+
+        self._pos = i
+        return "".join(out)
+
+
+class SentenceSplitter:
+    """
+    Accumule du texte et renvoie les phrases complètes dès que possible.
+    flush() renvoie le reste (dernière phrase sans espace final).
+    """
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self._buffer += text
+        sentences = []
+        while True:
+            match = _SENTENCE_END.search(self._buffer)
+            if not match:
+                break
+            sentence = self._buffer[:match.end()].strip()
+            self._buffer = self._buffer[match.end():]
+            if sentence:
+                sentences.append(sentence)
+        return sentences
+
+    def flush(self) -> List[str]:
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
+
+
+def iter_field_sentences(deltas: Iterable[str], field: str) -> Iterator[str]:
+    """
+    Deltas d'une complétion JSON -> phrases complètes du champ `field`.
+    """
+    reader = JSONStringFieldReader(field)
+    splitter = SentenceSplitter()
+    for delta in deltas:
+        fragment = reader.feed(delta)
+        if fragment:
+            yield from splitter.feed(fragment)
+    yield from splitter.flush()
+
+
+async def aiter_field_sentences(deltas: AsyncIterator[str], field: str) -> AsyncIterator[str]:
+    reader = JSONStringFieldReader(field)
+    splitter = SentenceSplitter()
+    async for delta in deltas:
+        fragment = reader.feed(delta)
+        if fragment:
+            for sentence in splitter.feed(fragment):
+                yield sentence
+    for sentence in splitter.flush():
+        yield sentence
+
+
+def split_sentences(text: str) -> List[str]:
+    """Découpage non-streaming, mêmes règles que SentenceSplitter."""
+    splitter = SentenceSplitter()
+    return splitter.feed(text) + splitter.flush()
@@ -0,0 +1,49 @@
+# src/utils/text_match.py
+#
+# Correspondance lexicale légère (sans LLM) entre une réponse et des mots-clés attendus.
+
+import re
+import unicodedata
+from typing import Iterable, Set
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+# mots vides FR/EN les plus fréquents (les mots < 3 lettres sont déjà ignorés)
+STOPWORDS = {
+    "les", "des", "une", "est", "pas", "que", "qui", "dans", "pour", "avec", "sur", "par",
+    "mais", "donc", "car", "ces", "ses", "mes", "nos", "vos", "leur", "leurs",
+    "elle", "ils", "elles", "nous", "vous", "cette", "cet", "son", "sont", "ont", "avait",
+    "etait", "fait", "faire", "tres", "plus", "moins", "aussi", "comme", "tout", "tous",
+    "bien", "alors", "ete", "avoir", "etre", "suis", "mon", "ton", "aux",
+    "the", "and", "for", "with", "that", "this", "was", "are", "you", "have", "has",
+}
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.lower()
+
+
+def extract_keywords(text: str) -> Set[str]:
+    return {
+        w for w in _WORD.findall(normalize(text))
+        if len(w) >= 3 and w not in STOPWORDS
+    }
+
+
+def keyword_overlap(answer: str, expected: Iterable[str]) -> float:
+    """
+    Part des mots-clés attendus présents dans la réponse (0.0 -> 1.0).
+    Un mot-clé composé ("machine learning") compte si tous ses mots sont présents.
+    """
+    expected = [e for e in expected if e and e.strip()]
+    if not expected:
+        return 0.0
+    words = extract_keywords(answer)
+    found = 0
+    for kw in expected:
+        parts = extract_keywords(kw)
+        if parts and parts <= words:
+            found += 1
+    return found / len(expected)
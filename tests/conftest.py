@@ -0,0 +1,10 @@
+# tests/conftest.py
+#
+# Les modules s'importent depuis src/ (comme avec `cd src && python -m ...`).
+
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
@@ -0,0 +1,87 @@
+# tests/test_context_builder.py
+
+from models.data_models import CVData, JobData
+from utils.context_builder import (
+    PRIORITY_CORE,
+    PRIORITY_EXTRA,
+    ContextSection,
+    build_context,
+    estimate_tokens,
+    fit_to_budget,
+)
+
+CV = {
+    "name": "Alice Martin",
+    "contact": "alice@example.com",
+    "skills": ["Python", "SQL", "python", "Airflow"],
+    "experiences": [
+        {"title": "Data engineer", "company": "Acme", "years": "2020-2023", "description": "Pipelines Airflow " * 40},
+    ],
+    "education": [{"degree": "Master", "school": "EPITA", "years": "2018-2020"}],
+}
+
+JOB = {
+    "title": "Data engineer",
+    "company": "Globex",
+    "location": "Paris",
+    "description": "Construire et maintenir la plateforme de données. " * 60,
+    "details": {"contrat": "CDI", "télétravail": "2 jours"},
+    "benefits": ["Tickets restaurant", "Mutuelle", "RTT", "Prime annuelle", "Salle de sport"] * 3,
+    "raw_payload": {"huge": "x" * 5000},
+}
+
+
+def _names(context):
+    return {f"{s.group}.{s.name}" for s in context.sections}
+
+
+def test_everything_kept_under_budget():
+    context = build_context(CVData(raw_text="", structured=CV), JobData(raw_text="", structured=JOB), token_budget=10_000)
+    assert context.dropped == []
+    assert not any(s.truncated for s in context.sections)
+    assert "raw_payload" not in context.job_text
+    assert context.cv_text.count("Python") == 1   # doublons supprimés
+
+
+def test_core_description_not_dropped_for_extra_sections():
+    # régression: à 600 tokens, job.description (CORE) était supprimée
+    # alors que job.benefits (EXTRA) était gardée
+    context = build_context(CVData(raw_text="", structured=CV), JobData(raw_text="", structured=JOB), token_budget=600)
+    kept = _names(context)
+
+    assert "job.description" in kept
+    assert "job.benefits" not in kept
+    assert "job.details" not in kept
+    assert context.total_tokens <= 600
+
+
+def test_lower_priority_never_kept_when_higher_cut():
+    sections = [
+        ContextSection("job", "extra", PRIORITY_EXTRA, "court"),
+        ContextSection("job", "core", PRIORITY_CORE, "mot " * 400),
+    ]
+    context = fit_to_budget(sections, 100)
+
+    assert [s.name for s in context.sections] == ["core"]
+    assert context.sections[0].truncated
+    assert context.dropped == ["job.extra"]
+
+
+def test_same_priority_sections_share_the_budget():
+    sections = [
+        ContextSection("cv", "a", PRIORITY_CORE, "alpha " * 200),
+        ContextSection("job", "b", PRIORITY_CORE, "beta " * 200),
+        ContextSection("job", "c", PRIORITY_CORE, "gamma"),
+    ]
+    context = fit_to_budget(sections, 120)
+
+    assert [s.name for s in context.sections] == ["a", "b", "c"]   # ordre d'origine
+    assert context.sections[2].text == "gamma"                     # entière
+    assert context.sections[0].truncated and context.sections[1].truncated
+    assert context.total_tokens <= 120
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
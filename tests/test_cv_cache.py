@@ -0,0 +1,51 @@
+# tests/test_cv_cache.py
+
+from services.cv_cache import CVCache, file_sha256
+
+
+def write_pdf(path, content=b"%PDF-1.4 contenu du CV"):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_key_depends_on_content_not_on_path(tmp_path):
+    a = write_pdf(tmp_path / "cv.pdf")
+    b = write_pdf(tmp_path / "copie du cv.pdf")
+    c = write_pdf(tmp_path / "autre.pdf", b"%PDF-1.4 autre CV")
+    assert file_sha256(a) == file_sha256(b) != file_sha256(c)
+    assert CVCache.text_key(file_sha256(a), "2:200") == CVCache.text_key(file_sha256(b), "2:200")
+
+
+def test_parser_version_is_part_of_the_keys():
+    sha = "0" * 64
+    # nouvel extracteur (ou réglages OCR / moteur): le texte est ré-extrait
+    assert CVCache.text_key(sha, "2:150:300:tesserocr") != CVCache.text_key(sha, "2:150:300:pytesseract")
+    # nouveau prompt ou modèle: seule l'étape LLM est refaite
+    assert CVCache.structured_key("texte", "v1", "gpt-4o-mini") != CVCache.structured_key("texte", "v2", "gpt-4o-mini")
+    assert CVCache.structured_key("texte", "v1", "gpt-4o-mini") != CVCache.structured_key("texte", "v1", "gpt-4o")
+    # étapes séparées: pas de collision entre clé texte et clé LLM
+    assert CVCache.text_key("a", "b") != CVCache.structured_key("a", "b", "")
+
+
+def test_stages_roundtrip_on_disk(tmp_path):
+    cache = CVCache(cache_dir=str(tmp_path))
+    text_key = CVCache.text_key("0" * 64, "2")
+    structured_key = CVCache.structured_key("texte", "v1", "gpt-4o-mini")
+    assert cache.get_text(text_key) is None
+
+    cache.set_text(text_key, "Jeanne Martin")
+    cache.set_structured(structured_key, {"name": "Jeanne Martin"})
+    fresh = CVCache(cache_dir=str(tmp_path))
+    assert fresh.get_text(text_key) == "Jeanne Martin"
+    assert fresh.get_structured(structured_key) == {"name": "Jeanne Martin"}
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_corrupted_entry_is_a_miss(tmp_path):
+    cache = CVCache(cache_dir=str(tmp_path))
+    key = CVCache.text_key("0" * 64, "2")
+    cache.set_text(key, "texte")
+    with open(cache._path("text", key), "w", encoding="utf-8") as f:
+        f.write("{tronqué")
+    assert cache.get_text(key) is None
+    assert cache.get_structured(key) is None
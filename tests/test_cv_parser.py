@@ -0,0 +1,66 @@
+# tests/test_cv_parser.py
+
+from PIL import Image
+
+from services import cv_parser
+
+
+class LowConfidenceFirstPass:
+    """Faux moteur OCR: page 1 illisible à basse résolution, tout le reste lisible."""
+
+    name = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def image_to_data(self, img, config):
+        dpi, page = img.size   # cf. fake_pages: largeur = DPI, hauteur = numéro de page
+        self.calls.append((page, dpi))
+        conf = 40 if (page == 1 and dpi < 300) else 92
+        return {"text": [f"page{page}", f"{dpi}dpi"], "conf": [conf, conf],
+                "block_num": [1, 1], "par_num": [1, 1], "line_num": [1, 1]}
+
+
+def fake_pages(path, dpi=cv_parser.OCR_DPI, pages=None, window=1):
+    for n in pages:
+        yield n, Image.new("L", (dpi, n), color=255)
+
+
+def patch_ocr(monkeypatch, backend):
+    monkeypatch.setattr(cv_parser, "iter_pdf_pages", fake_pages)
+    monkeypatch.setattr(cv_parser, "get_ocr_backend", lambda config="": backend)
+    monkeypatch.setattr(cv_parser, "OCR_FAST_DPI", 150)
+    monkeypatch.setattr(cv_parser, "OCR_HIGH_DPI", 300)
+    monkeypatch.setattr(cv_parser, "OCR_MIN_CONFIDENCE", 70.0)
+
+
+def test_low_confidence_page_is_redone_at_high_dpi(monkeypatch):
+    backend = LowConfidenceFirstPass()
+    patch_ocr(monkeypatch, backend)
+
+    results = cv_parser.ocr_pdf_page_results("cv.pdf", pages=[1, 2], max_workers=1)
+    # passe rapide sur tout, puis 300 DPI uniquement pour la page peu confiante
+    assert backend.calls == [(1, 150), (2, 150), (1, 300)]
+    assert (results[1].dpi, results[1].confidence, results[1].text) == (300, 92, "page1 300dpi")
+    assert (results[2].dpi, results[2].text) == (150, "page2 150dpi")
+
+
+def test_first_pass_is_kept_when_the_retry_is_worse(monkeypatch):
+    class WorseAtHighDPI(LowConfidenceFirstPass):
+        def image_to_data(self, img, config):
+            data = super().image_to_data(img, config)
+            if img.size[0] >= cv_parser.OCR_HIGH_DPI:
+                data["conf"] = [10, 10]
+            return data
+
+    patch_ocr(monkeypatch, WorseAtHighDPI())
+    results = cv_parser.ocr_pdf_page_results("cv.pdf", pages=[1], max_workers=1)
+    assert (results[1].dpi, results[1].confidence) == (150, 40)
+
+
+def test_no_retry_when_high_dpi_is_not_higher(monkeypatch):
+    backend = LowConfidenceFirstPass()
+    patch_ocr(monkeypatch, backend)
+    monkeypatch.setattr(cv_parser, "OCR_HIGH_DPI", 150)
+    cv_parser.ocr_pdf_page_results("cv.pdf", pages=[1], max_workers=1)
+    assert backend.calls == [(1, 150)]
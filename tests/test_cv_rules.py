@@ -0,0 +1,84 @@
+# tests/test_cv_rules.py
+
+from services.cv_rules import merge_with_llm, pre_extract
+
+# "Employment History" n'est pas un titre reconnu: les expériences ne sont pas vues par les règles
+CV_UNKNOWN_EXPERIENCE_HEADING = """Jeanne Martin
+jeanne.martin@example.com | +33 6 12 34 56 78
+
+Employment History
+Data Scientist, Acme, 2020 - 2023
+Built forecasting models in Python and SQL.
+
+Formation
+Master Informatique - Université de Lyon 2019
+
+Compétences
+Python, SQL, Docker, Git
+"""
+
+
+def test_unrecognised_experience_heading_is_left_to_the_llm():
+    pre = pre_extract(CV_UNKNOWN_EXPERIENCE_HEADING)
+    assert "experiences" not in pre.resolved
+    assert "experiences" in pre.unresolved
+    # le texte des expériences part bien au LLM
+    assert "Data Scientist, Acme" in pre.residual_text
+
+
+def test_positively_extracted_fields_are_resolved():
+    pre = pre_extract(CV_UNKNOWN_EXPERIENCE_HEADING)
+    assert {"name", "contact", "skills", "education"} <= set(pre.resolved)
+    assert pre.structured["name"] == "Jeanne Martin"
+    assert pre.structured["education"][0]["school"] == "Université de Lyon"
+    assert pre.confidence < 1
+
+
+def test_llm_experiences_are_merged():
+    pre = pre_extract(CV_UNKNOWN_EXPERIENCE_HEADING)
+    experiences = [{"title": "Data Scientist", "company": "Acme", "years": "2020 - 2023", "description": ""}]
+    merged = merge_with_llm(pre, {"experiences": experiences, "skills": ["Forecasting"]})
+    assert merged["experiences"] == experiences
+    assert merged["name"] == "Jeanne Martin"
+    assert merged["skills"][-1] == "Forecasting"
+
+
+CV_DATED_EXPERIENCES = """Jeanne Martin
+jeanne.martin@example.com | +33 6 12 34 56 78
+
+Expériences professionnelles
+Data Scientist, Acme, 2020 - 2023
+- Modèles de prévision en Python.
+Data Analyst - Globex
+03/2018 – 2020
+Tableaux de bord SQL.
+
+Formation
+Master Informatique - Université de Lyon 2019
+
+Compétences
+Python, SQL, Docker, Git
+"""
+
+
+def test_dated_experiences_are_extracted_and_reach_the_skip_threshold():
+    pre = pre_extract(CV_DATED_EXPERIENCES)
+    assert pre.structured["experiences"] == [
+        {"title": "Data Scientist", "company": "Acme", "years": "2020 - 2023",
+         "description": "Modèles de prévision en Python."},
+        {"title": "Data Analyst", "company": "Globex", "years": "2018 - 2020",
+         "description": "Tableaux de bord SQL."},
+    ]
+    assert pre.unresolved == []
+    assert pre.confidence == 1.0
+    # tout est résolu: plus rien à envoyer au LLM
+    assert pre.residual_text == ""
+
+
+def test_undated_experience_text_is_left_to_the_llm():
+    cv = CV_DATED_EXPERIENCES.replace(
+        "Data Scientist, Acme, 2020 - 2023", "Freelance, plusieurs missions courtes\nData Scientist, Acme, 2020 - 2023"
+    )
+    pre = pre_extract(cv)
+    assert "experiences" not in pre.resolved
+    assert "Freelance" in pre.residual_text
@@ -0,0 +1,132 @@
+# tests/test_cv_sections.py
+
+import asyncio
+
+from services.cv_sections import (
+    INCOMPLETE_KEY,
+    aextract_by_sections,
+    extract_by_sections,
+    is_complete,
+    merge_sections,
+)
+
+CV = """Jeanne Martin
+jeanne.martin@example.com
+
+Expériences professionnelles
+Data Scientist, Acme, 2020 - 2023
+
+Formation
+Master Informatique, Université de Lyon, 2019
+
+Compétences
+Python, SQL
+"""
+
+REPLIES = {
+    "header": {"name": "Jeanne Martin", "contact": "jeanne.martin@example.com"},
+    "experiences": {"experiences": [{"title": "Data Scientist", "company": "Acme", "years": "2020 - 2023"}]},
+    "education": {"education": [{"degree": "Master Informatique", "school": "Université de Lyon"}]},
+    "skills": {"skills": ["Python", "SQL"]},
+}
+
+
+class SectionLLM:
+    """Répond selon la section du prompt; `broken` échoue, `garbage` renvoie un JSON qui n'est pas un objet."""
+
+    def __init__(self, broken=(), garbage=()):
+        self.broken = set(broken)
+        self.garbage = set(garbage)
+
+    def _reply(self, user_prompt):
+        section = user_prompt.split('"')[1]
+        if section in self.broken:
+            raise RuntimeError("timeout")
+        if section in self.garbage:
+            return ["pas", "un", "objet"]
+        return REPLIES[section]
+
+    def chat_json(self, system_prompt, user_prompt, schema_hint):
+        return self._reply(user_prompt)
+
+    async def achat_json(self, system_prompt, user_prompt, schema_hint):
+        return self._reply(user_prompt)
+
+
+def test_all_sections_ok_is_complete():
+    structured = extract_by_sections(CV, SectionLLM())
+    assert is_complete(structured)
+    assert INCOMPLETE_KEY not in structured
+    assert structured["name"] == "Jeanne Martin"
+    assert structured["skills"] == ["Python", "SQL"]
+
+
+def test_failed_section_marks_result_incomplete():
+    structured = extract_by_sections(CV, SectionLLM(broken={"experiences"}))
+    assert not is_complete(structured)
+    assert structured[INCOMPLETE_KEY] == ["experiences"]
+    # les autres sections restent exploitables
+    assert structured["experiences"] == []
+    assert structured["education"][0]["school"] == "Université de Lyon"
+
+
+def test_async_failed_section_marks_result_incomplete():
+    structured = asyncio.run(aextract_by_sections(CV, SectionLLM(broken={"skills"})))
+    assert structured[INCOMPLETE_KEY] == ["skills"]
+
+
+def test_non_object_reply_is_ignored_and_marked():
+    structured = extract_by_sections(CV, SectionLLM(garbage={"header", "skills"}))
+    assert structured[INCOMPLETE_KEY] == ["header", "skills"]
+    assert structured["name"] == ""
+    assert structured["skills"] == []
+
+
+def test_merge_sections_tolerates_wrong_inner_types():
+    merged = merge_sections({
+        "skills": {"skills": "Python"},
+        "experiences": {"experiences": {"title": "x"}},
+        "education": {"education": [{"degree": "Master"}, "texte"]},
+    })
+    assert merged["skills"] == []
+    assert merged["experiences"] == []
+    assert merged["education"] == [{"degree": "Master"}]
+    assert is_complete(merged)
+
+
+def test_incomplete_marker_survives_rules_merge():
+    from services.cv_rules import merge_with_llm, pre_extract
+
+    pre = pre_extract(CV)
+    merged = merge_with_llm(pre, {"experiences": [], INCOMPLETE_KEY: ["experiences"]})
+    assert not is_complete(merged)
+    assert not is_complete(merge_with_llm(pre, ["pas", "un", "objet"]))
+
+
+class SlowSectionLLM(SectionLLM):
+    """Compte les appels LLM simultanés."""
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.peak = 0
+
+    async def achat_json(self, system_prompt, user_prompt, schema_hint):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self._reply(user_prompt)
+
+
+def test_limiter_bounds_llm_calls_across_cvs():
+    llm = SlowSectionLLM()
+
+    async def run():
+        limiter = asyncio.Semaphore(2)
+        # 3 CV x 4 sections: la borne porte sur les appels, pas sur les CV
+        return await asyncio.gather(*(aextract_by_sections(CV, llm, limiter) for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert llm.peak == 2
+    assert all(is_complete(r) for r in results)
@@ -0,0 +1,174 @@
+# tests/test_export_queue.py
+#
+# Livraison de bout en bout contre un faux serveur Notion local (http.server), hors ligne.
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services import notion_export
+from services.export_queue import ExportQueue
+
+
+class FakeNotion(BaseHTTPRequestHandler):
+    """POST /pages crée une page; PATCH /blocks/<id>/children ajoute un lot (échecs 503 programmables)."""
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+    def do_POST(self):
+        state = self.server.state
+        payload = self._body()
+        state["pages"] += 1
+        state["blocks"] += len(payload["children"])
+        self._reply(200, {"id": f"page-{state['pages']}"})
+
+    def do_PATCH(self):
+        state = self.server.state
+        payload = self._body()
+        if state["fail_appends"] > 0:
+            state["fail_appends"] -= 1
+            self._reply(503, {"message": "indisponible"})
+            return
+        state["blocks"] += len(payload["children"])
+        self._reply(200, {})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def notion_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeNotion)
+    server.state = {"pages": 0, "blocks": 0, "fail_appends": 0}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(notion_export, "NOTION_API_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(notion_export, "NOTION_API_KEY", "test-key")
+    monkeypatch.setattr(notion_export, "NOTION_DATABASE_ID", "db")
+    monkeypatch.setattr(notion_export, "NOTION_MAX_RETRIES", 0)
+    monkeypatch.setattr(notion_export, "_session", None)
+    yield server.state
+    server.shutdown()
+    server.server_close()
+
+
+def wait_empty(queue, timeout=10.0):
+    deadline = time.time() + timeout
+    while queue.depth() and time.time() < deadline:
+        time.sleep(0.02)
+    return queue.depth() == 0
+
+
+# 250 paragraphes de ~1700 caractères -> 250 blocs, 3 requêtes (100 + 100 + 50)
+REPORT = "\n".join("r" * 1700 for _ in range(250))
+
+
+def test_report_is_delivered_to_notion_and_file(tmp_path, notion_server):
+    queue = ExportQueue(spool_dir=str(tmp_path / "spool"), retry_base_seconds=0.05)
+    out = tmp_path / "rapport.md"
+    queue.enqueue("Entretien", REPORT, file_path=str(out))
+
+    assert wait_empty(queue)
+    queue.stop()
+    assert notion_server == {"pages": 1, "blocks": 250, "fail_appends": 0}
+    assert out.read_text(encoding="utf-8") == REPORT
+    assert queue.stats()["delivered"] == 1
+
+
+def test_retry_resumes_without_duplicate_page(tmp_path, notion_server):
+    notion_server["fail_appends"] = 1
+    queue = ExportQueue(spool_dir=str(tmp_path / "spool"), retry_base_seconds=0.05)
+    queue.enqueue("Entretien", REPORT, targets=("notion",))
+
+    assert wait_empty(queue)
+    queue.stop()
+    assert notion_server["pages"] == 1
+    assert notion_server["blocks"] == 250
+    assert queue.stats()["retries"] == 1
+
+
+def test_spool_left_by_a_previous_process_is_delivered(tmp_path, notion_server, monkeypatch):
+    spool = tmp_path / "spool"
+    first = ExportQueue(spool_dir=str(spool))
+    # écrit dans le spool sans démarrer de worker (process interrompu avant la livraison)
+    monkeypatch.setattr(first, "start", lambda: None)
+    first.enqueue("Entretien", "court rapport", targets=("notion",))
+    assert len([n for n in os.listdir(spool) if n.endswith(".json")]) == 1
+
+    second = ExportQueue(spool_dir=str(spool))
+    assert second.depth() == 1
+    assert second.flush(timeout=10)
+    second.stop()
+    assert notion_server["pages"] == 1
+
+
+def test_unreadable_spool_file_is_set_aside(tmp_path, notion_server):
+    spool = tmp_path / "spool"
+    os.makedirs(spool)
+    (spool / "0000000000000-broken.json").write_text("{pas du json", encoding="utf-8")
+
+    queue = ExportQueue(spool_dir=str(spool))
+    assert queue.flush(timeout=10)
+    queue.stop()
+    assert os.path.exists(spool / "failed" / "0000000000000-broken.json")
+    assert notion_server["pages"] == 0
+
+
+def test_spool_write_failure_does_not_kill_the_worker(tmp_path, notion_server, monkeypatch):
+    notion_server["fail_appends"] = 1
+    queue = ExportQueue(spool_dir=str(tmp_path / "spool"), retry_base_seconds=0.05)
+    real_write = queue._write_job
+    failures = []
+
+    def flaky_write(job):
+        if job["attempts"] and not failures:   # réécriture du spool avant le nouvel essai
+            failures.append(job["id"])
+            raise OSError("disque plein")
+        real_write(job)
+
+    monkeypatch.setattr(queue, "_write_job", flaky_write)
+    queue.enqueue("Entretien", REPORT, targets=("notion",))
+    assert wait_empty(queue)
+    assert failures and queue._thread.is_alive()
+
+    # le worker continue de livrer les rapports suivants
+    queue.enqueue("Entretien 2", "court rapport", targets=("notion",))
+    assert wait_empty(queue)
+    queue.stop()
+    assert queue.stats()["delivered"] == 2
+    assert queue.stats()["retries"] == 1
+
+
+def test_abandon_survives_a_failing_local_copy(tmp_path, notion_server, monkeypatch):
+    from services import export_queue
+
+    def broken_save(markdown, file_path=None):
+        raise OSError("lecture seule")
+
+    monkeypatch.setattr(export_queue, "save_markdown_locally", broken_save)
+    queue = ExportQueue(spool_dir=str(tmp_path / "spool"), max_attempts=1, retry_base_seconds=0.05)
+    queue.enqueue("Entretien", "court rapport", targets=("file",))
+    assert wait_empty(queue)
+    # même thread, toujours en vie: il livre le rapport suivant
+    worker = queue._thread
+    queue.enqueue("Entretien 2", "court rapport", targets=("notion",))
+    assert wait_empty(queue)
+    assert queue._thread is worker and worker.is_alive()
+    queue.stop()
+    assert queue.stats()["failed"] == 1
+    assert queue.stats()["delivered"] == 1
+    assert len(os.listdir(tmp_path / "spool" / "failed")) == 1
@@ -0,0 +1,92 @@
+# tests/test_job_cache.py
+
+import os
+import time
+
+from services import job_scraper
+from services.job_cache import JobCache, canonical_job_url, job_id
+
+STRUCTURED = {"title": "Data Scientist", "company": "Acme", "description": "Prévisions."}
+
+
+def test_tracking_params_are_dropped_and_query_sorted():
+    url = "HTTPS://Example.com/jobs/42/?utm_source=li&ref=home&b=2&a=1#apply"
+    assert canonical_job_url(url) == "https://example.com/jobs/42?a=1&b=2"
+    assert job_id(url) == job_id("https://example.com/jobs/42?a=1&b=2&gclid=xyz")
+
+
+def test_indeed_urls_are_keyed_by_jk():
+    search = "https://fr.indeed.com/emplois?q=data&vjk=abc123&from=serp&tk=1"
+    direct = "https://fr.indeed.com/viewjob?jk=abc123&advn=9"
+    assert canonical_job_url(search) == "https://fr.indeed.com/viewjob?jk=abc123"
+    assert job_id(search) == job_id(direct) == "indeed:abc123"
+
+
+def test_different_offers_have_different_ids():
+    assert job_id("https://example.com/jobs/1") != job_id("https://example.com/jobs/2")
+    assert job_id("https://fr.indeed.com/viewjob?jk=a") != job_id("https://fr.indeed.com/viewjob?jk=b")
+
+
+def test_entry_is_shared_by_equivalent_urls(tmp_path):
+    cache = JobCache(cache_dir=str(tmp_path), ttl_seconds=60)
+    assert cache.set("https://fr.indeed.com/viewjob?jk=abc123", "texte", STRUCTURED)
+    entry = cache.get("https://fr.indeed.com/emplois?vjk=abc123&from=serp")
+    assert entry["structured"] == STRUCTURED
+    assert cache.is_fresh(entry)
+
+
+def test_ttl_expiry_and_unchanged_refresh(tmp_path):
+    cache = JobCache(cache_dir=str(tmp_path), ttl_seconds=60)
+    url = "https://example.com/jobs/42"
+    cache.set(url, "texte", STRUCTURED)
+    entry = cache.get(url)
+    entry["fetched_at"] = time.time() - 120
+    assert not cache.is_fresh(entry)
+
+    # même contenu: simple rafraîchissement de la date
+    assert cache.set(url, "texte", STRUCTURED) is False
+    assert cache.is_fresh(cache.get(url))
+    assert cache.set(url, "texte", {**STRUCTURED, "description": "Nouveau."}) is True
+
+
+def test_ttl_zero_never_expires(tmp_path):
+    cache = JobCache(cache_dir=str(tmp_path), ttl_seconds=0)
+    assert cache.is_fresh({"fetched_at": 0})
+
+
+def expired_cache(tmp_path, monkeypatch, url):
+    monkeypatch.setenv("JOB_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("JOB_CACHE_TTL", "60")
+    cache = JobCache()
+    cache.set(url, "texte en cache", STRUCTURED)
+    path = cache._path(url)
+    real_time = time.time()
+    # entrée vieille de deux heures
+    monkeypatch.setattr(time, "time", lambda: real_time + 7200)
+    return cache, path
+
+
+def test_expired_entry_is_refreshed(tmp_path, monkeypatch):
+    url = "https://fr.indeed.com/viewjob?jk=abc123"
+    cache, _ = expired_cache(tmp_path, monkeypatch, url)
+    fetched = []
+    monkeypatch.setattr(job_scraper, "_fetch_hasdata", lambda u, limiter=None: fetched.append(u) or {
+        "job": {"title": "Data Scientist", "company": "Acme", "description": "Annonce mise à jour. " * 10}
+    })
+
+    job = job_scraper.scrape_job_url(url, export=False)
+    assert fetched == [canonical_job_url(url)]
+    assert "mise à jour" in job.structured["description"]
+    assert cache.is_fresh(cache.get(url))
+
+
+def test_failed_refresh_serves_the_stale_entry(tmp_path, monkeypatch):
+    url = "https://fr.indeed.com/viewjob?jk=abc123"
+    cache, path = expired_cache(tmp_path, monkeypatch, url)
+    monkeypatch.setattr(job_scraper, "_fetch_hasdata", lambda u, limiter=None: None)
+    before = os.path.getmtime(path)
+
+    job = job_scraper.scrape_job_url(url, export=False)
+    assert job.raw_text == "texte en cache"
+    assert job.structured == STRUCTURED
+    assert os.path.getmtime(path) == before   # entrée périmée conservée telle quelle
@@ -0,0 +1,141 @@
+# tests/test_job_scraper.py
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services import job_scraper
+from utils.rate_limit import RateLimiter
+
+DESCRIPTION = "Vous concevrez des modèles de prévision de la demande. " * 6
+
+PAGE = f"""<html><head>
+<script type="application/ld+json">{json.dumps({
+    "@type": "JobPosting",
+    "title": "Data Scientist",
+    "hiringOrganization": {"name": "Acme"},
+    "jobLocation": {"address": {"postalCode": "69002", "addressLocality": "Lyon"}},
+    "description": f"<p>{DESCRIPTION}</p>",
+})}</script>
+</head><body><h1>Data Scientist</h1></body></html>"""
+
+
+def test_indeed_goes_straight_to_hasdata():
+    assert not job_scraper.uses_direct_fetch("https://fr.indeed.com/viewjob?jk=abc123")
+    assert job_scraper.uses_direct_fetch("https://www.welcometothejungle.com/fr/companies/acme/jobs/ds")
+
+
+def test_scrape_indeed_skips_the_direct_fetch(monkeypatch):
+    calls = []
+    monkeypatch.setattr(job_scraper, "_fetch_direct", lambda url: calls.append(url))
+    monkeypatch.setattr(job_scraper, "_fetch_hasdata", lambda url, limiter=None: {
+        "job": {"title": "Data Scientist", "company": "Acme", "description": DESCRIPTION}
+    })
+    job = job_scraper.scrape_job_url("https://fr.indeed.com/viewjob?jk=abc123", use_cache=False, export=False)
+    assert calls == []
+    assert job.structured["company"] == "Acme"
+
+
+def test_parse_job_file_reads_json_ld(tmp_path):
+    path = tmp_path / "annonce.html"
+    path.write_text(PAGE, encoding="utf-8")
+    job = job_scraper.parse_job_file(str(path), "https://example.com/jobs/1?utm_source=x")
+    assert job.structured["title"] == "Data Scientist"
+    assert job.structured["company"] == "Acme"
+    assert job.structured["location"] == "69002 Lyon"
+
+
+def test_unusable_page_returns_none():
+    assert job_scraper.parse_job_html("<html><h1>Vérification captcha</h1></html>") is None
+
+
+def test_cli_parses_a_saved_page(tmp_path, capsys):
+    path = tmp_path / "annonce.html"
+    path.write_text(PAGE, encoding="utf-8")
+    job_scraper.main(["--html", str(path)])
+    assert json.loads(capsys.readouterr().out)["company"] == "Acme"
+
+
+class FakeHasData:
+    """Session HTTP factice: compte les appels simultanés et note leurs dates."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.times = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.times.append(time.monotonic())
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        payload = {"job": {"title": "Data Scientist", "company": "Acme", "description": DESCRIPTION}}
+        return SimpleNamespace(raise_for_status=lambda: None, json=lambda: payload)
+
+
+@pytest.fixture
+def hasdata(monkeypatch):
+    session = FakeHasData()
+    monkeypatch.setattr(job_scraper, "_session", session)
+    monkeypatch.setattr(job_scraper, "HASDATA_API_KEY", "test-key")
+    monkeypatch.setattr(job_scraper, "_save_to_store", lambda url, job: None)
+    return session
+
+
+def indeed_urls(n):
+    return [f"https://fr.indeed.com/viewjob?jk=job{i}" for i in range(n)]
+
+
+def test_scrape_jobs_respects_max_concurrency(hasdata):
+    results = list(job_scraper.scrape_jobs(indeed_urls(10), max_concurrency=3, rate_per_second=0, use_cache=False))
+    assert len(results) == 10
+    assert all(job.structured["company"] == "Acme" for _, job in results)
+    assert hasdata.peak == 3
+
+
+def test_scrape_jobs_spaces_calls_to_the_rate_limit(hasdata):
+    hasdata.delay = 0.0
+    # rafale de 4 (min(concurrence, débit)), puis un appel tous les 1/20 s
+    list(job_scraper.scrape_jobs(indeed_urls(8), max_concurrency=4, rate_per_second=20, use_cache=False))
+    times = sorted(hasdata.times)
+    assert times[-1] - times[0] >= 4 / 20 * 0.8
+
+
+def test_scrape_jobs_dedupes_and_reuses_the_shared_session(hasdata):
+    urls = ["https://fr.indeed.com/viewjob?jk=abc", "https://fr.indeed.com/emplois?vjk=abc&from=serp"] + indeed_urls(3)
+    results = list(job_scraper.scrape_jobs(urls, max_concurrency=4, rate_per_second=0, use_cache=False))
+    assert len(results) == 4
+    assert len(hasdata.times) == 4               # une requête par annonce, toutes sur la même session
+    assert job_scraper.get_http_session() is hasdata
+
+
+def test_http_session_is_created_once(monkeypatch):
+    monkeypatch.setattr(job_scraper, "_session", None)
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(job_scraper.get_http_session())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(s is sessions[0] for s in sessions)
+    adapter = sessions[0].get_adapter("https://example.com")
+    assert adapter._pool_maxsize >= job_scraper.HASDATA_MAX_CONCURRENCY
+    sessions[0].close()
+
+
+def test_rate_limiter_spacing():
+    limiter = RateLimiter(rate=50, burst=2)
+    start = time.monotonic()
+    for _ in range(7):
+        limiter.acquire()
+    # 2 jetons tout de suite, puis 5 à 1/50 s d'intervalle
+    assert time.monotonic() - start >= 5 / 50 * 0.8
+    RateLimiter(rate=0).acquire()   # pas de limite
@@ -0,0 +1,90 @@
+# tests/test_job_store.py
+
+import json
+import sqlite3
+import threading
+
+from models.data_models import JobData
+from services.job_store import JobStore, load_job_pointer, write_job_pointer
+
+URL = "https://fr.indeed.com/viewjob?jk=abc123&from=serp"
+
+
+def make_job(description="Développer des modèles de prévision.", request_id="r1"):
+    return JobData(
+        raw_text=f"Data Scientist\n\nAcme\n\n{description}",
+        structured={
+            "title": "Data Scientist",
+            "company": "Acme",
+            "location": "Lyon",
+            "description": description,
+            "raw_payload": {"requestMetadata": {"id": request_id, "url": URL}},
+        },
+    )
+
+
+def count(store, table):
+    with sqlite3.connect(store.db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_same_content_reuses_the_row(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    first = store.save(URL, make_job(), scraped_at=100)
+    # autre requête HasData (payload différent), même contenu
+    second = store.save(URL, make_job(request_id="r2"), scraped_at=200)
+    assert first == second
+    assert count(store, "jobs") == 1
+    # le payload d'un doublon n'est pas stocké
+    assert count(store, "payloads") == 1
+    assert store.find(company="acme")[0]["last_seen_at"] == 200
+
+
+def test_new_content_is_a_new_version(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    first = store.save(URL, make_job(), scraped_at=100)
+    second = store.save(URL, make_job(description="Nouvelle description."), scraped_at=200)
+    assert first != second
+    assert store.latest(URL).structured["description"] == "Nouvelle description."
+    assert store.get(first).structured["raw_payload"]["requestMetadata"]["id"] == "r1"
+
+
+def test_concurrent_saves_do_not_conflict(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    ids, errors = [], []
+    barrier = threading.Barrier(8)
+
+    def save():
+        barrier.wait()
+        try:
+            ids.append(store.save(URL, make_job()))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(set(ids)) == 1
+    assert count(store, "jobs") == 1
+
+
+def test_pointer_reuses_the_stored_row(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    row_id = store.save(URL, make_job(), scraped_at=100)
+    pointer = tmp_path / "last_job.json"
+
+    assert write_job_pointer(str(pointer), URL, make_job(), store) == row_id
+    # pas de second enregistrement: la date de dernière vue n'a pas bougé
+    assert store.find()[0]["last_seen_at"] == 100
+    assert json.loads(pointer.read_text())["id"] == row_id
+    assert load_job_pointer(str(pointer)).structured["title"] == "Data Scientist"
+
+
+def test_pointer_saves_a_missing_version(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    pointer = tmp_path / "last_job.json"
+    row_id = write_job_pointer(str(pointer), URL, make_job(), store)
+    assert store.get(row_id).structured["company"] == "Acme"
@@ -0,0 +1,103 @@
+# tests/test_llm_cache.py
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from llm_cache import LLMResponseCache, make_cache_key
+from llm_client import LLMClient
+
+
+class FakeCompletions:
+    """Renvoie les réponses prévues, dans l'ordre, et compte les appels."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        content = self.replies.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    llm = LLMClient(cache=LLMResponseCache(cache_dir=str(tmp_path / "llm")))
+
+    def with_replies(*replies):
+        completions = FakeCompletions(replies)
+        llm.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        return completions
+
+    llm.with_replies = with_replies
+    return llm
+
+
+def test_set_get_roundtrip(tmp_path):
+    cache = LLMResponseCache(cache_dir=str(tmp_path))
+    key = make_cache_key("m", [{"role": "user", "content": "x"}])
+    cache.set(key, "réponse")
+    assert cache.get(key) == "réponse"
+    assert LLMResponseCache(cache_dir=str(tmp_path)).get(key) == "réponse"   # niveau disque
+
+
+def test_malformed_json_is_not_cached(client):
+    completions = client.with_replies("pas du json", '{"ok": true}')
+
+    with pytest.raises(ValueError):
+        client.chat_json("sys", "user", "{ok: bool}")
+    # le second appel repart vers l'API au lieu de rejouer la réponse malformée
+    assert client.chat_json("sys", "user", "{ok: bool}") == {"ok": True}
+    assert completions.calls == 2
+
+    # puis la réponse valide est servie par le cache
+    assert client.chat_json("sys", "user", "{ok: bool}") == {"ok": True}
+    assert completions.calls == 2
+
+
+def test_stale_malformed_entry_is_evicted(client):
+    messages = client._messages("sys", client._json_prompt("user", "{ok: bool}"))
+    key = make_cache_key(client.model, messages, "{ok: bool}")
+    client.cache.set(key, "tronqué {")
+
+    completions = client.with_replies('{"ok": false}')
+    assert client.chat_json("sys", "user", "{ok: bool}") == {"ok": False}
+    assert completions.calls == 1
+
+
+def test_plain_chat_is_cached(client):
+    completions = client.with_replies("bonjour")
+    assert client.chat("sys", "user") == "bonjour"
+    assert client.chat("sys", "user") == "bonjour"
+    assert completions.calls == 1
+
+
+def test_disk_size_tracked_without_rescanning(tmp_path, monkeypatch):
+    cache = LLMResponseCache(cache_dir=str(tmp_path), max_disk_bytes=2000)
+    cache.set("first", "x")   # premier set: parcours complet du dossier
+
+    scans = []
+    real_listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda path: scans.append(path) or real_listdir(path))
+
+    for i in range(5):
+        cache.set(f"k{i}", "y" * 10)
+    assert scans == []   # sous la limite: aucun parcours
+
+    for i in range(20):
+        cache.set(f"big{i}", "z" * 200)
+    assert scans   # limite dépassée: balayage
+    total = sum(os.path.getsize(tmp_path / n) for n in real_listdir(tmp_path))
+    assert total <= 2000
+    assert cache._disk_bytes == total
+
+
+def test_delete_removes_both_tiers(tmp_path):
+    cache = LLMResponseCache(cache_dir=str(tmp_path))
+    cache.set("k", "v")
+    cache.delete("k")
+    assert cache.get("k") is None
+    assert not os.path.exists(tmp_path / "k.json")
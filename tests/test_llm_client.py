@@ -0,0 +1,30 @@
+# tests/test_llm_client.py
+
+import asyncio
+
+import llm_client
+from llm_client import LLMClient, close_shared_async_clients, get_shared_async_client
+
+
+def test_async_client_is_shared_between_llm_clients(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "0")
+    monkeypatch.setattr(llm_client, "_async_clients", {})
+    first, second = LLMClient(cache=None), LLMClient(cache=None)
+
+    assert first.async_client is second.async_client
+    # un seul pool de connexions httpx pour tout le process
+    assert first.async_client._client is second.async_client._client
+    assert get_shared_async_client("autre-clé") is not first.async_client
+    asyncio.run(close_shared_async_clients())
+
+
+def test_close_releases_the_pool_and_a_new_one_is_created(monkeypatch):
+    monkeypatch.setattr(llm_client, "_async_clients", {})
+    client = get_shared_async_client("test-key")
+
+    asyncio.run(close_shared_async_clients())
+    assert client._client.is_closed
+    assert llm_client._async_clients == {}
+    assert get_shared_async_client("test-key") is not client
+    asyncio.run(close_shared_async_clients())
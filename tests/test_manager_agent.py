@@ -0,0 +1,221 @@
+# tests/test_manager_agent.py
+
+import asyncio
+import threading
+
+from agents.manager_agent import ManagerAgent
+from llm_client import LLMClient
+from models.data_models import CVData, JobData
+
+
+class FakeLLM:
+    """Complétions prévues à l'avance; chat_stream découpe la réponse en petits deltas."""
+
+    parse_json = LLMClient.parse_json
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def chat_stream(self, system_prompt, user_prompt, schema_hint=None, use_cache=True):
+        self.prompts.append(user_prompt)
+        raw = self.replies.pop(0)
+        for i in range(0, len(raw), 7):
+            yield raw[i:i + 7]
+
+
+def make_manager(llm, **kwargs):
+    kwargs.setdefault("speculative", False)
+    cv = CVData(raw_text="", structured={"name": "Alice", "skills": ["Python"]})
+    job = JobData(raw_text="", structured={"title": "Data engineer", "description": "Pipelines."})
+    return ManagerAgent(llm=llm, cv=cv, job=job, base_questions=[], **kwargs)
+
+
+def test_streamed_question_sentences():
+    manager = make_manager(FakeLLM('{"end": false, "next_question": "Bonjour. Parlez-moi de Python ?"}'))
+    assert list(manager.stream_next_step()) == ["Bonjour.", "Parlez-moi de Python ?"]
+    assert manager.last_step["next_question"] == "Bonjour. Parlez-moi de Python ?"
+    assert manager.last_step["end"] is False
+
+
+def test_ending_decision_is_not_spoken():
+    manager = make_manager(FakeLLM('{"end": true, "next_question": "Merci, au revoir. Bonne journée."}'))
+    assert list(manager.stream_next_step()) == []
+    assert manager.last_step["end"] is True
+
+
+def test_ending_decision_after_the_question_is_not_spoken():
+    manager = make_manager(FakeLLM('{"next_question": "Merci, au revoir. Bonne journée.", "end": true}'))
+    assert list(manager.stream_next_step()) == []
+    assert manager.last_step["end"] is True
+
+
+def test_question_before_end_false_is_spoken_once_end_is_known():
+    manager = make_manager(FakeLLM('{"next_question": "Bonjour. Parlez-moi de Python ?", "end": false}'))
+    assert list(manager.stream_next_step()) == ["Bonjour.", "Parlez-moi de Python ?"]
+    assert manager.last_step["end"] is False
+
+
+def test_async_ending_decision_after_the_question_is_not_spoken():
+    class AsyncFakeLLM(FakeLLM):
+        async def achat_stream(self, system_prompt, user_prompt, schema_hint=None, use_cache=True):
+            for delta in self.chat_stream(system_prompt, user_prompt):
+                yield delta
+
+    async def collect(manager):
+        return [sentence async for sentence in manager.astream_next_step()]
+
+    manager = make_manager(AsyncFakeLLM('{"next_question": "Merci. Au revoir.", "end": true}'))
+    assert asyncio.run(collect(manager)) == []
+    assert manager.last_step["end"] is True
+
+
+def test_non_dict_reply_is_guarded():
+    manager = make_manager(FakeLLM('["pas", "un", "objet"]'))
+    assert list(manager.stream_next_step()) == []
+    assert manager.last_step == {"next_question": "", "end": False}
+
+
+class SlowSummaryLLM(FakeLLM):
+    def __init__(self, *replies):
+        super().__init__(*replies)
+        self.release = threading.Event()
+        self.summaries = 0
+
+    def chat(self, system_prompt, user_prompt, use_cache=True):
+        self.release.wait(5)
+        self.summaries += 1
+        return "Résumé: Python, pipelines."
+
+
+def test_record_answer_does_not_wait_for_summary():
+    llm = SlowSummaryLLM()
+    manager = make_manager(llm, memory_window=1)
+    manager.record_answer("Q1 ?", "R1")
+    manager.record_answer("Q2 ?", "R2")   # Q1 sort de la fenêtre -> résumé en arrière-plan
+    assert llm.summaries == 0             # rendu la main sans attendre le LLM
+
+    # en attendant le résumé, l'échange sorti de la fenêtre reste dans le prompt
+    assert [ex.question for ex in manager.memory.get_recent()] == ["Q1 ?", "Q2 ?"]
+
+    llm.release.set()
+    manager.flush_summary(5)
+    assert llm.summaries == 1
+    assert manager.memory.summary == "Résumé: Python, pipelines."
+    assert [ex.question for ex in manager.memory.get_recent()] == ["Q2 ?"]
+
+
+def test_close_waits_for_the_pending_summary_then_stops_its_worker():
+    llm = SlowSummaryLLM()
+    manager = make_manager(llm, memory_window=1)
+    manager.record_answer("Q1 ?", "R1")
+    manager.record_answer("Q2 ?", "R2")
+    executor = manager._summary_executor
+
+    threading.Timer(0.1, llm.release.set).start()
+    manager.close(timeout=5)
+    assert llm.summaries == 1
+    assert manager.memory.summary == "Résumé: Python, pipelines."
+    assert executor._shutdown and manager._summary_executor is None
+
+    # après close(): résumé en ligne, aucun nouveau worker
+    manager.record_answer("Q3 ?", "R3")
+    assert llm.summaries == 2
+    assert manager._summary_executor is None
+
+
+class JSONLLM(FakeLLM):
+    """chat_json: relances préparées pour la spéculation, question générée sinon."""
+
+    def chat_json(self, system_prompt, user_prompt, schema_hint, use_cache=True):
+        self.prompts.append(user_prompt)
+        if "anticipe" in system_prompt:
+            return {"candidates": [
+                {"if_answer_mentions": ["airflow", "pipeline"], "next_question": "Comment avez-vous orchestré vos pipelines ?"},
+                {"if_answer_mentions": ["équipe", "management"], "next_question": "Comment avez-vous géré l'équipe ?"},
+            ]}
+        return {"end": False, "next_question": f"Question générée {len(self.prompts)} ?"}
+
+    def chat(self, system_prompt, user_prompt, use_cache=True):
+        return "résumé"
+
+
+def test_speculation_runs_after_the_first_question():
+    # régression: la limite TEST MODE (1 question) empêchait toute spéculation
+    manager = make_manager(JSONLLM(), speculative=True, max_questions=3)
+    first = manager.next_step()
+    assert first["end"] is False
+    assert manager.prefetcher.metrics()["started"] == 1
+
+    manager.record_answer(first["next_question"], "J'ai construit des pipelines Airflow en production.")
+    second = manager.next_step()
+    assert second["next_question"] == "Comment avez-vous orchestré vos pipelines ?"
+    assert manager.prefetcher.metrics()["hits"] == 1
+    assert manager.turn_sources == ["llm", "speculation"]
+
+
+def test_close_shuts_the_prefetcher_down():
+    manager = make_manager(JSONLLM(), speculative=True, max_questions=3)
+    manager.next_step()
+    manager.close()
+    assert manager.prefetcher._executor._shutdown
+
+    # plus de spéculation après la fin de l'entretien (pas de RuntimeError du pool arrêté)
+    manager.record_answer("Q1 ?", "R1")
+    manager.next_step()
+    assert manager.prefetcher.metrics()["started"] == 1
+    manager.close()   # idempotent
+
+
+def test_question_limit_is_configurable():
+    manager = make_manager(JSONLLM(), max_questions=2)
+    assert not manager.next_step()["end"]
+    assert not manager.next_step()["end"]
+    assert manager.next_step() == {"next_question": "", "end": True}
+
+
+INTRO = (
+    "Bonjour, merci d'être présente pour cet entretien. Pour commencer, pouvez-vous vous "
+    "présenter brièvement et m'expliquer ce qui vous motive pour ce poste ?"
+)
+
+
+def make_plan():
+    from models.data_models import InterviewPlan
+
+    return InterviewPlan.from_dict({"steps": [
+        {"topic": "présentation", "question": "Pouvez-vous vous présenter brièvement ?"},
+        {"topic": "expérience", "question": "Décrivez votre dernier projet data.",
+         "expected_keywords": ["projet", "données"],
+         "follow_ups": [{"if_answer_mentions": ["production"], "question": "Comment l'avez-vous mis en production ?"}]},
+        {"topic": "compétences", "question": "Quel est votre niveau en SQL ?", "expected_keywords": ["sql"]},
+    ]})
+
+
+def test_plan_serves_every_turn_locally():
+    # régression: avec la limite TEST MODE, seule l'étape 1 du plan était servie
+    llm = JSONLLM()
+    manager = make_manager(llm, plan=make_plan(), max_questions=4)
+
+    questions = [manager.next_step()["next_question"]]
+    for answer in ("Je suis data engineer.", "Un projet de données mis en production.", "Bonne maîtrise."):
+        manager.record_answer(questions[-1], answer)
+        questions.append(manager.next_step()["next_question"])
+
+    assert questions == [
+        "Pouvez-vous vous présenter brièvement ?",
+        "Décrivez votre dernier projet data.",
+        "Comment l'avez-vous mis en production ?",
+        "Quel est votre niveau en SQL ?",
+    ]
+    assert manager.turn_sources == ["plan"] * 4
+    assert llm.prompts == []   # aucun appel LLM
+
+
+def test_plan_skips_step_repeating_the_canned_intro():
+    manager = make_manager(JSONLLM(), plan=make_plan(), asked_intro=INTRO)
+    assert [s.question for s in manager.plan.steps] == [
+        "Décrivez votre dernier projet data.",
+        "Quel est votre niveau en SQL ?",
+    ]
+    assert manager.next_step()["next_question"] == "Décrivez votre dernier projet data."
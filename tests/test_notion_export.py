@@ -0,0 +1,40 @@
+# tests/test_notion_export.py
+
+import io
+
+from services.notion_export import iter_block_batches, iter_chunks
+
+MARKDOWN = "\n".join(f"- ligne {i}: " + "réponse détaillée " * (i % 7) for i in range(500))
+
+
+def test_chunks_respect_max_len_and_keep_every_line():
+    chunks = list(iter_chunks(MARKDOWN, max_len=300))
+    assert len(chunks) > 1
+    assert all(len(c) <= 300 for c in chunks)
+    # coupés aux fins de ligne: rien n'est perdu ni dupliqué
+    assert "\n".join(chunks) == MARKDOWN
+
+
+def test_long_line_is_split_without_loss():
+    line = "x" * 1000
+    chunks = list(iter_chunks(f"avant\n{line}\napres", max_len=300))
+    assert chunks[0] == "avant"
+    assert all(len(c) <= 300 for c in chunks)
+    assert "".join(chunks[1:]).replace("\n", "") == line + "apres"
+
+
+def test_iterable_of_lines_gives_the_same_chunks():
+    lines = io.StringIO(MARKDOWN + "\n")
+    assert list(iter_chunks(lines, max_len=300)) == list(iter_chunks(MARKDOWN, max_len=300))
+
+
+def test_blank_text_gives_no_chunk():
+    assert list(iter_chunks("")) == []
+    assert list(iter_chunks("\n\n  \n")) == []
+
+
+def test_block_batches_hold_at_most_100_blocks():
+    markdown = "\n".join("p" * 1700 for _ in range(250))
+    batches = list(iter_block_batches(markdown))
+    assert [len(b) for b in batches] == [100, 100, 50]
+    assert batches[0][0]["paragraph"]["rich_text"][0]["text"]["content"] == "p" * 1700
@@ -0,0 +1,47 @@
+# tests/test_ocr_backend.py
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from services import ocr_backend
+
+
+class BrokenTesserocr:
+    """tesserocr importable mais inutilisable (ex: tessdata absent)."""
+
+    PSM = SimpleNamespace(AUTO=3)
+    OEM = SimpleNamespace(DEFAULT=3)
+
+    @staticmethod
+    def PyTessBaseAPI(**kwargs):
+        raise RuntimeError("Failed to init API, possibly an invalid tessdata path")
+
+
+@pytest.fixture
+def fresh_backend(monkeypatch):
+    monkeypatch.setattr(ocr_backend, "_backend", None)
+    monkeypatch.setattr(ocr_backend, "_backend_pid", None)
+    monkeypatch.setattr(ocr_backend, "_tesseract_checked", True)   # binaire supposé présent
+    monkeypatch.setattr(ocr_backend, "OCR_BACKEND", "auto")
+
+
+def test_broken_tesserocr_falls_back_to_pytesseract(fresh_backend, monkeypatch):
+    monkeypatch.setattr(ocr_backend, "tesserocr", BrokenTesserocr)
+    backend = ocr_backend.get_ocr_backend()
+    assert isinstance(backend, ocr_backend.PytesseractBackend)
+    assert ocr_backend.get_ocr_backend() is backend   # une seule fois par process
+
+
+def test_backend_name_is_the_one_that_runs(fresh_backend, monkeypatch):
+    monkeypatch.setattr(ocr_backend, "tesserocr", BrokenTesserocr)
+    # tesserocr est installé, mais c'est pytesseract qui fait l'OCR: la clé de cache doit le dire
+    assert ocr_backend.ocr_backend_name() == "pytesseract"
+
+
+def test_backend_is_recreated_after_fork(fresh_backend, monkeypatch):
+    monkeypatch.setattr(ocr_backend, "tesserocr", None)
+    first = ocr_backend.get_ocr_backend()
+    monkeypatch.setattr(ocr_backend, "_backend_pid", os.getpid() + 1)   # créé par le process parent
+    assert ocr_backend.get_ocr_backend() is not first
@@ -0,0 +1,54 @@
+# tests/test_speculation.py
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agents.speculation import SpeculativeCandidate, SpeculativePrefetcher
+
+
+def test_match_picks_best_candidate_above_threshold():
+    prefetcher = SpeculativePrefetcher(lambda q, h: [])
+    candidates = [
+        SpeculativeCandidate("A ?", ["python", "pandas"]),
+        SpeculativeCandidate("B ?", ["kubernetes", "docker", "helm"]),
+    ]
+    best, score = prefetcher.match("J'utilise docker et kubernetes au quotidien", candidates)
+    assert best.question == "B ?" and score > 0.5
+    assert prefetcher.match("rien à voir", candidates)[0] is None
+
+
+def test_await_candidates_propagates_task_cancellation():
+    release = threading.Event()
+    prefetcher = SpeculativePrefetcher(lambda q, h: release.wait(5) and [])
+    prefetcher.start("Q ?", "")
+
+    async def scenario():
+        task = asyncio.create_task(prefetcher.await_candidates(timeout=5))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        prefetcher.shutdown()
+
+
+def test_abandoned_generation_is_counted_as_discarded():
+    release = threading.Event()
+    prefetcher = SpeculativePrefetcher(lambda q, h: release.wait(5) and [SpeculativeCandidate("Q ?")])
+    prefetcher.start("Q1 ?", "")
+    prefetcher.start("Q2 ?", "")   # la première est abandonnée mais sa requête continue
+    release.set()
+
+    deadline = time.time() + 5
+    while prefetcher.metrics()["discarded"] < 1 and time.time() < deadline:
+        time.sleep(0.01)
+    assert prefetcher.metrics()["discarded"] == 1
+    assert prefetcher.metrics()["cancelled"] == 1
+    prefetcher.shutdown()
@@ -0,0 +1,121 @@
+# tests/test_tts_cache.py
+
+import os
+import time
+import threading
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")   # client OpenAI créé à l'import de tts_service
+
+import pytest
+
+from services import tts_cache
+from services.tts_cache import CANNED_PHRASES, TTSAudioCache, prewarm_tts_cache
+
+
+def make_cache(tmp_path, **kwargs):
+    return TTSAudioCache(cache_dir=str(tmp_path / "tts"), voice="alloy", model="tts", **kwargs)
+
+
+def file_of(cache, text, fmt="pcm"):
+    return cache._path(cache._key(text, fmt), fmt)
+
+
+def test_disk_hit_refreshes_mtime(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set("Bonjour", b"a" * 10, "pcm")
+    path = file_of(cache, "Bonjour")
+    os.utime(path, (1_000, 1_000))
+
+    fresh = make_cache(tmp_path)   # mémoire vide: lecture disque
+    assert fresh.get("Bonjour", "pcm") == b"a" * 10
+    assert fresh.disk_hits == 1
+    assert os.path.getmtime(path) > 1_000
+
+
+def test_disk_eviction_is_lru(tmp_path):
+    cache = make_cache(tmp_path, max_disk_bytes=30)
+    for i, text in enumerate(["un", "deux", "trois"]):
+        cache.set(text, b"x" * 10, "pcm")
+        os.utime(file_of(cache, text), (1_000 + i, 1_000 + i))
+
+    # "un" est relu depuis le disque: il devient le plus récent
+    assert make_cache(tmp_path).get("un", "pcm") is not None
+    cache.set("quatre", b"x" * 10, "pcm")
+
+    assert os.path.exists(file_of(cache, "un"))
+    assert not os.path.exists(file_of(cache, "deux"))
+    assert os.path.exists(file_of(cache, "quatre"))
+
+
+def test_set_does_not_rescan_the_directory(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path)
+    cache.set("premier", b"x" * 10, "pcm")   # premier set: taille du dossier calculée une fois
+
+    calls = []
+    real_listdir = os.listdir
+    monkeypatch.setattr(tts_cache.os, "listdir", lambda path: calls.append(path) or real_listdir(path))
+    for i in range(20):
+        cache.set(f"phrase {i}", b"x" * 10, "pcm")
+    assert calls == []
+    assert cache._disk_bytes == 210
+
+
+def test_synthesis_uses_the_cache_voice_and_model(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        tts_cache, "generate_tts_audio",
+        lambda text, fmt=None, voice=None, model=None: calls.append((voice, model)) or voice.encode(),
+    )
+    alloy = make_cache(tmp_path)
+    nova = TTSAudioCache(cache_dir=str(tmp_path / "tts"), voice="nova", model="tts-hd")
+
+    assert alloy.synthesize("Bonjour", "pcm") == b"alloy"
+    assert nova.synthesize("Bonjour", "pcm") == b"nova"   # même dossier, clé différente
+    assert calls == [("alloy", "tts"), ("nova", "tts-hd")]
+
+
+@pytest.fixture
+def fresh_singleton(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path)
+    monkeypatch.setattr(tts_cache, "_cache", cache)
+    monkeypatch.delenv("TTS_PREWARM_FILE", raising=False)
+    monkeypatch.setenv("TTS_PREWARM", "1")
+    return cache
+
+
+def test_cold_prewarm_runs_in_background(fresh_singleton, monkeypatch):
+    release = threading.Event()
+    done = threading.Event()
+    synthesized = []
+
+    def slow_tts(text, fmt=None, **kwargs):
+        release.wait(5)
+        synthesized.append(text)
+        if len(synthesized) == len(CANNED_PHRASES):
+            done.set()
+        return b"audio"
+
+    monkeypatch.setattr(tts_cache, "generate_tts_audio", slow_tts)
+    # retour immédiat alors qu'aucune synthèse n'est terminée
+    assert prewarm_tts_cache("pcm") == 0
+    assert synthesized == []
+
+    release.set()
+    assert done.wait(5)
+    for _ in range(100):
+        if all(fresh_singleton.contains(p, "pcm") for p in CANNED_PHRASES.values()):
+            break
+        time.sleep(0.02)
+    assert all(fresh_singleton.contains(p, "pcm") for p in CANNED_PHRASES.values())
+
+
+def test_warm_prewarm_loads_from_disk_without_synthesis(fresh_singleton, tmp_path, monkeypatch):
+    for phrase in CANNED_PHRASES.values():
+        fresh_singleton.set(phrase, b"audio", "pcm")
+    # nouveau process: mémoire vide, fichiers sur disque
+    restarted = make_cache(tmp_path)
+    monkeypatch.setattr(tts_cache, "_cache", restarted)
+    monkeypatch.setattr(tts_cache, "generate_tts_audio", lambda text, fmt=None, **kwargs: pytest.fail("synthèse inattendue"))
+
+    assert prewarm_tts_cache("pcm") == len(CANNED_PHRASES)
+    assert restarted.stats()["memory_entries"] == len(CANNED_PHRASES)
@@ -0,0 +1,118 @@
+# tests/test_tts_pipeline.py
+
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")   # client OpenAI créé à l'import de tts_service
+
+import pytest
+
+from services.tts_pipeline import (
+    TTSPipelineMetrics,
+    audio_duration,
+    iter_tts_pipeline,
+    join_audio_segments,
+    pipelined_tts_audio,
+    strip_mp3_headers,
+)
+
+
+def fake_synth(delays=None, failing=()):
+    """Audio = texte encodé; `delays` par phrase, phrases de `failing` -> b"" (échec)."""
+    delays = delays or {}
+
+    def synthesize(sentence, fmt=None):
+        time.sleep(delays.get(sentence, 0.0))
+        return b"" if sentence in failing else sentence.encode("utf-8")
+
+    return synthesize
+
+
+def test_segments_come_out_in_order():
+    sentences = ["Un.", "Deux.", "Trois.", "Quatre."]
+    synth = fake_synth({"Un.": 0.15, "Deux.": 0.0, "Trois.": 0.1})
+    out = list(iter_tts_pipeline(sentences, "pcm", max_parallel=4, synthesize=synth))
+    assert [s for s, _ in out] == sentences
+    assert [a for _, a in out] == [s.encode() for s in sentences]
+
+
+def test_first_audio_does_not_wait_for_later_sentences():
+    metrics = TTSPipelineMetrics()
+    synth = fake_synth({"Longue suite.": 0.5})
+    list(iter_tts_pipeline(["Court.", "Longue suite."], "pcm", max_parallel=2, synthesize=synth, metrics=metrics))
+    assert metrics.ttfa_s < 0.25
+    assert metrics.total_s >= 0.5
+    assert metrics.segments == 2
+
+
+def test_failed_sentences_are_skipped_and_counted():
+    metrics = TTSPipelineMetrics()
+    out = list(iter_tts_pipeline(["A.", "B.", " ", "C."], "pcm", synthesize=fake_synth(failing={"B."}), metrics=metrics))
+    assert [s for s, _ in out] == ["A.", "C."]
+    assert metrics.failed == 1
+    assert metrics.audio_bytes == 4
+
+
+def test_sentence_stream_error_is_raised_to_the_caller():
+    def sentences():
+        yield "Bonjour."
+        raise RuntimeError("flux LLM coupé")
+
+    got = []
+    with pytest.raises(RuntimeError, match="flux LLM coupé"):
+        for sentence, _ in iter_tts_pipeline(sentences(), "pcm", synthesize=fake_synth()):
+            got.append(sentence)
+    assert got == ["Bonjour."]
+
+
+def test_pipelined_audio_joins_pcm():
+    audio, metrics = pipelined_tts_audio("Première phrase. Deuxième phrase !", "pcm", synthesize=fake_synth())
+    assert audio == "Première phrase.Deuxième phrase !".encode("utf-8")
+    assert metrics.segments == 2
+
+
+# MPEG-1 couche III, 128 kb/s, 44,1 kHz, sans remplissage: 417 octets par trame
+MP3_HEADER = b"\xff\xfb\x90\x64"
+FRAME = 417
+
+
+def mp3_segment(payload: bytes) -> bytes:
+    id3 = b"ID3\x04\x00\x00" + bytes([0, 0, 0, 10]) + b"\x00" * 10
+    xing = MP3_HEADER + b"\x00" * 32 + b"Xing" + b"\x00" * (FRAME - 40)
+    audio = MP3_HEADER + payload + b"\x00" * (FRAME - 4 - len(payload))
+    return id3 + xing + audio
+
+
+def test_strip_mp3_headers_keeps_only_audio_frames():
+    stripped = strip_mp3_headers(mp3_segment(b"A"))
+    assert len(stripped) == FRAME
+    assert stripped.startswith(MP3_HEADER + b"A")
+
+
+def test_mp3_join_has_no_repeated_headers():
+    joined = join_audio_segments([mp3_segment(b"A"), mp3_segment(b"B")], "mp3")
+    assert b"ID3" not in joined and b"Xing" not in joined
+    assert len(joined) == 2 * FRAME
+
+
+def test_unjoinable_format_is_rejected():
+    with pytest.raises(ValueError):
+        join_audio_segments([b"a", b"b"], "opus")
+
+
+def test_mp3_duration_counts_audio_frames_only():
+    # trame Xing retirée: une seule trame audio de 1152 échantillons à 44,1 kHz
+    assert audio_duration(mp3_segment(b"A"), "mp3") == pytest.approx(1152 / 44100)
+    two = mp3_segment(b"A") + (MP3_HEADER + b"\x00" * (FRAME - 4))
+    assert audio_duration(two, "mp3") == pytest.approx(2 * 1152 / 44100)
+
+
+def test_pcm_and_aac_durations():
+    assert audio_duration(b"\x00" * 48_000, "pcm") == pytest.approx(1.0)   # 24 kHz, 16 bits
+    # trame ADTS de 20 octets à 24 kHz (indice 6)
+    adts = bytes([0xFF, 0xF1, 6 << 2, 0x00, 20 >> 3, (20 & 0x07) << 5, 0xFC]) + b"\x00" * 13
+    assert audio_duration(adts * 3, "aac") == pytest.approx(3 * 1024 / 24000)
+
+
+def test_unmeasurable_format_has_no_duration():
+    assert audio_duration(b"OggS...", "opus") is None